@@ -4,6 +4,9 @@ FinScope API Server - FastAPI Backend for React Frontend
 This API server exposes the FinScope functionality as REST endpoints.
 """
 
+import os
+from contextlib import asynccontextmanager
+import anyio.to_thread
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.wsgi import WSGIMiddleware
@@ -14,11 +17,25 @@ import history_manager
 # Import Flask app from master_controller (rename to avoid conflict)
 from master_controller import app as flask_app
 
+# Max concurrent blocking requests (Flask routes and sync FastAPI routes run on worker threads).
+# Requests spend most of their time waiting on SEC, Gemini, MongoDB and news I/O, so this is
+# set well above anyio's default of 40 threads.
+WORKER_THREADS = int(os.getenv('FINSCOPE_WORKER_THREADS', '200'))
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Raise the thread limit used for blocking request handlers at startup"""
+    anyio.to_thread.current_default_thread_limiter().total_tokens = WORKER_THREADS
+    yield
+
+
 # Create FastAPI app
 app = FastAPI(
     title="FinScope API",
     description="Financial Document Analysis Platform API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Add CORS middleware
@@ -30,6 +47,7 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
 # Health check endpoints (both with and without /api prefix)
 @app.get("/health")
 async def health_check_direct():
@@ -43,8 +61,10 @@ async def health_check():
 
 
 # FastAPI routes with /api prefix - these are checked BEFORE the Flask mount
+# Plain `def` (not async) because history_manager makes blocking MongoDB calls;
+# FastAPI runs these on the worker thread pool instead of blocking the event loop
 @app.get("/api/history/recent")
-async def get_recent_history_endpoint(query: Optional[str] = None):
+def get_recent_history_endpoint(query: Optional[str] = None):
     """
     Get recent/archived chat history with full message history.
     
@@ -70,7 +90,7 @@ async def get_recent_history_endpoint(query: Optional[str] = None):
 
 
 @app.get("/api/history/chat/{session_id}")
-async def get_chat_detail_endpoint(session_id: str):
+def get_chat_detail_endpoint(session_id: str):
     """
     Get full chat details for a specific session.
     
@@ -101,7 +121,7 @@ async def get_chat_detail_endpoint(session_id: str):
 
 
 @app.delete("/api/history/chat/{session_id}")
-async def delete_chat_endpoint(session_id: str):
+def delete_chat_endpoint(session_id: str):
     """
     Delete a chat conversation permanently from the database.
     
@@ -8,11 +8,12 @@ This script provides:
 """
 
 import pandas as pd
-import requests
 from typing import List, Optional, Tuple
 from rapidfuzz import fuzz, process
 from io import StringIO
 
+import http_client
+
 
 # Global variable to store the company list and name-to-ticker mapping
 _company_list: Optional[List[str]] = None
@@ -43,11 +44,11 @@ def fetch_company_lists() -> List[str]:
         # Fetch S&P 500 companies
         print("Fetching S&P 500 companies...")
         sp500_url = "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
-        # Use requests with User-Agent to avoid 403 errors
+        # Use the shared HTTP session with User-Agent to avoid 403 errors
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
-        response = requests.get(sp500_url, headers=headers)
+        response = http_client.session.get(sp500_url, headers=headers)
         response.raise_for_status()
         sp500_tables = pd.read_html(StringIO(response.text))
         sp500_df = sp500_tables[0]  # First table contains the company list
@@ -93,11 +94,11 @@ def fetch_company_lists() -> List[str]:
         # Fetch NASDAQ-100 companies
         print("Fetching NASDAQ-100 companies...")
         nasdaq_url = "https://en.wikipedia.org/wiki/NASDAQ-100"
-        # Use requests with User-Agent to avoid 403 errors
+        # Use the shared HTTP session with User-Agent to avoid 403 errors
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
-        response = requests.get(nasdaq_url, headers=headers)
+        response = http_client.session.get(nasdaq_url, headers=headers)
         response.raise_for_status()
         nasdaq_tables = pd.read_html(StringIO(response.text))
         
@@ -9,6 +9,7 @@ This service provides:
 """
 
 import os
+import threading
 from datetime import datetime
 from typing import Dict, List, Optional, Literal
 from pymongo import MongoClient, ASCENDING
@@ -34,9 +35,13 @@ ACTIVE_SESSIONS_COLLECTION = "active_sessions"
 # TTL duration: 3600 seconds (1 hour)
 TTL_SECONDS = 3600
 
+# Connection pool size of the shared MongoClient (shared by all threads)
+MONGODB_MAX_POOL_SIZE = int(os.getenv('MONGODB_MAX_POOL_SIZE', '50'))
+
 # Global MongoDB client and database references
 _client: Optional[MongoClient] = None
 _db = None
+_db_lock = threading.Lock()  # Serializes first connection so threads share one client
 
 
 def get_database():
@@ -55,27 +60,36 @@ def get_database():
     if _db is not None:
         return _db
     
-    try:
-        # Create MongoDB client
-        _client = MongoClient(MONGODB_URI, serverSelectionTimeoutMS=5000)
-        
-        # Test connection
-        _client.admin.command('ping')
-        
-        # Get database
-        _db = _client[DB_NAME]
-        
-        # Initialize TTL index on startup
-        _initialize_ttl_index()
+    with _db_lock:
+        if _db is not None:
+            return _db
         
-        print(f"✓ Connected to MongoDB: {DB_NAME}")
-        return _db
-        
-    except (ConnectionFailure, ServerSelectionTimeoutError) as e:
-        raise ConnectionFailure(
-            f"Failed to connect to MongoDB: {e}. "
-            f"Please check your MONGODB_URI in .env file."
-        )
+        try:
+            # Create MongoDB client (pooled; reused for every call in the process)
+            client = MongoClient(
+                MONGODB_URI,
+                serverSelectionTimeoutMS=5000,
+                maxPoolSize=MONGODB_MAX_POOL_SIZE
+            )
+            
+            # Test connection
+            client.admin.command('ping')
+            
+            # Get database
+            _client = client
+            _db = client[DB_NAME]
+            
+            # Initialize TTL index on startup
+            _initialize_ttl_index()
+            
+            print(f"✓ Connected to MongoDB: {DB_NAME}")
+            return _db
+            
+        except (ConnectionFailure, ServerSelectionTimeoutError) as e:
+            raise ConnectionFailure(
+                f"Failed to connect to MongoDB: {e}. "
+                f"Please check your MONGODB_URI in .env file."
+            )
 
 
 def _initialize_ttl_index():
@@ -205,6 +219,23 @@ def create_active_session(chat_id: str, temp_file_paths: List[str]) -> None:
     print(f"✓ Created active session for chat_id: {chat_id} with {len(temp_file_paths)} file(s)")
 
 
+def append_chat_turn(chat_id: str, turn: List[Dict]) -> None:
+    """
+    Appends one Gemini question/answer turn to the active session, so an
+    interrupted session can be resumed.
+    
+    Only the turns are stored, not the file context: the first question is saved
+    without its context prompt, which is rebuilt from the session's files on resume.
+    
+    Args:
+        chat_id: The conversation ID the session belongs to
+        turn: Serialized turn (gemini_service.serialize_last_turn)
+    """
+    db = get_database()
+    collection = db[ACTIVE_SESSIONS_COLLECTION]
+    collection.update_one({"chat_id": chat_id}, {"$push": {"chat_turns": {"$each": turn}}})
+
+
 def add_message_to_conversation(chat_id: str, role: str, content: str) -> None:
     """
     Adds a message to an existing conversation.
@@ -268,18 +299,20 @@ def add_file_to_session(chat_id: str, file_path: str) -> None:
     print(f"✓ Added file to session: {file_path}")
 
 
-def end_chat_session(chat_id: str) -> None:
+def end_chat_session(chat_id: str, delete_files: bool = True) -> None:
     """
     The 'Cleaning Crew' function - ends a chat session and cleans up local files.
     
     This function:
     1. Looks up temp_file_paths in active_sessions
     2. Uses os.remove() to physically delete every file in that list
+       (skipped if delete_files is False, e.g. when the caller deletes them itself)
     3. Sets is_active = False in the conversations record
     4. Deletes the record from active_sessions
     
     Args:
         chat_id: The conversation ID to end
+        delete_files: Whether to delete the session's temp files (default: True)
     """
     db = get_database()
     sessions_collection = db[ACTIVE_SESSIONS_COLLECTION]
@@ -294,7 +327,7 @@ def end_chat_session(chat_id: str) -> None:
         print(f"⚠ No active session found for chat_id: {chat_id}")
         return
     
-    temp_file_paths = session.get("temp_file_paths", [])
+    temp_file_paths = session.get("temp_file_paths", []) if delete_files else []
     
     # Step 2: Delete every file in temp_file_paths
     deleted_count = 0
@@ -312,7 +345,8 @@ def end_chat_session(chat_id: str) -> None:
             print(f"✗ Failed to delete file {file_path}: {e}")
             failed_count += 1
     
-    print(f"✓ Cleanup complete: {deleted_count} deleted, {failed_count} failed")
+    if delete_files:
+        print(f"✓ Cleanup complete: {deleted_count} deleted, {failed_count} failed")
     
     # Step 3: Set is_active = False in conversations record
     conversations_collection.update_one(
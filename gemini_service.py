@@ -10,10 +10,15 @@ This script provides:
 import os
 import re
 import time
-from typing import List, Optional
+import sqlite3
+import hashlib
+import threading
+from typing import Callable, Dict, List, Optional
 from dotenv import load_dotenv
 import google.generativeai as genai
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type, retry_if_not_exception_type
+
+import text_files
 
 # Load environment variables from .env file
 load_dotenv()
@@ -35,6 +40,23 @@ DEFAULT_MODEL = 'gemini-2.5-flash-lite'  # High TPM limit, optimized for free ti
 # Current model (can be changed via set_model function)
 _current_model_name = DEFAULT_MODEL
 
+# Cache of combined file contexts built by read_files()
+# Keyed by (path, mtime, size) of each file so edited files are re-read
+MAX_CACHED_CONTEXTS = 8
+_context_cache: Dict[tuple, str] = {}
+_context_cache_lock = threading.Lock()
+
+# Cache of generated file summaries, keyed by sha256 of (content, company, doc type, model)
+# Persisted in SQLite so re-running a workflow on the same filing skips the Gemini call
+SUMMARY_CACHE_PATH = os.path.join(
+    os.getenv('FINSCOPE_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.finscope', 'cache')),
+    'summaries.sqlite3'
+)
+SUMMARY_CACHE_TTL = 30 * 24 * 3600  # 30 days
+MAX_CACHED_SUMMARIES = 128  # In-memory entries in front of SQLite
+_summary_cache: Dict[bytes, str] = {}
+_summary_cache_lock = threading.Lock()
+
 
 def set_model(model_name: str) -> None:
     """
@@ -109,7 +131,7 @@ def read_files(file_paths: List[str]) -> str:
         
         file_name = os.path.basename(file_path)
         
-        with open(file_path, 'r', encoding='utf-8') as f:
+        with text_files.open_text_file(file_path) as f:
             lines = f.readlines()
             # Add line number stamps every 10 lines (at lines 1, 11, 21, 31, etc.)
             # This keeps the context clean while still allowing approximate line references
@@ -129,6 +151,63 @@ def read_files(file_paths: List[str]) -> str:
     return "\n".join(combined_text)
 
 
+def get_file_context(file_paths: List[str]) -> str:
+    """
+    Returns the combined context block for file_paths, reading the files only once.
+    
+    The first call reads and line-stamps the files via read_files(); later calls
+    for the same (unchanged) files are served from an in-process cache.
+    
+    Args:
+        file_paths: List of file paths to read (up to 5 files)
+    
+    Returns:
+        str: Combined text content from all files with periodic line number stamps
+    
+    Raises:
+        FileNotFoundError: If any file doesn't exist
+        ValueError: If more than 5 files are provided
+    """
+    try:
+        cache_key = tuple(
+            (file_path, os.path.getmtime(file_path), os.path.getsize(file_path))
+            for file_path in file_paths
+        )
+    except OSError:
+        # Let read_files raise the proper error for missing files
+        return read_files(file_paths)
+    
+    with _context_cache_lock:
+        cached = _context_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    context_block = read_files(file_paths)
+    
+    with _context_cache_lock:
+        # Evict the oldest entry once the cache is full (dicts keep insertion order)
+        if len(_context_cache) >= MAX_CACHED_CONTEXTS:
+            _context_cache.pop(next(iter(_context_cache)))
+        _context_cache[cache_key] = context_block
+    
+    return context_block
+
+
+def warm_file_context(file_paths: List[str]) -> None:
+    """
+    Pre-builds the chat context for file_paths so the first chat turn doesn't pay for it.
+    Intended to run in a background thread while summaries are being generated.
+    
+    Args:
+        file_paths: List of file paths that will be used for chat
+    """
+    try:
+        get_file_context(file_paths)
+    except Exception as e:
+        # Warming is best-effort; get_gemini_response will surface real errors
+        print(f"⚠ Could not pre-load chat context: {e}")
+
+
 def parse_response(response_text: str) -> tuple[str, str]:
     """
     Parses Gemini response into answer and references using defensive splitting.
@@ -170,59 +249,62 @@ def parse_response(response_text: str) -> tuple[str, str]:
         return answer_part, ""
 
 
-def get_gemini_response(user_query: str, file_paths: List[str], chat_history: Optional[List] = None) -> tuple[str, str, List]:
+def serialize_last_turn(chat_history: List, user_query: str) -> List[Dict[str, object]]:
     """
-    Sends user query and file contents to Gemini for analysis.
-    Automatically selects optimal model based on token count and implements
-    smart retry logic with 10-second pause on 429 errors.
+    Converts the latest question and answer of a Gemini chat into plain dicts that
+    can be stored in MongoDB (see restore_chat_history).
     
-    This function:
-    1. Reads all files from file_paths
-    2. Estimates token count
-    3. Auto-switches to flash-lite if > 200k tokens
-    4. Constructs a prompt with the context and user query
-    5. Sends to Gemini model with exponential backoff retry
-    6. Parses response into answer and references
-    7. Returns (answer, references, updated_history)
+    The first user message of a chat is the whole context prompt; it is stored as
+    just the question, so the saved turns stay small.
     
     Args:
-        user_query: The question or query from the user
-        file_paths: List of file paths to include in the context (up to 5)
-        chat_history: Optional list of previous chat messages for context
+        chat_history: History returned by get_gemini_response() (Content objects)
+        user_query: The question asked in the latest turn
     
     Returns:
-        tuple: (answer_part, reference_part, updated_history)
-        - answer_part: The chat response/answer text
-        - reference_part: The references section with citations
-        - updated_history: Updated chat history (empty list if no history)
-    
-    Raises:
-        FileNotFoundError: If any file doesn't exist
-        ValueError: If more than 5 files are provided
-        Exception: If Gemini API call fails after retries
+        List[Dict]: [{'role': 'user', 'parts': [question]}, {'role': 'model', 'parts': [text, ...]}]
     """
-    # Read and combine files
-    context_block = read_files(file_paths)
+    question, answer = chat_history[-2:]
+    if len(chat_history) > 2:
+        user_query = ''.join(part.text for part in question.parts if part.text)
+    return [
+        {'role': 'user', 'parts': [user_query]},
+        {'role': answer.role, 'parts': [part.text for part in answer.parts if part.text]}
+    ]
+
+
+def restore_chat_history(chat_turns: List[Dict], file_paths: List[str]) -> List[Dict[str, object]]:
+    """
+    Rebuilds a Gemini chat history from saved turns (serialize_last_turn), re-creating
+    the first message's context prompt from the files.
     
-    # Estimate token count
-    estimated_tokens = estimate_tokens(context_block)
+    Args:
+        chat_turns: Saved turns, oldest first
+        file_paths: The session's files (read via get_file_context)
     
-    # Token Budgeting: Auto-switch to flash-lite if document > 200k tokens
-    model_to_use = get_current_model()
-    if estimated_tokens > 200000:
-        if 'lite' not in model_to_use.lower():
-            print(f"⚠ Token count ({estimated_tokens:,}) exceeds 200k. Auto-switching to flash-lite for quota preservation...")
-            model_to_use = 'gemini-2.5-flash-lite'
-        else:
-            print(f"ℹ Token count: {estimated_tokens:,} (using flash-lite for high-throughput processing)")
-    else:
-        print(f"ℹ Token count: {estimated_tokens:,}")
+    Returns:
+        List[Dict]: History to pass as chat_history to get_gemini_response()
+    """
+    if not chat_turns:
+        return []
+    first_question = ''.join(chat_turns[0]['parts'])
+    first_message = {'role': 'user', 'parts': [build_context_prompt(get_file_context(file_paths), first_question)]}
+    return [first_message] + list(chat_turns[1:])
+
+
+def build_context_prompt(context_block: str, user_query: str) -> str:
+    """
+    Builds the first message of a chat: the answer-format instructions, the document
+    context and the user's first question. Later messages are just the question.
     
-    # Count number of files
-    num_files = len(file_paths)
+    Args:
+        context_block: Document context (whole files or retrieved chunks)
+        user_query: The user's question
     
-    # Construct the prompt according to requirements
-    prompt = f"""You are a precise auditor. When answering, use the provided document context. If line numbers are available in the context, you MUST cite them.
+    Returns:
+        str: The prompt
+    """
+    return f"""You are a precise auditor. When answering, use the provided document context. If line numbers are available in the context, you MUST cite them.
 
 Format Rule: Your entire response MUST follow this exact structure:
 
@@ -257,33 +339,159 @@ Context:
 User Query: {user_query}
 
 Remember: Your response MUST follow the exact format with [CHAT_RESPONSE], --- separator, and [REFERENCES] sections."""
+
+
+def get_gemini_response(
+    user_query: str,
+    file_paths: List[str],
+    chat_history: Optional[List] = None,
+    on_chunk: Optional[Callable[[str], None]] = None,
+    quiet: bool = False
+) -> tuple[str, str, List]:
+    """
+    Sends user query and file contents to Gemini for analysis.
+    Automatically selects optimal model based on token count and implements
+    smart retry logic with 10-second pause on 429 errors.
+    
+    This function:
+    1. Reads all files from file_paths
+    2. Estimates token count
+    3. Auto-switches to flash-lite if > 200k tokens
+    4. Constructs a prompt with the context and user query
+    5. Sends to Gemini model with exponential backoff retry
+       (streaming chunks to on_chunk as they arrive, if provided)
+    6. Parses response into answer and references
+    7. Returns (answer, references, updated_history)
+    
+    Args:
+        user_query: The question or query from the user
+        file_paths: List of file paths to include in the context (up to 5)
+        chat_history: Optional list of previous chat messages for context
+        on_chunk: Optional callback receiving raw response text as it streams in.
+            The full response is still parsed and returned once streaming finishes.
+        quiet: If True, don't print token count messages (for background calls)
+    
+    Returns:
+        tuple: (answer_part, reference_part, updated_history)
+        - answer_part: The chat response/answer text
+        - reference_part: The references section with citations
+        - updated_history: Updated chat history (empty list if no history)
+    
+    Raises:
+        FileNotFoundError: If any file doesn't exist
+        ValueError: If more than 5 files are provided
+        Exception: If Gemini API call fails after retries
+        StreamInterruptedError: If the stream fails after part of it reached on_chunk
+    """
+    # Read and combine files (served from cache if already warmed)
+    context_block = get_file_context(file_paths)
+    
+    return get_context_response(
+        user_query,
+        context_block,
+        chat_history=chat_history,
+        on_chunk=on_chunk,
+        quiet=quiet
+    )
+
+
+class StreamInterruptedError(Exception):
+    """
+    Raised when a streamed response fails after part of it was already passed to
+    on_chunk. It is not retried; the caller should mark the partial answer as cut off.
+    """
+
+
+def get_context_response(
+    user_query: str,
+    context_block: str,
+    chat_history: Optional[List] = None,
+    on_chunk: Optional[Callable[[str], None]] = None,
+    quiet: bool = False
+) -> tuple[str, str, List]:
+    """
+    Sends user query and a prepared context block to Gemini for analysis.
+    
+    This is the core of get_gemini_response(), for callers that build their own
+    context (e.g., retrieved excerpts from a vector index) instead of whole files.
+    The context should keep the [Line X] stamps so citations still work.
+    
+    Args:
+        user_query: The question or query from the user
+        context_block: Document context to answer from
+        chat_history: Optional list of previous chat messages for context
+        on_chunk: Optional callback receiving raw response text as it streams in
+        quiet: If True, don't print token count messages (for background calls)
+    
+    Returns:
+        tuple: (answer_part, reference_part, updated_history)
+    
+    Raises:
+        Exception: If Gemini API call fails after retries
+        StreamInterruptedError: If the stream fails after part of it reached on_chunk
+    """
+    # Estimate token count
+    estimated_tokens = estimate_tokens(context_block)
+    
+    # Token Budgeting: Auto-switch to flash-lite if document > 200k tokens
+    model_to_use = get_current_model()
+    if estimated_tokens > 200000:
+        if 'lite' not in model_to_use.lower():
+            if not quiet:
+                print(f"⚠ Token count ({estimated_tokens:,}) exceeds 200k. Auto-switching to flash-lite for quota preservation...")
+            model_to_use = 'gemini-2.5-flash-lite'
+        elif not quiet:
+            print(f"ℹ Token count: {estimated_tokens:,} (using flash-lite for high-throughput processing)")
+    elif not quiet:
+        print(f"ℹ Token count: {estimated_tokens:,}")
+    
+    # Construct the prompt according to requirements
+    prompt = build_context_prompt(context_block, user_query)
     
     # Initialize the model with current selection
     model = genai.GenerativeModel(model_to_use)
     
     # Define retry decorator with exponential backoff and 10-second pause on 429
+    # Only the request (up to the first streamed chunk) is retried: once text has gone to
+    # on_chunk, a retry would show the answer again from the top
     @retry(
         stop=stop_after_attempt(5),  # Try up to 5 times
         wait=wait_exponential(multiplier=1, min=2, max=60),  # Exponential backoff: 2s, 4s, 8s, 16s, 32s
-        retry=retry_if_exception_type((Exception,)),  # Retry on any exception
+        retry=retry_if_not_exception_type(StreamInterruptedError),  # Retry on any other exception
         reraise=True
     )
     def send_with_retry():
         """Send message with automatic retry on rate limits, with 10-second pause on 429"""
+        streamed = False
         try:
             if chat_history:
                 # Continue existing chat session
                 chat = model.start_chat(history=chat_history)
-                response = chat.send_message(user_query)
-                updated_history = chat.history
+                message = user_query
             else:
                 # First message: include full context
                 chat = model.start_chat(history=[])
-                response = chat.send_message(prompt)
-                updated_history = chat.history
+                message = prompt
             
-            return response.text, updated_history
+            if on_chunk:
+                # Stream the response so the caller can show text as it arrives
+                response = chat.send_message(message, stream=True)
+                chunks = []
+                for chunk in response:
+                    if not chunk.parts:
+                        continue
+                    chunks.append(chunk.text)
+                    streamed = True
+                    on_chunk(chunk.text)
+                response_text = ''.join(chunks)
+            else:
+                response = chat.send_message(message)
+                response_text = response.text
+            
+            return response_text, chat.history
         except Exception as e:
+            if streamed:
+                raise StreamInterruptedError(f"Response interrupted: {e}") from e
             error_str = str(e).lower()
             # Smart Backoff: 10-second pause specifically for 429 errors
             if '429' in error_str or 'quota' in error_str or 'rate limit' in error_str:
@@ -299,6 +507,8 @@ Remember: Your response MUST follow the exact format with [CHAT_RESPONSE], --- s
         answer_part, reference_part = parse_response(response_text)
         
         return answer_part, reference_part, updated_history
+    except StreamInterruptedError:
+        raise
     except Exception as e:
         # Check if it's a rate limit error after all retries
         error_str = str(e).lower()
@@ -311,11 +521,86 @@ Remember: Your response MUST follow the exact format with [CHAT_RESPONSE], --- s
         raise Exception(f"Error calling Gemini API: {e}")
 
 
+def _summary_cache_key(content: str, company_name: Optional[str], doc_type: Optional[str]) -> bytes:
+    """Returns the summary cache key for a document and its prompt inputs"""
+    digest = hashlib.sha256(content.encode('utf-8'))
+    for part in (company_name or '', doc_type or '', get_current_model()):
+        digest.update(b'\0' + part.encode('utf-8'))
+    return digest.digest()
+
+
+def _open_summary_cache() -> sqlite3.Connection:
+    """Opens the SQLite summary cache, creating it if needed"""
+    os.makedirs(os.path.dirname(SUMMARY_CACHE_PATH), exist_ok=True)
+    conn = sqlite3.connect(SUMMARY_CACHE_PATH, timeout=5)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS summaries "
+        "(sha256 BLOB PRIMARY KEY, summary TEXT NOT NULL, created_at INTEGER NOT NULL)"
+    )
+    return conn
+
+
+def _get_cached_summary(key: bytes) -> Optional[str]:
+    """
+    Looks up a summary in memory, then in SQLite. Expired entries are deleted.
+    Cache failures are non-fatal and count as a miss.
+    """
+    with _summary_cache_lock:
+        if key in _summary_cache:
+            return _summary_cache[key]
+    
+    try:
+        conn = _open_summary_cache()
+        try:
+            with conn:
+                conn.execute("DELETE FROM summaries WHERE created_at < ?", (int(time.time()) - SUMMARY_CACHE_TTL,))
+                row = conn.execute("SELECT summary FROM summaries WHERE sha256 = ?", (key,)).fetchone()
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        print(f"⚠ Warning: Could not read summary cache: {e}")
+        return None
+    
+    if row:
+        _remember_summary(key, row[0])
+        return row[0]
+    return None
+
+
+def _remember_summary(key: bytes, summary: str) -> None:
+    """Keeps a summary in the in-memory cache, evicting the oldest entry when full"""
+    with _summary_cache_lock:
+        if key not in _summary_cache and len(_summary_cache) >= MAX_CACHED_SUMMARIES:
+            _summary_cache.pop(next(iter(_summary_cache)))
+        _summary_cache[key] = summary
+
+
+def _cache_summary(key: bytes, summary: str) -> None:
+    """Stores a summary in memory and in SQLite. Cache failures are non-fatal."""
+    _remember_summary(key, summary)
+    try:
+        conn = _open_summary_cache()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO summaries (sha256, summary, created_at) VALUES (?, ?, ?)",
+                    (key, summary, int(time.time()))
+                )
+        finally:
+            conn.close()
+    except sqlite3.Error as e:
+        print(f"⚠ Warning: Could not write summary cache: {e}")
+
+
 def generate_file_summary(file_path: str, company_name: Optional[str] = None, doc_type: Optional[str] = None) -> str:
     """
     Generates a concise, citation-free summary (100-150 words) for a single file.
     This is a separate feature from the chat functionality.
     
+    Summaries are cached (in memory and in SUMMARY_CACHE_PATH for SUMMARY_CACHE_TTL)
+    by file content, company name, document type and model, so the same filing
+    is only summarized once.
+    
     Args:
         file_path: Path to the file to summarize
         company_name: Optional company name for context
@@ -332,9 +617,14 @@ def generate_file_summary(file_path: str, company_name: Optional[str] = None, do
         raise FileNotFoundError(f"File not found: {file_path}")
     
     # Read the file
-    with open(file_path, 'r', encoding='utf-8') as f:
+    with text_files.open_text_file(file_path) as f:
         content = f.read()
     
+    cache_key = _summary_cache_key(content, company_name, doc_type)
+    cached_summary = _get_cached_summary(cache_key)
+    if cached_summary is not None:
+        return cached_summary
+    
     file_name = os.path.basename(file_path)
     
     # Build context string
@@ -385,10 +675,11 @@ Please provide only the summary text, nothing else:"""
         summary = re.sub(r'\[Line \d+\]', '', summary)
         summary = re.sub(r'\[File:.*?\]', '', summary)
         summary = summary.strip()
-        
-        return summary
     except Exception as e:
         raise Exception(f"Error generating file summary: {e}")
+    
+    _cache_summary(cache_key, summary)
+    return summary
 
 
 if __name__ == "__main__":
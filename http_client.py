@@ -0,0 +1,91 @@
+"""
+HTTP Client - Shared Connection Pool
+
+This module provides:
+- One process-wide requests.Session shared by the service modules
+  (plus a non-retrying one for best-effort calls)
+- An optional HTTP/2 client (httpx) that multiplexes concurrent requests to one host
+  over a single connection
+- Keep-alive connection pooling, so repeat calls to the same hosts skip the TCP/TLS handshake
+- Retry with exponential backoff for transient HTTP errors (429, 502, 503, 504)
+
+requests.Session is safe to share across the Flask worker threads for plain
+GET/HEAD calls; do not create per-request sessions.
+"""
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Optional: httpx (with the h2 extra) for HTTP/2 multiplexing
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+
+# Connection pool size per host (and number of hosts kept pooled)
+POOL_SIZE = 32
+
+# Retry policy for transient failures
+RETRY_TOTAL = 3
+RETRY_BACKOFF_FACTOR = 0.3
+RETRY_STATUS_CODES = (429, 502, 503, 504)
+
+# Timeout for the HTTP/2 client (seconds); it is only used for best-effort calls
+HTTP2_TIMEOUT = 1.0
+
+
+def _create_session(retry_total: int = RETRY_TOTAL) -> requests.Session:
+    """
+    Creates a requests.Session with pooled, retrying adapters for http and https.
+
+    Args:
+        retry_total: Retries for transient failures (0 disables retrying)
+
+    Returns:
+        requests.Session: Configured session
+    """
+    retry = Retry(
+        total=retry_total,
+        backoff_factor=RETRY_BACKOFF_FACTOR,
+        status_forcelist=RETRY_STATUS_CODES
+    )
+    adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+# Shared session - use http_client.session.get(...) / .head(...)
+session = _create_session()
+
+# Pooled session without retries, for best-effort calls with short timeouts where a
+# retry with backoff would cost more than giving up (e.g. news redirect resolution)
+no_retry_session = _create_session(retry_total=0)
+
+
+def _create_http2_client():
+    """
+    Creates a thread-safe httpx.Client with HTTP/2 enabled, if httpx and h2 are installed.
+    
+    Concurrent requests to the same host (e.g. a batch of news.google.com redirects)
+    share one TCP/TLS connection as separate HTTP/2 streams instead of one
+    connection each.
+    
+    Returns:
+        httpx.Client: Configured client, or None if HTTP/2 support is unavailable
+    """
+    if httpx is None:
+        return None
+    try:
+        return httpx.Client(http2=True, timeout=HTTP2_TIMEOUT, follow_redirects=True)
+    except ImportError:
+        # httpx is installed without the h2 package
+        return None
+
+
+# Shared HTTP/2 client (None if unavailable) - callers fall back to no_retry_session
+http2_client = _create_http2_client()
@@ -6,14 +6,40 @@ It orchestrates SEC filing analysis and document upload workflows.
 """
 
 import os
+import re
 import time
+import hashlib
+import sys
+import queue
+import select
 import threading
+import shutil
+import logging
 import tempfile
-from typing import List, Dict, Optional
+import textwrap
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Optional, Annotated
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
+from pydantic import BaseModel, StringConstraints, ValidationError
+
+# Optional: prompt_toolkit gives the chat prompt line editing and input history
+try:
+    from prompt_toolkit import PromptSession
+    from prompt_toolkit.patch_stdout import patch_stdout
+except ImportError:
+    PromptSession = None
+    patch_stdout = None
+
+# Optional: orjson serializes large JSON responses several times faster than the stdlib
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Import all services
 try:
@@ -23,13 +49,36 @@ try:
     import news_service
     import upload_service
     import db_service
+    import vector_service
 except ImportError as e:
     print(f"✗ Fatal error: Failed to import required service: {e}")
     print("Please ensure all service files are present in the project directory.")
     exit(1)
 
+# Server-side logging for the API endpoints (the CLI workflows below print to the terminal)
+# Set FINSCOPE_LOG_LEVEL=WARNING in production to skip per-request info messages
+# Configured on the finscope logger only, so third-party INFO logs stay off the CLI
+logger = logging.getLogger('finscope.master')
+if not logger.handlers:
+    _log_handler = logging.StreamHandler()
+    _log_handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+    logger.addHandler(_log_handler)
+    logger.setLevel(os.getenv('FINSCOPE_LOG_LEVEL', 'INFO'))
+    logger.propagate = False
+
 # Constants
 INACTIVITY_TIMEOUT = 3600  # 1 hour in seconds
+EXIT_COMMANDS = frozenset({'quit', 'exit', 'q'})  # Chat loop commands that end the session
+MAX_CLEANUP_WORKERS = 16  # Threads used to delete temp files in parallel
+MAX_SUMMARY_WORKERS = 2  # Concurrent Gemini summary requests
+MENU_INPUT_TIMEOUT = 300  # 5 minutes in seconds - idle menu prompts exit after this
+UPLOAD_COPY_BUFFER_SIZE = 1024 * 1024  # 1MB blocks when saving uploaded files
+EXECUTIVE_SUMMARY_WORDS = 150  # Word cap for executive summaries returned by the API
+
+# Speculative follow-up: while the user types, the chat asks Gemini a likely next
+# question in the background (one call at a time). Off by default since it spends quota.
+PREFETCH_FOLLOW_UPS = os.getenv('FINSCOPE_PREFETCH_FOLLOW_UPS', '0') == '1'
+PREFETCH_FOLLOW_UP_QUERY = "Summarize this in one sentence"
 
 # Initialize Flask app for API endpoints
 app = Flask(__name__)
@@ -39,6 +88,70 @@ app = Flask(__name__)
 CORS(app, resources={r"/*": {"origins": "*"}})
 
 
+def _json_response(data):
+    """
+    Serialize data as a JSON response, using orjson when installed.
+    Falls back to jsonify if orjson is missing or cannot serialize the data.
+    """
+    if orjson is not None:
+        try:
+            return Response(orjson.dumps(data), mimetype='application/json')
+        except TypeError:
+            pass
+    return jsonify(data)
+
+
+# Request body models (pydantic validates and strips fields in compiled code)
+RequiredStr = Annotated[str, StringConstraints(strip_whitespace=True, min_length=1)]
+OptionalStr = Annotated[str, StringConstraints(strip_whitespace=True)]
+
+
+class StartAnalysisBody(BaseModel):
+    """JSON body for /start-analysis"""
+    ticker: RequiredStr
+    companyName: RequiredStr
+    filingId: RequiredStr  # SEC accession number
+    filingDate: OptionalStr = ''  # Optional, from /get-filings
+    formType: OptionalStr = ''  # Optional, from /get-filings
+
+
+class UploadForm(BaseModel):
+    """Form fields for /upload-analysis"""
+    companyName: RequiredStr
+    docTitle: OptionalStr = ''
+    docType: OptionalStr = ''
+    year: OptionalStr = ''
+
+
+class ChatBody(BaseModel):
+    """JSON body for /chat"""
+    sessionId: RequiredStr
+    userMessage: RequiredStr
+
+
+class EndSessionBody(BaseModel):
+    """JSON body for /end-session"""
+    sessionId: RequiredStr
+
+
+def _validate_request(model, data):
+    """
+    Validate request data against a body model.
+    Returns (body, None) on success or (None, error_response) with a 400 on failure.
+    """
+    if not isinstance(data, dict):
+        return None, (jsonify({'error': 'Request body must be JSON'}), 400)
+    try:
+        return model.model_validate(data), None
+    except ValidationError as e:
+        missing = [str(error['loc'][0]) for error in e.errors() if error['type'] in ('missing', 'string_too_short')]
+        if missing:
+            field_label = 'field' if len(missing) == 1 else 'fields'
+            return None, (jsonify({'error': f"Missing required {field_label}: {', '.join(missing)}"}), 400)
+        invalid = [str(error['loc'][0]) for error in e.errors()]
+        return None, (jsonify({'error': f"Invalid fields: {', '.join(invalid)}"}), 400)
+
+
 # Health check endpoint (fallback if FastAPI route doesn't work)
 @app.route('/health', methods=['GET'])
 def health_check_flask():
@@ -69,15 +182,10 @@ def search_company_endpoint():
         suggestions = company_service.get_suggestions(query, max_results=50)
         
         # Convert list of tuples to list of dictionaries
-        results = [
-            {
-                'company_name': company_name,
-                'ticker': ticker
-            }
+        return _json_response([
+            {'company_name': company_name, 'ticker': ticker}
             for company_name, ticker in suggestions
-        ]
-        
-        return jsonify(results)
+        ])
     except Exception as e:
         return jsonify({'error': f'Failed to search companies: {str(e)}'}), 500
 
@@ -110,27 +218,160 @@ def get_filings_endpoint():
         
         # The filings list already contains dictionaries with form_type, filing_date, and accession_number
         # Return as-is (it's already in the correct format)
-        return jsonify(filings)
+        return _json_response(filings)
     except Exception as e:
         return jsonify({'error': f'Failed to retrieve filings: {str(e)}'}), 500
 
 
+def _write_temp_bytes(data: bytes, suffix: str) -> str:
+    """
+    Writes bytes to a new temporary file with unbuffered os.write calls.
+    
+    Args:
+        data: Content to write
+        suffix: Temp file suffix (e.g. '.txt')
+    
+    Returns:
+        str: Path to the temp file (caller deletes it)
+    """
+    fd, path = tempfile.mkstemp(suffix=suffix)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+    return path
+
+
+def _truncate_words(text: str, max_words: int) -> str:
+    """
+    Truncate text to its first max_words words, joined by single spaces.
+    split(None, max_words) stops after max_words splits, so long text is not
+    split into a full word list.
+    """
+    return ' '.join(text.split(None, max_words)[:max_words])
+
+
 # Vector Store Manager for RAG
-_vector_stores = {}  # session_id -> file_path mapping (we'll use file-based RAG for now)
+# session_id -> vector store dict (FAISS index + chunks, or file path only), in LRU order.
+# Bounded at MAX_VECTOR_STORES; evicted indices remain on disk and reload on demand.
+MAX_VECTOR_STORES = 64
+_vector_stores = OrderedDict()
+_vector_stores_lock = threading.RLock()
+# cache_key -> [lock, sessions using it], so concurrent sessions on the same filing build
+# its index only once; an entry is dropped when its last session is done with it
+_vector_store_build_locks: Dict[str, list] = {}
+
+def _index_cache_key(metadata: Dict) -> Optional[str]:
+    """
+    Get the on-disk index cache key for a conversation's metadata.
+    SEC filings are keyed by (cik, accession_number), uploads by the sha256 of the file.
+    """
+    if metadata.get('cik') and metadata.get('accession_number'):
+        return vector_service.sec_cache_key(metadata['cik'], metadata['accession_number'])
+    if metadata.get('file_sha256'):
+        return vector_service.upload_cache_key(metadata['file_sha256'])
+    return None
+
 
-def _initialize_vector_store(session_id: str, file_path: str) -> None:
+def _put_vector_store(session_id: str, store: Dict) -> None:
+    """
+    Store a session's vector store, evicting the least recently used ones past
+    MAX_VECTOR_STORES. Evicted indices are written to the on-disk cache if missing.
+    """
+    evicted = []
+    with _vector_stores_lock:
+        _vector_stores[session_id] = store
+        _vector_stores.move_to_end(session_id)
+        while len(_vector_stores) > MAX_VECTOR_STORES:
+            evicted.append(_vector_stores.popitem(last=False)[1])
+
+    for old_store in evicted:
+        cache_key = old_store.get('cache_key')
+        if old_store.get('index') is not None and cache_key and not vector_service.is_index_cached(cache_key):
+            vector_service.save_index(old_store, cache_key)
+
+
+def _find_vector_store(cache_key: str) -> Optional[Dict]:
+    """Find an in-memory vector store for the same document (another session's)"""
+    with _vector_stores_lock:
+        for store in _vector_stores.values():
+            if store.get('cache_key') == cache_key and store.get('index') is not None:
+                return store
+    return None
+
+
+def _remove_vector_store(session_id: str) -> None:
+    """Drop a session's in-memory vector store (the on-disk index is kept)"""
+    with _vector_stores_lock:
+        _vector_stores.pop(session_id, None)
+
+
+def _initialize_vector_store(session_id: str, file_path: str, cache_key: Optional[str] = None) -> None:
     """
     Initialize vector store for a session.
-    For now, we'll store the file path and use Gemini's file-based RAG.
-    In a production system, you'd use ChromaDB or FAISS here.
+    Builds a FAISS index over the processed document so chat turns only send
+    the most relevant excerpts to Gemini. With a cache_key, the index is shared
+    with other in-memory sessions on the same document and reused from (or
+    persisted to) disk. If the vector dependencies are missing or indexing
+    fails, falls back to whole-file context (index is None).
     """
-    _vector_stores[session_id] = file_path
-    print(f"✓ Vector store initialized for session: {session_id}")
+    store = {'file_path': file_path, 'index': None}
+    if vector_service.is_available():
+        try:
+            if cache_key:
+                with _vector_stores_lock:
+                    build_lock = _vector_store_build_locks.setdefault(cache_key, [threading.Lock(), 0])
+                    build_lock[1] += 1
+                try:
+                    with build_lock[0]:
+                        store = _find_vector_store(cache_key) or vector_service.build_index(file_path, cache_key=cache_key)
+                        # Publish before releasing the lock, so waiting sessions find it instead of rebuilding
+                        _put_vector_store(session_id, store)
+                finally:
+                    with _vector_stores_lock:
+                        build_lock[1] -= 1
+                        if build_lock[1] == 0:
+                            _vector_store_build_locks.pop(cache_key, None)
+            else:
+                store = vector_service.build_index(file_path)
+        except Exception as e:
+            logger.warning("⚠ Vector indexing failed, using whole-file context: %s", e)
+    else:
+        logger.warning("⚠ faiss/sentence-transformers not installed, using whole-file context")
 
+    _put_vector_store(session_id, store)
+    logger.info("✓ Vector store initialized for session: %s", session_id)
 
-def _get_vector_store(session_id: str) -> Optional[str]:
-    """Get the file path for a session's vector store"""
-    return _vector_stores.get(session_id)
+
+def _get_vector_store(session_id: str) -> Optional[Dict]:
+    """
+    Get the vector store for a session.
+    After a restart or LRU eviction the in-memory store is gone, so an active
+    session's index is reloaded lazily from the on-disk cache.
+    """
+    with _vector_stores_lock:
+        store = _vector_stores.get(session_id)
+        if store is not None:
+            _vector_stores.move_to_end(session_id)
+            return store
+
+    try:
+        conversation = db_service.get_conversation(session_id)
+    except Exception as e:
+        logger.warning("⚠ Could not look up session %s: %s", session_id, e)
+        return None
+    if not conversation or not conversation.get('is_active'):
+        return None
+
+    cache_key = _index_cache_key(conversation.get('metadata', {}))
+    if not cache_key:
+        return None
+    store = _find_vector_store(cache_key) or vector_service.load_index(cache_key)
+    if store is not None:
+        _put_vector_store(session_id, store)
+    return store
 
 
 @app.route('/start-analysis', methods=['POST'])
@@ -142,21 +383,23 @@ def start_analysis_endpoint():
         ticker: Company ticker symbol
         companyName: Company name
         filingId: SEC accession number (e.g., '0000320193-24-000001')
+        filingDate: Optional filing date (YYYY-MM-DD) from /get-filings
+        formType: Optional form type (e.g., '10-K') from /get-filings
     
     Returns:
         JSON with sessionId and status
     """
     try:
-        data = request.get_json()
-        if not data:
-            return jsonify({'error': 'Request body must be JSON'}), 400
-        
-        ticker = data.get('ticker', '').strip()
-        company_name = data.get('companyName', '').strip()
-        filing_id = data.get('filingId', '').strip()  # This is the accession_number
+        body, error_response = _validate_request(StartAnalysisBody, request.get_json(silent=True))
+        if error_response:
+            return error_response
         
-        if not ticker or not company_name or not filing_id:
-            return jsonify({'error': 'Missing required fields: ticker, companyName, filingId'}), 400
+        ticker = body.ticker
+        company_name = body.companyName
+        filing_id = body.filingId  # This is the accession_number
+        # Optional: the frontend already has these from /get-filings, which lets us skip the lookup
+        filing_date = body.filingDate
+        form_type = body.formType
         
         # Step 1: Get CIK from ticker
         cik = sec_service.get_company_cik(ticker)
@@ -164,7 +407,7 @@ def start_analysis_endpoint():
             return jsonify({'error': f'Could not find CIK for ticker: {ticker}'}), 404
         
         # Step 2: Download/Extract text from SEC filing
-        print(f"Downloading filing: {filing_id}")
+        logger.info("Downloading filing: %s", filing_id)
         file_path = sec_service.download_filing_as_text(filing_id, cik=cik)
         if not file_path:
             return jsonify({'error': f'Failed to download filing: {filing_id}'}), 500
@@ -172,36 +415,42 @@ def start_analysis_endpoint():
         # Step 3: Initialize vector store (store file path for RAG)
         session_id = None
         try:
-            # Step 4: Generate executive summary (150 words)
-            print(f"Generating executive summary...")
-            summary = gemini_service.generate_file_summary(
-                file_path,
-                company_name=company_name,
-                doc_type='SEC Filing'
-            )
-            # Ensure exactly 150 words (truncate if longer, pad if shorter)
-            summary_words = summary.split()
-            if len(summary_words) > 150:
-                summary_words = summary_words[:150]
-            executive_summary = ' '.join(summary_words)
+            # Steps 4-6 are independent once the file is on disk, so run them concurrently:
+            # executive summary (Gemini), latest 6 news headlines, and the filings list
+            # (for the filing date and form type, if not supplied in the request)
+            logger.info("Generating executive summary and fetching news articles...")
+            with ThreadPoolExecutor(max_workers=3) as executor:
+                summary_future = executor.submit(
+                    gemini_service.generate_file_summary,
+                    file_path,
+                    company_name=company_name,
+                    doc_type='SEC Filing'
+                )
+                news_future = executor.submit(news_service.get_company_intelligence, company_name, limit=6)
+                filings_future = None
+                if not (filing_date and form_type):
+                    filings_future = executor.submit(sec_service.get_filings_list, cik, years=3)
+            
+            # Step 4: Executive summary (150 words)
+            summary = summary_future.result()
+            # Ensure at most 150 words (truncate if longer)
+            executive_summary = _truncate_words(summary, EXECUTIVE_SUMMARY_WORDS)
             
-            # Step 5: Fetch latest 6 news headlines
-            print(f"Fetching news articles...")
-            news_articles = news_service.get_company_intelligence(company_name)
-            top_6_news = news_articles[:6] if len(news_articles) > 6 else news_articles
+            # Step 5: Latest 6 news headlines
+            top_6_news = news_future.result()
             
             # Step 6: Get filing date and form type from filings list (more accurate)
-            filing_date = 'Unknown'
-            form_type = 'SEC Filing'
-            try:
-                filings = sec_service.get_filings_list(cik, years=3)
-                for filing in filings:
-                    if filing.get('accession_number') == filing_id:
-                        filing_date = filing.get('filing_date', 'Unknown')
-                        form_type = filing.get('form_type', 'SEC Filing')
-                        break
-            except:
-                pass
+            # unless the request already supplied them
+            if filings_future is not None:
+                filing_date = 'Unknown'
+                form_type = 'SEC Filing'
+                try:
+                    filings_by_accession = {f.get('accession_number'): f for f in filings_future.result()}
+                    filing = filings_by_accession.get(filing_id, {})
+                    filing_date = filing.get('filing_date', 'Unknown')
+                    form_type = filing.get('form_type', 'SEC Filing')
+                except:
+                    pass
             
             # Step 7: Create conversation in MongoDB
             metadata = {
@@ -217,8 +466,8 @@ def start_analysis_endpoint():
             
             session_id = db_service.create_conversation('SEC', metadata)
             
-            # Step 8: Initialize vector store for this session
-            _initialize_vector_store(session_id, file_path)
+            # Step 8: Initialize vector store for this session (index cached per filing)
+            _initialize_vector_store(session_id, file_path, cache_key=_index_cache_key(metadata))
             
             # Step 9: Create active session with file path
             db_service.create_active_session(session_id, [file_path])
@@ -241,8 +490,7 @@ def start_analysis_endpoint():
             raise e
             
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Request failed")
         return jsonify({'error': f'Failed to start analysis: {str(e)}'}), 500
 
 
@@ -271,13 +519,14 @@ def upload_analysis_endpoint():
             return jsonify({'error': 'No file selected'}), 400
         
         # Get metadata from form
-        company_name = request.form.get('companyName', '').strip()
-        doc_title = request.form.get('docTitle', '').strip()
-        doc_type = request.form.get('docType', '').strip()
-        year_str = request.form.get('year', '').strip()
+        form, error_response = _validate_request(UploadForm, request.form.to_dict())
+        if error_response:
+            return error_response
         
-        if not company_name:
-            return jsonify({'error': 'Missing required field: companyName'}), 400
+        company_name = form.companyName
+        doc_title = form.docTitle
+        doc_type = form.docType
+        year_str = form.year
         
         # Validate and parse year
         try:
@@ -291,54 +540,57 @@ def upload_analysis_endpoint():
         if file_ext not in ['.txt', '.pdf']:
             return jsonify({'error': f'Unsupported file type: {file_ext}. Only .txt and .pdf are supported.'}), 400
         
-        # Save file to temporary directory
+        # Save file to temporary directory (kept for the View Source button)
+        raw_bytes = None
         temp_file = tempfile.NamedTemporaryFile(mode='wb', suffix=file_ext, delete=False)
-        file.save(temp_file.name)
-        temp_file.close()
+        with temp_file:
+            if file_ext == '.txt':
+                # Text uploads are processed from memory, so read them once and
+                # write the raw copy, instead of reading it back from disk
+                raw_bytes = file.stream.read()
+                temp_file.write(raw_bytes)
+            else:
+                # Copy in 1MB blocks (FileStorage.save() uses a 16KB buffer)
+                if hasattr(os, 'posix_fadvise'):
+                    os.posix_fadvise(temp_file.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                shutil.copyfileobj(file.stream, temp_file, length=UPLOAD_COPY_BUFFER_SIZE)
         file_path = temp_file.name
         
-        print(f"Saved uploaded file to: {file_path}")
+        logger.info("Saved uploaded file to: %s", file_path)
         
         session_id = None
         try:
             # Extract text from file
-            print(f"Extracting text from {file_ext} file...")
+            logger.info("Extracting text from %s file...", file_ext)
             if file_ext == '.txt':
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    text_content = f.read()
+                text_content = raw_bytes.decode('utf-8')
                 processed_content = upload_service.process_txt_file_content(text_content)
-                # Create a temp file with processed content for Gemini
-                temp_processed = tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False, encoding='utf-8')
-                temp_processed.write(processed_content)
-                temp_processed.close()
-                processed_path = temp_processed.name
+                # Create a temp file with processed content for Gemini (encoded in one pass)
+                processed_path = _write_temp_bytes(processed_content.encode('utf-8'), '.txt')
             elif file_ext == '.pdf':
-                processed_content = upload_service.process_pdf_file(file_path)
-                # Clean up messy tables
-                processed_content = upload_service.clean_markdown_table(processed_content)
-                # Create a temp file with processed content for Gemini (PDFs become Markdown)
+                # Create a temp file for Gemini (PDFs become Markdown) and stream the
+                # converted pages through the table cleaner straight into it
                 temp_processed = tempfile.NamedTemporaryFile(mode='w', suffix='.md', delete=False, encoding='utf-8')
-                temp_processed.write(processed_content)
-                temp_processed.close()
                 processed_path = temp_processed.name
+                with temp_processed:
+                    upload_service.clean_markdown_stream(
+                        upload_service.iter_pdf_markdown(file_path),
+                        temp_processed
+                    )
             
             # Generate executive summary (150 words)
-            print(f"Generating executive summary...")
+            logger.info("Generating executive summary...")
             summary = gemini_service.generate_file_summary(
                 processed_path,
                 company_name=company_name,
                 doc_type=doc_type or 'Local Upload'
             )
-            # Ensure exactly 150 words (truncate if longer, pad if shorter)
-            summary_words = summary.split()
-            if len(summary_words) > 150:
-                summary_words = summary_words[:150]
-            executive_summary = ' '.join(summary_words)
+            # Ensure at most 150 words (truncate if longer)
+            executive_summary = _truncate_words(summary, EXECUTIVE_SUMMARY_WORDS)
             
             # Fetch latest 6 news headlines
-            print(f"Fetching news articles...")
-            news_articles = news_service.get_company_intelligence(company_name)
-            top_6_news = news_articles[:6] if len(news_articles) > 6 else news_articles
+            logger.info("Fetching news articles...")
+            top_6_news = news_service.get_company_intelligence(company_name, limit=6)
             
             # Create conversation in MongoDB with source: 'local_upload'
             # Required fields for UPLOAD workflow: company, year, doc_type, original_filename
@@ -351,13 +603,15 @@ def upload_analysis_endpoint():
                 'executive_summary': executive_summary,
                 'news_articles': top_6_news,
                 'source': 'local_upload',
-                'raw_file_path': file_path  # Save raw file path for View Source button
+                'raw_file_path': file_path,  # Save raw file path for View Source button
+                # Index cache key
+                'file_sha256': hashlib.sha256(raw_bytes).hexdigest() if raw_bytes is not None else vector_service.file_sha256(file_path)
             }
             
             session_id = db_service.create_conversation('UPLOAD', metadata)
             
             # Initialize vector store for this session (use processed path for RAG)
-            _initialize_vector_store(session_id, processed_path)
+            _initialize_vector_store(session_id, processed_path, cache_key=_index_cache_key(metadata))
             
             # Create active session with both raw and processed file paths
             db_service.create_active_session(session_id, [file_path, processed_path])
@@ -385,8 +639,7 @@ def upload_analysis_endpoint():
             raise e
             
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Request failed")
         return jsonify({'error': f'Failed to process upload: {str(e)}'}), 500
 
 
@@ -403,34 +656,42 @@ def chat_endpoint():
         JSON with assistantResponse and references
     """
     try:
-        data = request.get_json()
-        if not data:
-            return jsonify({'error': 'Request body must be JSON'}), 400
-        
-        session_id = data.get('sessionId', '').strip()
-        user_message = data.get('userMessage', '').strip()
+        body, error_response = _validate_request(ChatBody, request.get_json(silent=True))
+        if error_response:
+            return error_response
         
-        if not session_id or not user_message:
-            return jsonify({'error': 'Missing required fields: sessionId, userMessage'}), 400
+        session_id = body.sessionId
+        user_message = body.userMessage
         
-        # Step 1: Retrieve vector store context (file path) for this session
-        file_path = _get_vector_store(session_id)
-        if not file_path or not os.path.exists(file_path):
+        # Step 1: Retrieve vector store for this session
+        store = _get_vector_store(session_id)
+        if not store:
+            return jsonify({'error': f'Vector store not found for session: {session_id}'}), 404
+        if store['index'] is None and not os.path.exists(store['file_path']):
             return jsonify({'error': f'Vector store not found for session: {session_id}'}), 404
         
         # Step 2: Query Gemini using RAG (Context + User Question)
-        print(f"Processing chat query for session: {session_id}")
-        answer, references, chat_history = gemini_service.get_gemini_response(
-            user_message,
-            [file_path],  # Pass file path for RAG
-            chat_history=None  # Could retrieve from MongoDB if needed
-        )
+        logger.info("Processing chat query for session: %s", session_id)
+        if store['index'] is not None:
+            # Retrieve only the top-K relevant chunks
+            context_block = vector_service.build_context(store, user_message)
+            answer, references, chat_history = gemini_service.get_context_response(
+                user_message,
+                context_block,
+                chat_history=None  # Could retrieve from MongoDB if needed
+            )
+        else:
+            answer, references, chat_history = gemini_service.get_gemini_response(
+                user_message,
+                [store['file_path']],  # Pass file path for whole-file context
+                chat_history=None  # Could retrieve from MongoDB if needed
+            )
         
         # Step 3: Save user message and assistant response to MongoDB
         try:
             db_service.add_message_to_conversation(session_id, 'user', user_message)
         except Exception as e:
-            print(f"Warning: Failed to save user message to conversation {session_id}: {str(e)}")
+            logger.warning("Failed to save user message to conversation %s: %s", session_id, e)
             # Continue anyway - don't block the chat response
         
         # Combine answer and references for storage
@@ -442,7 +703,7 @@ def chat_endpoint():
         try:
             db_service.add_message_to_conversation(session_id, 'assistant', combined_content)
         except Exception as e:
-            print(f"Warning: Failed to save assistant message to conversation {session_id}: {str(e)}")
+            logger.warning("Failed to save assistant message to conversation %s: %s", session_id, e)
             # Continue anyway - don't block the chat response
         
         # Step 4: Return response
@@ -453,11 +714,57 @@ def chat_endpoint():
         }), 200
         
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Request failed")
         return jsonify({'error': f'Failed to process chat: {str(e)}'}), 500
 
 
+# Background workers for /end-session cleanup
+END_SESSION_WORKERS = 4
+_end_session_pool = ThreadPoolExecutor(max_workers=END_SESSION_WORKERS)
+
+
+def _finish_end_session(session_id: str, object_id, raw_file_path: Optional[str]) -> None:
+    """
+    Cleanup for /end-session, run on _end_session_pool after the response is sent.
+    Deletes the uploaded file, ends the chat session (temp files, archiving) and
+    marks the conversation as archived.
+    """
+    # Step 3: Delete the uploaded file if raw_file_path exists
+    if raw_file_path:
+        try:
+            if os.path.exists(raw_file_path):
+                os.remove(raw_file_path)
+                logger.info("✓ Deleted uploaded file: %s", raw_file_path)
+            else:
+                logger.warning("⚠ Uploaded file not found (already deleted?): %s", raw_file_path)
+        except Exception as e:
+            logger.error("✗ Failed to delete uploaded file %s: %s", raw_file_path, e)
+            # Continue with session cleanup even if file deletion fails
+    
+    # Step 4: End the chat session (this handles cleanup of temp files, archiving, etc.)
+    db_service.end_chat_session(session_id)
+    
+    # Step 5: Update MongoDB document to mark session as 'archived' (already done by end_chat_session, but ensure it's marked)
+    # The end_chat_session function already sets is_active = False, which effectively archives it
+    db = db_service.get_database()
+    db[db_service.CONVERSATIONS_COLLECTION].update_one(
+        {"_id": object_id},
+        {
+            "$set": {
+                "status": "archived",
+                "archived_at": datetime.utcnow()
+            }
+        }
+    )
+
+
+def _log_end_session_failure(future) -> None:
+    """Reports background /end-session cleanup failures (the client already got its response)"""
+    error = future.exception()
+    if error is not None:
+        logger.error("✗ Background session cleanup failed: %s", error, exc_info=error)
+
+
 @app.route('/end-session', methods=['POST'])
 def end_session_endpoint():
     """
@@ -470,14 +777,11 @@ def end_session_endpoint():
         JSON with success status
     """
     try:
-        data = request.get_json()
-        if not data:
-            return jsonify({'error': 'Request body must be JSON'}), 400
-        
-        session_id = data.get('sessionId', '').strip()
+        body, error_response = _validate_request(EndSessionBody, request.get_json(silent=True))
+        if error_response:
+            return error_response
         
-        if not session_id:
-            return jsonify({'error': 'Missing required field: sessionId'}), 400
+        session_id = body.sessionId
         
         # Step 1: Retrieve the conversation document from MongoDB
         db = db_service.get_database()
@@ -502,37 +806,13 @@ def end_session_endpoint():
         metadata = conversation.get('metadata', {})
         raw_file_path = metadata.get('raw_file_path')
         
-        # Step 3: Delete the uploaded file if raw_file_path exists
-        if raw_file_path:
-            try:
-                if os.path.exists(raw_file_path):
-                    os.remove(raw_file_path)
-                    print(f"✓ Deleted uploaded file: {raw_file_path}")
-                else:
-                    print(f"⚠ Uploaded file not found (already deleted?): {raw_file_path}")
-            except Exception as e:
-                print(f"✗ Failed to delete uploaded file {raw_file_path}: {e}")
-                # Continue with session cleanup even if file deletion fails
-        
-        # Step 4: End the chat session (this handles cleanup of temp files, archiving, etc.)
-        db_service.end_chat_session(session_id)
-        
-        # Step 5: Update MongoDB document to mark session as 'archived' (already done by end_chat_session, but ensure it's marked)
-        # The end_chat_session function already sets is_active = False, which effectively archives it
-        # We can add an explicit 'status' field if needed
-        conversations_collection.update_one(
-            {"_id": object_id},
-            {
-                "$set": {
-                    "status": "archived",
-                    "archived_at": datetime.utcnow()
-                }
-            }
-        )
+        # Drop the in-memory handle; the on-disk index is kept for reuse by later sessions
+        _remove_vector_store(session_id)
         
-        # Also remove from vector stores if present
-        if session_id in _vector_stores:
-            del _vector_stores[session_id]
+        # Steps 3-5 (file deletion, archiving) run in the background - the client
+        # doesn't wait on disk deletes and MongoDB round-trips
+        future = _end_session_pool.submit(_finish_end_session, session_id, object_id, raw_file_path)
+        future.add_done_callback(_log_end_session_failure)
         
         return jsonify({
             'success': True,
@@ -540,8 +820,7 @@ def end_session_endpoint():
         }), 200
         
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Request failed")
         return jsonify({'error': f'Failed to end session: {str(e)}'}), 500
 
 
@@ -557,12 +836,149 @@ def print_step(step_num: int, message: str, status: str = "info"):
     print(f"[{step_num:02d}] {symbol} {message}")
 
 
+def prompt_with_timeout(message: str, timeout: float = MENU_INPUT_TIMEOUT) -> str:
+    """
+    Reads one line from stdin, giving up after `timeout` seconds.
+    
+    Uses select() on an interactive POSIX terminal. On Windows, or when stdin is a pipe
+    (where Python may already have buffered the next lines), the line is read on a
+    daemon thread and waited for through a queue instead.
+    
+    Args:
+        message: Prompt text to display
+        timeout: Seconds to wait for input
+    
+    Returns:
+        str: The stripped input line
+    
+    Raises:
+        TimeoutError: If no input arrives within `timeout` seconds
+        EOFError: If stdin is closed
+    """
+    sys.stdout.write(message)
+    sys.stdout.flush()
+    
+    if os.name != 'nt' and sys.stdin.isatty():
+        readable, _, _ = select.select([sys.stdin], [], [], timeout)
+        if not readable:
+            raise TimeoutError(f"No input received within {timeout} seconds")
+        line = sys.stdin.readline()
+    else:
+        lines = queue.Queue()
+        threading.Thread(target=lambda: lines.put(sys.stdin.readline()), daemon=True).start()
+        try:
+            line = lines.get(timeout=timeout)
+        except queue.Empty:
+            raise TimeoutError(f"No input received within {timeout} seconds")
+    
+    if not line:
+        raise EOFError("stdin closed")
+    return line.strip()
+
+
+def create_chat_prompt():
+    """
+    Returns a callable that reads one line of chat input.
+    Uses a prompt_toolkit session when available, otherwise falls back to input().
+    
+    While the prompt_toolkit prompt is waiting, output from background threads
+    (inactivity cleanup, follow-up prefetch, retry notices) is printed above the
+    prompt instead of through the line being typed. stdout is only patched while
+    waiting for input, so streamed answers are written directly.
+    """
+    if PromptSession is not None and sys.stdin.isatty():
+        try:
+            session = PromptSession()
+        except Exception:
+            return input
+        
+        def read_chat_input(message: str) -> str:
+            with patch_stdout():
+                return session.prompt(message)
+        
+        return read_chat_input
+    return input
+
+
+# Section markers in Gemini responses and how they are shown while streaming
+STREAM_MARKERS = (('[CHAT_RESPONSE]', ''), ('[REFERENCES]', 'REFERENCES:'))
+
+
+def create_stream_printer():
+    """
+    Returns (on_chunk, finish) callables that write a streamed Gemini response to stdout
+    as it arrives.
+    
+    Markers are replaced in the pending text, not per chunk, so a marker split across
+    two chunks is still replaced: a tail that could be the start of a marker is held
+    back until the next chunk. finish() writes whatever is still held back.
+    """
+    pending = ['']
+    
+    def write(text: str) -> None:
+        sys.stdout.write(text)
+        sys.stdout.flush()
+    
+    def on_chunk(text: str) -> None:
+        buffer = pending[0] + text
+        for marker, replacement in STREAM_MARKERS:
+            buffer = buffer.replace(marker, replacement)
+        
+        # Hold back a tail that could be the start of a marker (it begins at the last '[')
+        held = ''
+        start = buffer.rfind('[')
+        if start != -1 and any(marker.startswith(buffer[start:]) for marker, _ in STREAM_MARKERS):
+            held = buffer[start:]
+        pending[0] = held
+        write(buffer[:len(buffer) - len(held)])
+    
+    def finish() -> None:
+        write(pending[0])
+        pending[0] = ''
+    
+    return on_chunk, finish
+
+
+def print_cached_answer(answer: str, references: str) -> None:
+    """Prints an answer served from the semantic answer cache"""
+    print("\n" + "="*80)
+    print("ASSISTANT (cached):")
+    print("="*80)
+    print(answer)
+    if references:
+        print("---\nREFERENCES:")
+        print(references)
+    print("="*80 + "\n")
+
+
+# Host part of a URL, without scheme, "www.", credentials or port
+_HOST_RE = re.compile(r'^(?:https?://)?(?:[^/@]*@)?(?:www\.)?([^/:?#]+)', re.IGNORECASE)
+
+
+@lru_cache(maxsize=256)
+def extract_source(link: str) -> str:
+    """
+    Extracts the news source (main domain, e.g. reuters.com) from an article URL.
+    Cached, since most articles come from a handful of hosts.
+
+    Args:
+        link: Article URL (may be empty or 'N/A')
+
+    Returns:
+        str: Main domain (last two host labels), or 'Unknown'
+    """
+    match = _HOST_RE.match(link or '')
+    parts = match.group(1).lower().split('.') if match else []
+    return '.'.join(parts[-2:]) if len(parts) >= 2 else 'Unknown'
+
+
 def format_news_for_gemini(news_articles: List[Dict[str, str]]) -> str:
     """
     Formats news articles into a context string for Gemini.
     
     Args:
-        news_articles: List of news article dictionaries with keys: 'title', 'url', 'published_at'
+        news_articles: List of news article dictionaries with keys: 'title', 'url', 'published_at'.
+            Expected to be pre-trimmed by news_service.get_company_intelligence(limit=...).
     
     Returns:
         str: Formatted news context string
@@ -571,7 +987,7 @@ def format_news_for_gemini(news_articles: List[Dict[str, str]]) -> str:
         return "No recent news articles found."
     
     formatted = "Recent News Articles:\n\n"
-    for i, article in enumerate(news_articles[:10], 1):
+    for i, article in enumerate(news_articles, 1):
         # news_service.get_company_intelligence() returns: 'title', 'url', 'published_at'
         title = article.get('title', 'No headline')
         date = article.get('published_at', 'N/A')
@@ -582,68 +998,333 @@ def format_news_for_gemini(news_articles: List[Dict[str, str]]) -> str:
 
 
 def check_session_lock() -> bool:
-    """Check if there's an active session"""
-    try:
-        return db_service.is_session_active()
-    except Exception as e:
-        print(f"✗ Error checking session lock: {e}")
-        return False
+    """Check if there's an active session (reuses the cached session lookup)"""
+    return get_active_session_info() is not None
+
+
+# In-process cache for get_active_session_info() (cleared by cleanup_session)
+_active_session_cache: Dict[str, Optional[Dict]] = {}
 
 
 def get_active_session_info() -> Optional[Dict]:
-    """Get active session information (chat_id and temp_file_paths)"""
+    """
+    Get active session information (chat_id, temp_file_paths and saved chat_turns).
+    
+    The lookup is cached in-process so the startup lock check and the terminate
+    option share a single MongoDB round trip. Failed lookups are not cached.
+    """
+    if 'info' in _active_session_cache:
+        return _active_session_cache['info']
+    
     try:
         db = db_service.get_database()
         collection = db[db_service.ACTIVE_SESSIONS_COLLECTION]
         
         session = collection.find_one({})
         if session:
-            return {
+            info = {
                 'chat_id': session.get('chat_id'),
-                'temp_file_paths': session.get('temp_file_paths', [])
+                'temp_file_paths': session.get('temp_file_paths', []),
+                'chat_turns': session.get('chat_turns')
             }
-        return None
+        else:
+            info = None
+        _active_session_cache['info'] = info
+        return info
     except Exception as e:
         print(f"✗ Error getting active session info: {e}")
         return None
 
 
-def cleanup_session(chat_id: str, temp_file_paths: List[str]) -> None:
+def clear_active_session_cache() -> None:
+    """Drops the cached active session lookup so the next call hits MongoDB"""
+    _active_session_cache.clear()
+
+
+def start_news_fetch(company_name: str, limit: int = 10):
+    """
+    Starts fetching news articles on a background thread.
+    The workflows start this before summary generation (news doesn't depend on it)
+    and call .result() on the returned Future when they reach the news step.
+    
+    Args:
+        company_name: Company name to search news for
+        limit: Maximum number of articles to return
+    
+    Returns:
+        Future: Resolves to the list from news_service.get_company_intelligence()
+    """
+    executor = ThreadPoolExecutor(max_workers=1)
+    future = executor.submit(news_service.get_company_intelligence, company_name, limit=limit)
+    executor.shutdown(wait=False)  # The submitted fetch still runs to completion
+    return future
+
+
+def _delete_temp_file(file_path: str) -> Optional[bool]:
+    """Deletes one temp file. Returns True if deleted, False on failure, None if missing."""
+    try:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+            print(f"✓ Deleted file: {file_path}")
+            return True
+        return None
+    except Exception as e:
+        print(f"✗ Failed to delete {file_path}: {e}")
+        return False
+
+
+def delete_temp_files(temp_file_paths: List[str]) -> None:
+    """
+    Deletes temporary files, reporting each result.
+    Multiple files are removed concurrently so cleanup time doesn't grow with file count.
+    
+    Args:
+        temp_file_paths: List of temporary file paths to delete
+    """
+    if len(temp_file_paths) > 1:
+        max_workers = min(len(temp_file_paths), MAX_CLEANUP_WORKERS)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(_delete_temp_file, temp_file_paths))
+    else:
+        results = [_delete_temp_file(file_path) for file_path in temp_file_paths]
+    
+    deleted_count = results.count(True)
+    failed_count = results.count(False)
+    print(f"✓ Cleanup complete: {deleted_count} deleted, {failed_count} failed")
+
+
+def cleanup_session(chat_id: str, temp_file_paths: List[str], background_files: bool = False) -> None:
     """
     Performs complete cleanup: deletes files, archives conversation, removes session.
     
     Args:
         chat_id: The conversation ID
         temp_file_paths: List of temporary file paths to delete
+        background_files: If True, delete files on a background thread and return as soon as
+            the conversation is archived. The thread is non-daemon, so deletions still finish
+            before the process exits.
     """
     print("\n" + "="*80)
     print("CLEANUP: Ending chat session")
     print("="*80)
     
     # Step 1: Delete all temporary files
-    deleted_count = 0
-    failed_count = 0
-    for file_path in temp_file_paths:
-        try:
-            if os.path.exists(file_path):
-                os.remove(file_path)
-                print(f"✓ Deleted file: {file_path}")
-                deleted_count += 1
-        except Exception as e:
-            print(f"✗ Failed to delete {file_path}: {e}")
-            failed_count += 1
-    
-    print(f"✓ Cleanup complete: {deleted_count} deleted, {failed_count} failed")
+    if background_files:
+        threading.Thread(target=delete_temp_files, args=(list(temp_file_paths),)).start()
+    else:
+        delete_temp_files(temp_file_paths)
     
     # Step 2 & 3: End chat session (this handles archiving conversation and removing session)
+    # Files are already handled above, so the DB cleanup doesn't delete them a second time
     try:
-        db_service.end_chat_session(chat_id)
+        db_service.end_chat_session(chat_id, delete_files=False)
     except Exception as e:
         print(f"✗ Failed to end chat session: {e}")
+    finally:
+        clear_active_session_cache()
     
     print("✓ Cleanup complete")
 
 
+def _display_news(news_articles: List[Dict[str, str]]) -> None:
+    """
+    Prints the fetched news articles (headline, source, date, link).
+
+    Args:
+        news_articles: Articles from news_service.get_company_intelligence()
+    """
+    if news_articles:
+        print("\n" + "="*80)
+        print("NEWS ARTICLES")
+        print("="*80)
+        for i, article in enumerate(news_articles, 1):
+            # news_service.get_company_intelligence() returns: 'title', 'url', 'published_at'
+            headline = article.get('title', 'No headline')
+            date = article.get('published_at', 'N/A')
+            link = article.get('url', 'N/A')
+            source = extract_source(link)
+            print(f"\n{i}. {headline}")
+            print(f"   Source: {source} | Date: {date}")
+            print(f"   Link: {link}")
+        print("="*80 + "\n")
+
+
+def _inactivity_watchdog(
+    chat_id: str,
+    temp_file_paths: List[str],
+    last_activity: List[float],
+    stop: threading.Event
+) -> None:
+    """
+    Cleans up the session once INACTIVITY_TIMEOUT seconds pass without chat input.
+    Checks every INACTIVITY_TIMEOUT/4 seconds until stop is set.
+
+    Args:
+        chat_id: The conversation ID
+        temp_file_paths: Temp files to delete on cleanup
+        last_activity: One-element list holding the time.monotonic() of the last input
+        stop: Set by the chat loop when it exits
+    """
+    while not stop.wait(INACTIVITY_TIMEOUT / 4):
+        if time.monotonic() - last_activity[0] > INACTIVITY_TIMEOUT:
+            cleanup_session(chat_id, temp_file_paths)
+            return
+
+
+def _take_prefetched(prefetch, follow_up_embedding, query_embedding) -> Optional[tuple]:
+    """
+    Returns the speculative follow-up response if the user's question matches it.
+
+    Args:
+        prefetch: Future of the background get_gemini_response() call (or None)
+        follow_up_embedding: Embedding of PREFETCH_FOLLOW_UP_QUERY (or None)
+        query_embedding: Embedding of the user's question (or None)
+
+    Returns:
+        tuple: (answer, references, chat_history), or None if there is no match
+            or the speculative call failed
+    """
+    if prefetch is None or follow_up_embedding is None or query_embedding is None:
+        return None
+    if not vector_service.is_similar(query_embedding, follow_up_embedding):
+        return None
+    try:
+        return prefetch.result()  # Waits if the call is still running; still ahead of a new one
+    except Exception as e:
+        print(f"⚠ Warning: Prefetched follow-up failed: {e}")
+        return None
+
+
+def _run_chat_loop(
+    chat_id: str,
+    files: List[str],
+    temp_file_paths: List[str],
+    chat_history: Optional[List] = None
+) -> None:
+    """
+    Runs the interactive Gemini chat over the loaded files until the user exits.
+    Messages are saved to the conversation and each Gemini turn to the
+    active session (for resuming); the session is cleaned up after
+    INACTIVITY_TIMEOUT seconds without input.
+
+    Args:
+        chat_id: The conversation ID
+        files: Files passed to Gemini as context
+        temp_file_paths: Temp files to delete on inactivity cleanup
+        chat_history: Saved chat history to resume from (None starts a new chat)
+    """
+    # One watchdog thread per chat; each turn only refreshes the activity timestamp
+    last_activity = [time.monotonic()]
+    stop_watchdog = threading.Event()
+    threading.Thread(
+        target=_inactivity_watchdog,
+        args=(chat_id, temp_file_paths, last_activity, stop_watchdog),
+        daemon=True
+    ).start()
+    # Speculative follow-up call (at most one in flight)
+    prefetch_pool = ThreadPoolExecutor(max_workers=1)
+    prefetch = None
+    try:
+        # This conversation's semantic answer cache
+        answer_cache = vector_service.create_answer_cache()
+        read_chat_input = create_chat_prompt()
+        follow_up_embedding = None
+        if PREFETCH_FOLLOW_UPS and vector_service.is_available():
+            try:
+                follow_up_embedding = vector_service.embed_query(PREFETCH_FOLLOW_UP_QUERY)
+            except Exception as e:
+                print(f"⚠ Warning: Follow-up prefetch disabled: {e}")
+    
+        # Chat loop
+        while True:
+            try:
+                user_input = read_chat_input("You: ").strip()
+            
+                if not user_input:
+                    continue
+            
+                if user_input.lower() in EXIT_COMMANDS:
+                    print("\nEnding chat session...")
+                    break
+            
+                last_activity[0] = time.monotonic()
+            
+                # Save user message
+                db_service.add_message_to_conversation(chat_id, 'user', user_input)
+            
+                # Reuse the answer to a semantically identical earlier question if there is one
+                cached_answer, query_embedding = vector_service.lookup_answer(answer_cache, user_input)
+                if cached_answer:
+                    answer, references = cached_answer
+                    print_cached_answer(answer, references)
+                else:
+                    prefetched = _take_prefetched(prefetch, follow_up_embedding, query_embedding)
+                    if prefetched:
+                        answer, references, chat_history = prefetched
+                        print_cached_answer(answer, references)
+                    else:
+                        # Get response (streamed to the terminal as it arrives)
+                        print("\n🤔 Thinking...")
+                        print("\n" + "="*80)
+                        print("ASSISTANT:")
+                        print("="*80)
+                        print_chunk, finish_stream = create_stream_printer()
+                        try:
+                            answer, references, chat_history = gemini_service.get_gemini_response(
+                                user_input,
+                                files,
+                                chat_history=chat_history,
+                                on_chunk=print_chunk
+                            )
+                        except gemini_service.StreamInterruptedError as e:
+                            finish_stream()
+                            # Part of the answer is already on screen; mark it as cut off
+                            # instead of re-streaming it (the chat history is unchanged)
+                            print(f"\n\n⚠ [{e}]")
+                            print("  The answer above is incomplete - please ask again.")
+                            print("="*80 + "\n")
+                            continue
+                        finish_stream()
+                        print("\n" + "="*80 + "\n")
+                    vector_service.add_answer(answer_cache, query_embedding, answer, references)
+                    
+                    # Save this turn so an interrupted session can be resumed
+                    try:
+                        db_service.append_chat_turn(chat_id, gemini_service.serialize_last_turn(chat_history, user_input))
+                    except Exception as e:
+                        print(f"⚠ Warning: Could not save chat state: {e}")
+                    
+                    # Ask the likely follow-up while the user reads and types
+                    if follow_up_embedding is not None:
+                        if prefetch is not None:
+                            prefetch.cancel()  # Stale history; no-op if already running
+                        prefetch = prefetch_pool.submit(
+                            gemini_service.get_gemini_response,
+                            PREFETCH_FOLLOW_UP_QUERY,
+                            files,
+                            chat_history=chat_history,
+                            quiet=True
+                        )
+            
+                # Save assistant message (combine answer and references into content)
+                # db_service.add_message_to_conversation only accepts: (chat_id, role, content)
+                if references:
+                    combined_content = f"{answer}\n\n--- References ---\n{references}"
+                else:
+                    combined_content = answer
+                db_service.add_message_to_conversation(chat_id, 'assistant', combined_content)
+            
+            except KeyboardInterrupt:
+                print("\n\nInterrupted by user")
+                break
+            except Exception as e:
+                print(f"\n[99] ✗ Error in workflow: {e}")
+                break
+    finally:
+        stop_watchdog.set()
+        prefetch_pool.shutdown(wait=False, cancel_futures=True)
+
+
 def workflow_a_sec():
     """Workflow A: SEC Filing Analysis"""
     print("\n" + "="*80)
@@ -652,7 +1333,6 @@ def workflow_a_sec():
     
     temp_file_paths = []
     chat_id = None
-    inactivity_timer = None
     
     try:
         # Step 1: Pre-load company list (fetch from Wikipedia)
@@ -788,17 +1468,21 @@ def workflow_a_sec():
         # Step 6: Download selected filing
         print_step(6, f"Downloading {len(selected_indices)} selected filing(s)")
         downloaded_files = []
+        accessions = []
         for i, idx in enumerate(selected_indices, 1):
             filing = filings[idx]
-            accession = filing.get('accession_number')
-            form_type = filing.get('form_type', 'UNKNOWN')
-            filing_date = filing.get('filing_date', 'UNKNOWN')
-            
-            print(f"  [{6}.{i}] Downloading {form_type} from {filing_date}...")
-            file_path = sec_service.download_filing_as_text(accession, cik=cik)
+            accessions.append(filing.get('accession_number'))
+            print(f"  [{6}.{i}] Downloading {filing.get('form_type', 'UNKNOWN')} from {filing.get('filing_date', 'UNKNOWN')}...")
+        
+        # Multiple filings are fetched concurrently; results come back in selection order
+        file_paths = sec_service.download_filings_batch(accessions, cik=cik)
+        
+        filing_by_path = {}
+        for i, (idx, accession, file_path) in enumerate(zip(selected_indices, accessions, file_paths), 1):
             if file_path:
                 downloaded_files.append(file_path)
                 temp_file_paths.append(file_path)
+                filing_by_path[file_path] = filings[idx]
                 print(f"  [{6}.{i}] ✓ Downloaded: {os.path.basename(file_path)}")
             else:
                 print(f"  [{6}.{i}] ✗ Failed to download {accession}")
@@ -807,6 +1491,7 @@ def workflow_a_sec():
             print_step(6, "No files downloaded", "error")
             return
         print_step(6, f"Downloaded {len(downloaded_files)} file(s)", "success")
+        file_names = [os.path.basename(file_path) for file_path in downloaded_files]
         
         # Step 7: Create conversation and active session
         print_step(7, "Creating conversation record")
@@ -824,79 +1509,62 @@ def workflow_a_sec():
         db_service.create_active_session(chat_id, temp_file_paths)
         print_step(7, f"Created conversation: {chat_id}", "success")
         
+        # Fetch news in the background while summaries are generated (used in Step 9)
+        news_future = start_news_fetch(company_name, limit=10)
+        
         # Step 8: Generate summaries for each file
         print_step(8, f"Generating summaries for {len(downloaded_files)} file(s)")
-        for i, file_path in enumerate(downloaded_files, 1):
-            file_name = os.path.basename(file_path)
+        # Build the chat context in the background while summaries are generated
+        threading.Thread(target=gemini_service.warm_file_context, args=(downloaded_files,), daemon=True).start()
+        doc_types = []
+        for i, (file_path, file_name) in enumerate(zip(downloaded_files, file_names), 1):
             print(f"  [{8}.{i}] Generating summary for: {file_name}...")
             
-            # Find filing metadata
-            filing_info = None
-            for filing in filings:
-                filing_date_short = filing.get('filing_date', '').replace('-', '')
-                form_type = filing.get('form_type', '')
-                if filing_date_short in file_name and form_type in file_name:
-                    filing_info = filing
-                    break
-            
-            doc_type = filing_info.get('form_type', 'UNKNOWN') if filing_info else 'UNKNOWN'
-            
+            # Filing metadata recorded when the file was downloaded (Step 6)
+            filing_info = filing_by_path.get(file_path)
+            doc_types.append(filing_info.get('form_type', 'UNKNOWN') if filing_info else 'UNKNOWN')
+        
+        def summarize(file_path, doc_type):
+            """Returns (summary, None) or (None, error) so one failure doesn't stop the others"""
             try:
-                summary = gemini_service.generate_file_summary(
+                return gemini_service.generate_file_summary(
                     file_path,
                     company_name=company_name,
                     doc_type=doc_type
-                )
-                # Note: add_summary_to_conversation doesn't exist, so we just display it
-                print(f"  [{8}.{i}] ✓ Summary generated ({len(summary.split())} words)")
-                
-                # Display the summary
-                print(f"\n  Summary for {file_name}:")
-                print("  " + "-"*76)
-                for line in summary.split('\n'):
-                    print(f"  {line}")
-                print("  " + "-"*76 + "\n")
+                ), None
             except Exception as e:
-                print(f"  [{8}.{i}] ✗ Failed to generate summary: {e}")
+                return None, e
+        
+        # Summaries are blocking LLM calls, so multiple files run concurrently
+        # (bounded to respect Gemini's concurrent request limit); printed in file order
+        if len(downloaded_files) > 1:
+            with ThreadPoolExecutor(max_workers=min(len(downloaded_files), MAX_SUMMARY_WORKERS)) as executor:
+                results = list(executor.map(summarize, downloaded_files, doc_types))
+        else:
+            results = [summarize(file_path, doc_type) for file_path, doc_type in zip(downloaded_files, doc_types)]
+        
+        for i, (file_name, (summary, error)) in enumerate(zip(file_names, results), 1):
+            if error is not None:
+                print(f"  [{8}.{i}] ✗ Failed to generate summary: {error}")
+                continue
+            # Note: add_summary_to_conversation doesn't exist, so we just display it
+            print(f"  [{8}.{i}] ✓ Summary generated ({len(summary.split())} words)")
+            
+            # Display the summary
+            print(f"\n  Summary for {file_name}:")
+            print("  " + "-"*76)
+            print(textwrap.indent(summary, '  ', lambda line: True))
+            print("  " + "-"*76 + "\n")
         
         print_step(8, f"Completed summaries for {len(downloaded_files)} file(s)", "success")
         
         # Step 9: Fetch news articles
         print_step(9, f"Fetching news articles for: {company_name}")
-        news_articles = news_service.get_company_intelligence(company_name)
+        news_articles = news_future.result()
         news_context = format_news_for_gemini(news_articles)
         print_step(9, f"Found {len(news_articles)} news article(s)", "success")
         
-        # Display news articles (using correct keys from news_service)
-        if news_articles:
-            print("\n" + "="*80)
-            print("NEWS ARTICLES")
-            print("="*80)
-            for i, article in enumerate(news_articles, 1):
-                # news_service.get_company_intelligence() returns: 'title', 'url', 'published_at'
-                headline = article.get('title', 'No headline')
-                date = article.get('published_at', 'N/A')
-                link = article.get('url', 'N/A')
-                # Extract source from URL if available
-                source = 'Unknown'
-                if link and link != 'N/A':
-                    try:
-                        from urllib.parse import urlparse
-                        parsed = urlparse(link)
-                        domain = parsed.netloc.lower()
-                        if domain and '.' in domain:
-                            if domain.startswith('www.'):
-                                domain = domain[4:]
-                            # Get main domain (last two parts, e.g., example.com)
-                            parts = domain.split('.')
-                            if len(parts) >= 2:
-                                source = '.'.join(parts[-2:])
-                    except:
-                        source = 'Unknown'
-                print(f"\n{i}. {headline}")
-                print(f"   Source: {source} | Date: {date}")
-                print(f"   Link: {link}")
-            print("="*80 + "\n")
+        _display_news(news_articles)
         
         # Step 10: Start Gemini chat
         print_step(10, "Starting Gemini chat session")
@@ -904,74 +1572,13 @@ def workflow_a_sec():
         print("GEMINI CHAT SESSION")
         print("="*80)
         print("\nFiles loaded:")
-        for i, file_path in enumerate(downloaded_files, 1):
-            print(f"  {i}. {os.path.basename(file_path)}")
+        for i, file_name in enumerate(file_names, 1):
+            print(f"  {i}. {file_name}")
         print(f"\nNews context: {len(news_articles)} articles")
         print("\nType 'quit' or 'exit' to end the session")
         print("="*80 + "\n")
         
-        # Initialize chat history
-        chat_history = None
-        last_activity_time = time.time()
-        
-        # Chat loop
-        while True:
-            try:
-                user_input = input("You: ").strip()
-                
-                if not user_input:
-                    continue
-                
-                if user_input.lower() in ['quit', 'exit', 'q']:
-                    print("\nEnding chat session...")
-                    break
-                
-                # Update activity time
-                last_activity_time = time.time()
-                if inactivity_timer:
-                    inactivity_timer.cancel()
-                inactivity_timer = threading.Timer(INACTIVITY_TIMEOUT, lambda: cleanup_session(chat_id, temp_file_paths))
-                inactivity_timer.start()
-                
-                # Save user message
-                db_service.add_message_to_conversation(chat_id, 'user', user_input)
-                
-                # Get response
-                print("\n🤔 Thinking...")
-                answer, references, chat_history = gemini_service.get_gemini_response(
-                    user_input,
-                    downloaded_files,
-                    chat_history=chat_history
-                )
-                
-                # Save assistant message (combine answer and references into content)
-                # db_service.add_message_to_conversation only accepts: (chat_id, role, content)
-                if references:
-                    combined_content = f"{answer}\n\n--- References ---\n{references}"
-                else:
-                    combined_content = answer
-                db_service.add_message_to_conversation(chat_id, 'assistant', combined_content)
-                
-                print("\n" + "="*80)
-                print("ASSISTANT:")
-                print("="*80)
-                print(answer)
-                if references:
-                    print("\n--- References (See below for details) ---")
-                print("="*80)
-                if references:
-                    print("\nREFERENCES:")
-                    print("-" * 80)
-                    print(references)
-                    print("="*80)
-                print()
-                
-            except KeyboardInterrupt:
-                print("\n\nInterrupted by user")
-                break
-            except Exception as e:
-                print(f"\n[99] ✗ Error in workflow: {e}")
-                break
+        _run_chat_loop(chat_id, downloaded_files, temp_file_paths)
         
     except Exception as e:
         print(f"\n[99] ✗ Fatal error in workflow: {e}")
@@ -979,8 +1586,6 @@ def workflow_a_sec():
         traceback.print_exc()
     finally:
         # Cleanup
-        if inactivity_timer:
-            inactivity_timer.cancel()
         if chat_id:
             cleanup_session(chat_id, temp_file_paths)
 
@@ -993,7 +1598,6 @@ def workflow_b_upload():
     
     temp_file_paths = []
     chat_id = None
-    inactivity_timer = None
     document_id = None
     
     try:
@@ -1060,11 +1664,6 @@ def workflow_b_upload():
                 print_step(1, "Failed to retrieve document from MongoDB", "error")
                 return
             
-            processed_content = document.get('processed_content', '')
-            if not processed_content:
-                print_step(1, "No processed content found in document", "error")
-                return
-            
             # Create temporary file with processed content for Gemini
             file_ext = Path(file_path).suffix.lower()
             if file_ext == '.pdf':
@@ -1074,13 +1673,20 @@ def workflow_b_upload():
                 # TXT files keep their extension
                 temp_suffix = file_ext
             
-            temp_file = tempfile.NamedTemporaryFile(mode='w', suffix=temp_suffix, delete=False, encoding='utf-8')
-            temp_file.write(processed_content)
-            temp_file.close()
+            # Streamed from GridFS straight into the temp file (no in-memory copy)
+            temp_file = tempfile.NamedTemporaryFile(mode='wb', suffix=temp_suffix, delete=False)
+            with temp_file:
+                written = upload_service.write_processed_content(document, temp_file)
             processed_path = temp_file.name
+            processed_name = os.path.basename(processed_path)
+            
+            if not written:
+                os.remove(processed_path)
+                print_step(1, "No processed content found in document", "error")
+                return
             temp_file_paths.append(processed_path)
             
-            print_step(1, f"Created temporary file: {os.path.basename(processed_path)}", "success")
+            print_step(1, f"Created temporary file: {processed_name}", "success")
         except Exception as e:
             print_step(1, f"Failed to retrieve processed content: {e}", "error")
             import traceback
@@ -1100,9 +1706,14 @@ def workflow_b_upload():
         db_service.create_active_session(chat_id, temp_file_paths)
         print_step(2, f"Created conversation: {chat_id}", "success")
         
+        # Fetch news in the background while the summary is generated (used in Step 4)
+        news_future = start_news_fetch(company_name, limit=10)
+        
         # Step 3: Generate summary
         print_step(3, "Generating summary for uploaded file")
-        print(f"  [3.1] Generating summary for: {os.path.basename(processed_path)}...")
+        # Build the chat context in the background while the summary is generated
+        threading.Thread(target=gemini_service.warm_file_context, args=([processed_path],), daemon=True).start()
+        print(f"  [3.1] Generating summary for: {processed_name}...")
         try:
             summary = gemini_service.generate_file_summary(
                 processed_path,
@@ -1113,10 +1724,9 @@ def workflow_b_upload():
             print(f"  [3.1] ✓ Summary generated ({len(summary.split())} words)")
             
             # Display the summary
-            print(f"\n  Summary for {os.path.basename(processed_path)}:")
+            print(f"\n  Summary for {processed_name}:")
             print("  " + "-"*76)
-            for line in summary.split('\n'):
-                print(f"  {line}")
+            print(textwrap.indent(summary, '  ', lambda line: True))
             print("  " + "-"*76 + "\n")
         except Exception as e:
             print(f"  [3.1] ✗ Failed to generate summary: {e}")
@@ -1125,113 +1735,23 @@ def workflow_b_upload():
         
         # Step 4: Fetch news articles
         print_step(4, f"Fetching news articles for: {company_name}")
-        news_articles = news_service.get_company_intelligence(company_name)
+        news_articles = news_future.result()
         news_context = format_news_for_gemini(news_articles)
         print_step(4, f"Found {len(news_articles)} news article(s)", "success")
         
-        # Display news articles (using correct keys from news_service)
-        if news_articles:
-            print("\n" + "="*80)
-            print("NEWS ARTICLES")
-            print("="*80)
-            for i, article in enumerate(news_articles, 1):
-                # news_service.get_company_intelligence() returns: 'title', 'url', 'published_at'
-                headline = article.get('title', 'No headline')
-                date = article.get('published_at', 'N/A')
-                link = article.get('url', 'N/A')
-                # Extract source from URL if available
-                source = 'Unknown'
-                if link and link != 'N/A':
-                    try:
-                        from urllib.parse import urlparse
-                        parsed = urlparse(link)
-                        domain = parsed.netloc.lower()
-                        if domain and '.' in domain:
-                            if domain.startswith('www.'):
-                                domain = domain[4:]
-                            # Get main domain (last two parts, e.g., example.com)
-                            parts = domain.split('.')
-                            if len(parts) >= 2:
-                                source = '.'.join(parts[-2:])
-                    except:
-                        source = 'Unknown'
-                print(f"\n{i}. {headline}")
-                print(f"   Source: {source} | Date: {date}")
-                print(f"   Link: {link}")
-            print("="*80 + "\n")
+        _display_news(news_articles)
         
         # Step 5: Start Gemini chat
         print_step(5, "Starting Gemini chat session")
         print("\n" + "="*80)
         print("GEMINI CHAT SESSION")
         print("="*80)
-        print(f"\nFile loaded: {os.path.basename(processed_path)}")
+        print(f"\nFile loaded: {processed_name}")
         print(f"News context: {len(news_articles)} articles")
         print("\nType 'quit' or 'exit' to end the session")
         print("="*80 + "\n")
         
-        # Initialize chat history
-        chat_history = None
-        last_activity_time = time.time()
-        
-        # Chat loop
-        while True:
-            try:
-                user_input = input("You: ").strip()
-                
-                if not user_input:
-                    continue
-                
-                if user_input.lower() in ['quit', 'exit', 'q']:
-                    print("\nEnding chat session...")
-                    break
-                
-                # Update activity time
-                last_activity_time = time.time()
-                if inactivity_timer:
-                    inactivity_timer.cancel()
-                inactivity_timer = threading.Timer(INACTIVITY_TIMEOUT, lambda: cleanup_session(chat_id, temp_file_paths))
-                inactivity_timer.start()
-                
-                # Save user message
-                db_service.add_message_to_conversation(chat_id, 'user', user_input)
-                
-                # Get response
-                print("\n🤔 Thinking...")
-                answer, references, chat_history = gemini_service.get_gemini_response(
-                    user_input,
-                    [processed_path],
-                    chat_history=chat_history
-                )
-                
-                # Save assistant message (combine answer and references into content)
-                # db_service.add_message_to_conversation only accepts: (chat_id, role, content)
-                if references:
-                    combined_content = f"{answer}\n\n--- References ---\n{references}"
-                else:
-                    combined_content = answer
-                db_service.add_message_to_conversation(chat_id, 'assistant', combined_content)
-                
-                print("\n" + "="*80)
-                print("ASSISTANT:")
-                print("="*80)
-                print(answer)
-                if references:
-                    print("\n--- References (See below for details) ---")
-                print("="*80)
-                if references:
-                    print("\nREFERENCES:")
-                    print("-" * 80)
-                    print(references)
-                    print("="*80)
-                print()
-                
-            except KeyboardInterrupt:
-                print("\n\nInterrupted by user")
-                break
-            except Exception as e:
-                print(f"\n[99] ✗ Error in workflow: {e}")
-                break
+        _run_chat_loop(chat_id, [processed_path], temp_file_paths)
         
     except Exception as e:
         print(f"\n[99] ✗ Fatal error in workflow: {e}")
@@ -1239,12 +1759,103 @@ def workflow_b_upload():
         traceback.print_exc()
     finally:
         # Cleanup
-        if inactivity_timer:
-            inactivity_timer.cancel()
         if chat_id:
             cleanup_session(chat_id, temp_file_paths)
 
 
+def terminate_active_session() -> None:
+    """Terminates the active session found at startup so a fresh one can begin"""
+    session_info = get_active_session_info()
+    if session_info:
+        chat_id = session_info.get('chat_id')
+        temp_file_paths = session_info.get('temp_file_paths', [])
+        print("\nTerminating active session...")
+        # Temp files are deleted in the background; the archive/lock release stays synchronous
+        cleanup_session(chat_id, temp_file_paths, background_files=True)
+        print("✓ Active session terminated. You can now start a new session.\n")
+    else:
+        print("⚠ Could not retrieve session information, but proceeding anyway...\n")
+
+
+def resume_active_session() -> None:
+    """Resumes the chat of the active session found at startup, then cleans it up"""
+    session_info = get_active_session_info()
+    if not session_info:
+        print("⚠ Could not retrieve session information, but proceeding anyway...\n")
+        return
+    
+    chat_id = session_info.get('chat_id')
+    temp_file_paths = session_info.get('temp_file_paths', [])
+    files = [file_path for file_path in temp_file_paths if os.path.exists(file_path)]
+    if not files:
+        print("\n⚠ The session's files are no longer available. Terminating it instead...")
+        terminate_active_session()
+        return
+    
+    # Only the turns are saved; the first message's file context is rebuilt from the files
+    chat_turns = session_info.get('chat_turns') or []
+    try:
+        chat_history = gemini_service.restore_chat_history(chat_turns, files) or None
+    except Exception as e:
+        print(f"⚠ Warning: Could not restore the previous turns, starting a new chat: {e}")
+        chat_history = None
+    print("\n" + "="*80)
+    print("RESUMED GEMINI CHAT SESSION")
+    print("="*80)
+    print("\nFiles loaded:")
+    for i, file_path in enumerate(files, 1):
+        print(f"  {i}. {os.path.basename(file_path)}")
+    print(f"\nPrevious turns restored: {len(chat_history) // 2 if chat_history else 0}")
+    print("\nType 'quit' or 'exit' to end the session")
+    print("="*80 + "\n")
+    
+    try:
+        _run_chat_loop(chat_id, files, temp_file_paths, chat_history=chat_history)
+    finally:
+        cleanup_session(chat_id, temp_file_paths)
+
+
+def keep_active_session() -> None:
+    """Leaves the active session running (multiple sessions allowed)"""
+
+
+def quit_workflows() -> None:
+    """Exits the workflow menu without starting a workflow"""
+    print("Goodbye!")
+
+
+# Static menu text, written to stdout in one call
+SESSION_LOCK_MENU = (
+    "\n⚠ Warning: An active session was found.\n"
+    "\nOptions:\n"
+    "  y) Continue anyway (multiple sessions allowed)\n"
+    "  r) Resume the active session's chat\n"
+    "  t) Terminate the active session and start fresh\n"
+    "  n) Exit\n"
+)
+WORKFLOW_MENU = (
+    "\n\nAvailable Workflows:\n"
+    "  A) SEC Filing Analysis\n"
+    "  B) Document Upload Analysis\n"
+    "  Q) Quit\n"
+)
+SESSION_LOCK_PROMPT = "\nYour choice (y/r/t/n): "
+WORKFLOW_PROMPT = "\nSelect workflow (A/B/Q): "
+
+# Menu dispatch tables: normalized choice -> handler
+# Any choice not in SESSION_LOCK_ACTIONS exits the program
+SESSION_LOCK_ACTIONS = {
+    'y': keep_active_session,
+    'r': resume_active_session,
+    't': terminate_active_session,
+}
+WORKFLOWS = {
+    'A': workflow_a_sec,
+    'B': workflow_b_upload,
+    'Q': quit_workflows,
+}
+
+
 def main():
     """Main entry point"""
     print("="*80)
@@ -1255,53 +1866,41 @@ def main():
     
     # Check session lock
     if check_session_lock():
-        print("\n⚠ Warning: An active session was found.")
-        print("\nOptions:")
-        print("  y) Continue anyway (multiple sessions allowed)")
-        print("  t) Terminate the active session and start fresh")
-        print("  n) Exit")
-        
-        response = input("\nYour choice (y/t/n): ").strip().lower()
-        
-        if response == 't':
-            # Terminate the active session
-            session_info = get_active_session_info()
-            if session_info:
-                chat_id = session_info.get('chat_id')
-                temp_file_paths = session_info.get('temp_file_paths', [])
-                print("\nTerminating active session...")
-                cleanup_session(chat_id, temp_file_paths)
-                print("✓ Active session terminated. You can now start a new session.\n")
-            else:
-                print("⚠ Could not retrieve session information, but proceeding anyway...\n")
-        elif response != 'y':
+        sys.stdout.write(SESSION_LOCK_MENU)
+        
+        try:
+            # Interned so the dispatch lookup matches the (interned) table keys by identity
+            response = sys.intern(prompt_with_timeout(SESSION_LOCK_PROMPT).lower())
+        except (TimeoutError, EOFError) as e:
+            print(f"\n{e}. Exiting...")
+            return
+        
+        action = SESSION_LOCK_ACTIONS.get(response)
+        if action is None:
             print("Exiting...")
             return
+        action()
     
-    print("\n\nAvailable Workflows:")
-    print("  A) SEC Filing Analysis")
-    print("  B) Document Upload Analysis")
-    print("  Q) Quit")
+    sys.stdout.write(WORKFLOW_MENU)
     
-    while True:
-        choice = input("\nSelect workflow (A/B/Q): ").strip().upper()
-        
-        if choice == 'A':
-            workflow_a_sec()
-            break
-        elif choice == 'B':
-            workflow_b_upload()
-            break
-        elif choice == 'Q':
-            print("Goodbye!")
-            break
-        else:
+    # Bind loop-invariant globals to locals once
+    read_choice, workflows, prompt = prompt_with_timeout, WORKFLOWS, WORKFLOW_PROMPT
+    handler = None
+    while handler is None:
+        try:
+            choice = sys.intern(read_choice(prompt).upper())
+        except (TimeoutError, EOFError) as e:
+            print(f"\n{e}. Exiting...")
+            return
+        
+        handler = workflows.get(choice)
+        if handler is None:
             print("Invalid choice. Please enter A, B, or Q.")
+    
+    handler()
 
 
 if __name__ == "__main__":
-    import sys
-    
     # Check if user wants to run Flask API server
     if len(sys.argv) > 1 and sys.argv[1] == '--api':
         print("="*80)
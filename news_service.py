@@ -7,15 +7,137 @@ This script provides:
 - Using article headlines as snippets (fast, no deep scraping)
 """
 
+import os
+import re
+import time
+import heapq
+import logging
+import threading
 import feedparser
+from xml.etree import ElementTree
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from operator import itemgetter
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
-from thefuzz import fuzz, process
+from email.utils import parsedate_to_datetime
+from rapidfuzz import fuzz, process
 from dateutil import parser as date_parser
 import urllib.parse
-import requests
 from urllib.parse import urlparse, parse_qs
 
+import http_client
+import vector_service
+
+# Pipeline status messages; formatting is skipped when the level is disabled
+# Set FINSCOPE_LOG_LEVEL=WARNING to silence them (the CLI display below still prints)
+logger = logging.getLogger('finscope.news')
+if not logger.handlers:
+    _log_handler = logging.StreamHandler()
+    _log_handler.setFormatter(logging.Formatter('%(message)s'))  # Plain, as the CLI showed them
+    logger.addHandler(_log_handler)
+    logger.setLevel(os.getenv('FINSCOPE_LOG_LEVEL', 'INFO'))
+    logger.propagate = False
+
+# Optional: pyahocorasick matches a whole keyword table in one linear pass over the text
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+# Timeout for fetching the Google News RSS feed (seconds)
+RSS_FETCH_TIMEOUT = 10
+
+# Concurrent HEAD requests when resolving Google News redirect URLs
+URL_EXTRACTION_WORKERS = 8
+REDIRECT_HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
+
+# Source names in titles/summaries that identify the domain without an HTTP request
+SOURCE_DOMAIN_HINTS = {
+    'bloomberg': 'bloomberg.com',
+    'reuters': 'reuters.com',
+    'wsj': 'wsj.com',
+    'wall street journal': 'wsj.com',
+    'cnbc': 'cnbc.com',
+    'marketwatch': 'marketwatch.com',
+    'financial times': 'ft.com',
+    'ft.com': 'ft.com',
+    'yahoo finance': 'finance.yahoo.com',
+    'seeking alpha': 'seekingalpha.com',
+    'investing.com': 'investing.com',
+    'motley fool': 'fool.com',
+    'fool.com': 'fool.com',
+    'forbes': 'forbes.com',
+    "barron's": 'barrons.com',
+    'barrons': 'barrons.com',
+    'business insider': 'businessinsider.com',
+    'ap news': 'apnews.com',
+    'associated press': 'apnews.com',
+    'sc media': 'scmagazine.com',
+    'sc world': 'scworld.com',
+    'scmagazine': 'scmagazine.com',
+    'sc magazine': 'scmagazine.com'
+}
+
+# Fallback source hints, checked only when nothing else identified the source
+EXTENDED_SOURCE_DOMAIN_HINTS = {
+    'sc media': 'scmagazine.com',
+    'sc world': 'scworld.com',
+    'scmagazine': 'scmagazine.com',
+    'unit 42': 'unit42.paloaltonetworks.com',
+    'palo alto networks': 'paloaltonetworks.com',
+    'techcrunch': 'techcrunch.com',
+    'the verge': 'theverge.com',
+    'ars technica': 'arstechnica.com',
+    'zdnet': 'zdnet.com',
+    'cnet': 'cnet.com',
+    'engadget': 'engadget.com',
+    'wired': 'wired.com',
+    'gizmodo': 'gizmodo.com',
+}
+
+
+def _term_finder(terms):
+    """
+    Builds a function that returns which of the given terms occur in a text (as substrings).
+    
+    Uses an Aho-Corasick automaton when pyahocorasick is installed (one linear pass,
+    all overlapping matches). Otherwise falls back to a zero-width lookahead regex
+    alternation; shorter terms come first so a prefix ('fine') is still reported
+    where a longer term ('fines') matches.
+    
+    Args:
+        terms: Iterable of lowercase terms
+    
+    Returns:
+        Callable[[str], frozenset]: Maps lowercased text to the terms it contains
+    """
+    terms = list(terms)
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for term in terms:
+            automaton.add_word(term, term)
+        automaton.make_automaton()
+        return lambda text: frozenset(term for _, term in automaton.iter(text))
+    
+    pattern = re.compile('(?=(' + '|'.join(map(re.escape, sorted(terms, key=len))) + '))')
+    return lambda text: frozenset(pattern.findall(text))
+
+
+# One precompiled matcher over both hint tables, so each text is scanned once
+_find_source_hints = _term_finder({**SOURCE_DOMAIN_HINTS, **EXTENDED_SOURCE_DOMAIN_HINTS})
+
+# Patterns that name the source domain in article text (checked in order)
+_SOURCE_TEXT_PATTERNS = [re.compile(pattern) for pattern in (
+    r'via\s+([a-z0-9.-]+\.(?:com|net|org|io))',
+    r'from\s+([a-z0-9.-]+\.(?:com|net|org|io))',
+    r'@([a-z0-9.-]+\.(?:com|net|org|io))',
+    r'([a-z0-9.-]+\.(?:com|net|org|io))\s+reports',
+)]
+
+# Title/summary hints that an article might be from a preferred domain (worth resolving its URL)
+PREFERRED_SOURCE_HINTS = ('bloomberg', 'reuters', 'wsj', 'cnbc', 'marketwatch', 'ft', 'yahoo', 'forbes')
 
 # Preferred financial news domains (get priority boost, but all domains are allowed)
 PREFERRED_DOMAINS = [
@@ -23,6 +145,20 @@ PREFERRED_DOMAINS = [
     'ft.com', 'finance.yahoo.com', 'seekingalpha.com', 'investing.com',
     'fool.com', 'forbes.com', 'barrons.com', 'businessinsider.com', 'apnews.com'
 ]
+_PREFERRED_DOMAIN_SET = frozenset(PREFERRED_DOMAINS)
+
+# Semantic headline dedup: also group headlines whose embeddings (vector_service's local
+# model) have cosine similarity >= SEMANTIC_DEDUP_THRESHOLD, catching paraphrases the
+# lexical rules miss. Off by default since it loads the embedding model on first use.
+SEMANTIC_DEDUP = os.getenv('FINSCOPE_SEMANTIC_DEDUP', '0') == '1'
+SEMANTIC_DEDUP_THRESHOLD = 0.75
+
+# Cache of get_company_intelligence() results, keyed by (normalized company name, limit)
+# Repeat lookups within the TTL skip the RSS fetch, redirect resolution, scoring and dedup
+INTELLIGENCE_CACHE_TTL = 600  # 10 minutes
+MAX_CACHED_INTELLIGENCE = 256
+_intelligence_cache: Dict[tuple, tuple] = {}  # key -> (monotonic time stored, results)
+_intelligence_cache_lock = threading.Lock()
 
 
 def extract_actual_url(google_news_url: str) -> Optional[str]:
@@ -30,7 +166,8 @@ def extract_actual_url(google_news_url: str) -> Optional[str]:
     Extracts the actual article URL from a Google News redirect URL.
     
     Google News URLs are redirects. We follow them to get the actual article URL.
-    Uses a very fast timeout to minimize latency.
+    Uses a very fast timeout to minimize latency. Resolved URLs are cached for the
+    process lifetime; failures are not, so a timed-out link is retried next time.
     
     Args:
         google_news_url: The Google News redirect URL
@@ -39,19 +176,158 @@ def extract_actual_url(google_news_url: str) -> Optional[str]:
         str: The actual article URL, or None if extraction fails
     """
     try:
-        # Follow redirect to get actual URL
-        # Use HEAD request with very short timeout for speed (1 second)
-        response = requests.head(google_news_url, allow_redirects=True, timeout=1, 
-                                headers={'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'})
-        final_url = response.url if hasattr(response, 'url') else None
-        if final_url and final_url != google_news_url and 'news.google.com' not in final_url:
-            return final_url
-        return None
+        return _resolve_redirect(google_news_url)
     except:
         # If HEAD fails quickly, don't try GET (saves time)
         return None
 
 
+@lru_cache(maxsize=4096)
+def _resolve_redirect(google_news_url: str) -> str:
+    """
+    Follows a Google News redirect with a HEAD request (cached on success).
+    
+    Raises:
+        ValueError: If the redirect doesn't lead off news.google.com
+        requests.RequestException, httpx.HTTPError: If the request fails (not cached)
+    """
+    # Follow redirect to get actual URL
+    # Use HEAD request with very short timeout for speed (1 second)
+    if http_client.http2_client is not None:
+        # HTTP/2: concurrent lookups from extract_actual_urls() multiplex over one connection
+        response = http_client.http2_client.head(google_news_url, headers=REDIRECT_HEADERS)
+        final_url = str(response.url)
+    else:
+        # Pooled, non-retrying session: a retry with backoff would outlast the 1s budget
+        response = http_client.no_retry_session.head(google_news_url, allow_redirects=True, timeout=1,
+                                                     headers=REDIRECT_HEADERS)
+        final_url = response.url if hasattr(response, 'url') else None
+    if final_url and final_url != google_news_url and 'news.google.com' not in final_url:
+        return final_url
+    raise ValueError(f"No article URL behind redirect: {google_news_url}")
+
+
+def extract_actual_urls(google_news_urls: List[str]) -> Dict[str, Optional[str]]:
+    """
+    Extracts the actual article URLs for several Google News redirect URLs concurrently.
+    
+    Args:
+        google_news_urls: Google News redirect URLs
+    
+    Returns:
+        Dict mapping each redirect URL to its article URL (None if extraction failed)
+    """
+    if not google_news_urls:
+        return {}
+    if len(google_news_urls) == 1:
+        return {google_news_urls[0]: extract_actual_url(google_news_urls[0])}
+    
+    # Requests share the pooled http_client session (or HTTP/2 client), so connections are
+    # reused across the batch
+    with ThreadPoolExecutor(max_workers=min(len(google_news_urls), URL_EXTRACTION_WORKERS)) as executor:
+        return dict(zip(google_news_urls, executor.map(extract_actual_url, google_news_urls)))
+
+
+def _match_hint(hints: Dict[str, str], found_hints: frozenset) -> Optional[str]:
+    """
+    Returns the domain of the first hint (in table order) among the found hints, or None.
+    
+    Args:
+        hints: Hint -> domain table
+        found_hints: Hints found in the text by _find_source_hints()
+    """
+    if not found_hints:
+        return None
+    for hint, domain in hints.items():
+        if hint in found_hints:
+            return domain
+    return None
+
+
+def infer_source_from_text(text_lower: str, found_hints: Optional[frozenset] = None) -> Optional[str]:
+    """
+    Infers the news source domain from an article's (lowercased) title/summary.
+    
+    Args:
+        text_lower: Lowercased title and summary
+        found_hints: Result of _find_source_hints(text_lower), if already computed
+    
+    Returns:
+        str: Source domain (e.g. 'reuters.com'), or None if no hint matches
+    """
+    if found_hints is None:
+        found_hints = _find_source_hints(text_lower)
+    return _match_hint(SOURCE_DOMAIN_HINTS, found_hints)
+
+
+def _fallback_source(actual_url: str, google_link: str, text_lower: str,
+                     found_hints: frozenset) -> Optional[str]:
+    """
+    Identifies an article's source when neither the hint tables nor redirect resolution did.
+    
+    Tries, in order: the resolved URL, a 'url' query parameter on the Google News link,
+    source patterns in the text ("via x.com"), the extended hint table, and finally
+    the registered domain of the link itself.
+    
+    Args:
+        actual_url: Resolved article URL (or the Google News link)
+        google_link: Original Google News link
+        text_lower: Lowercased title and summary
+        found_hints: Result of _find_source_hints(text_lower)
+    
+    Returns:
+        str: Source domain, or None
+    """
+    # Resolved URL
+    if actual_url and 'news.google.com' not in actual_url:
+        source = get_domain_from_url(actual_url)
+        if source:
+            return source
+    
+    # Google News URLs sometimes carry the article URL as a query parameter
+    parsed_link = None
+    if google_link:
+        try:
+            parsed_link = urlparse(google_link)
+            params = parse_qs(parsed_link.query)
+            if 'url' in params:
+                source = get_domain_from_url(params['url'][0])
+                if source:
+                    return source
+        except:
+            pass
+    
+    # Source named in the text
+    for pattern in _SOURCE_TEXT_PATTERNS:
+        match = pattern.search(text_lower)
+        if match:
+            return match.group(1)
+    
+    # Extended hints (already matched in the same pass as the primary table)
+    source = _match_hint(EXTENDED_SOURCE_DOMAIN_HINTS, found_hints)
+    if source:
+        return source
+    
+    # Last resort - registered domain of the link (e.g. example.com)
+    if actual_url:
+        try:
+            parsed = parsed_link if actual_url == google_link and parsed_link else urlparse(actual_url)
+            hostname = parsed.netloc.lower()
+            if hostname and '.' in hostname:
+                parts = hostname.replace('www.', '').split('.')
+                if len(parts) >= 2:
+                    return '.'.join(parts[-2:])
+        except:
+            pass
+    return None
+
+
+def might_be_preferred_source(text_lower: str) -> bool:
+    """Heuristic: whether an article's (lowercased) title/summary hints at a preferred domain"""
+    return any(hint in text_lower for hint in PREFERRED_SOURCE_HINTS)
+
+
+@lru_cache(maxsize=8192)
 def get_domain_from_url(url: str) -> Optional[str]:
     """
     Extracts the domain from a URL.
@@ -73,6 +349,7 @@ def get_domain_from_url(url: str) -> Optional[str]:
         return None
 
 
+@lru_cache(maxsize=8192)
 def is_preferred_domain(url: str) -> bool:
     """
     Checks if the URL belongs to a preferred financial news domain.
@@ -87,12 +364,51 @@ def is_preferred_domain(url: str) -> bool:
     if not domain:
         return False
     
-    # Check if any preferred domain matches
-    for preferred in PREFERRED_DOMAINS:
-        if domain == preferred or domain.endswith('.' + preferred):
-            return True
+    # Check if the domain or any parent domain is preferred (one hash lookup per suffix)
+    parts = domain.split('.')
+    return any('.'.join(parts[i:]) in _PREFERRED_DOMAIN_SET for i in range(len(parts) - 1))
+
+
+def parse_rss_entries(content: bytes) -> List[Dict[str, str]]:
+    """
+    Parses an RSS 2.0 feed into entries with the fields the news pipeline reads.
     
-    return False
+    Uses the C-accelerated ElementTree parser and reads only the four fields needed.
+    Feeds that aren't well-formed XML fall back to feedparser, which is slower but lenient.
+    
+    Args:
+        content: Raw feed bytes
+    
+    Returns:
+        List[Dict]: Entries with 'title', 'link', 'summary' and (if present) 'published'
+    """
+    try:
+        root = ElementTree.fromstring(content)
+    except ElementTree.ParseError:
+        entries = []
+        for entry in feedparser.parse(content).entries:
+            fields = {
+                'title': entry.get('title', ''),
+                'link': entry.get('link', ''),
+                'summary': entry.get('summary', '')
+            }
+            if 'published' in entry:
+                fields['published'] = entry.published
+            entries.append(fields)
+        return entries
+    
+    entries = []
+    for item in root.iterfind('./channel/item'):
+        fields = {
+            'title': item.findtext('title', ''),
+            'link': (item.findtext('link') or '').strip(),
+            'summary': item.findtext('description', '')
+        }
+        published = item.findtext('pubDate')
+        if published:
+            fields['published'] = published.strip()
+        entries.append(fields)
+    return entries
 
 
 def fetch_google_news_rss(company_name: str, num_results: int = 50, use_strict_query: bool = True) -> List[Dict[str, str]]:
@@ -139,81 +455,61 @@ def fetch_google_news_rss(company_name: str, num_results: int = 50, use_strict_q
     rss_url = f"https://news.google.com/rss/search?q={encoded_query}&hl=en-US&gl=US&ceid=US:en&when=30d"
     
     try:
-        # Parse the RSS feed
-        feed = feedparser.parse(rss_url)
+        # Fetch over the shared connection pool, then parse the RSS feed
+        response = http_client.session.get(rss_url, timeout=RSS_FETCH_TIMEOUT)
+        response.raise_for_status()
+        
+        # Process up to num_results entries
+        entries = parse_rss_entries(response.content)[:num_results]
+        
+        # Lowercase each entry's text and scan it for source hints once; both loops reuse it
+        scanned = []
+        for entry in entries:
+            text_lower = (entry.get('title', '') + ' ' + entry.get('summary', '')).lower()
+            scanned.append((entry, text_lower, _find_source_hints(text_lower)))
+        
+        # Resolve the Google News redirects the loop below needs up front, concurrently
+        # (each is a blocking HEAD request, so a serial loop pays one round trip per article)
+        links_to_extract = []
+        for entry, text_lower, found_hints in scanned:
+            google_link = entry.get('link', '')
+            if not google_link:
+                continue
+            if not infer_source_from_text(text_lower, found_hints) and might_be_preferred_source(text_lower):
+                links_to_extract.append(google_link)
+        extracted_urls = extract_actual_urls(links_to_extract)
         
         articles = []
         processed = 0
-        # Process up to num_results entries
-        max_entries = num_results
-        for entry in feed.entries[:max_entries]:
+        for entry, title_lower, found_hints in scanned:
             processed += 1
             
-            # Extract publication date
-            published_date = None
-            if hasattr(entry, 'published'):
-                try:
-                    # Parse the date string
-                    published_date = entry.published
-                except:
-                    pass
+            # Extract publication date (raw string; parsed later)
+            published_date = entry.get('published')
             
-            google_link = entry.link if hasattr(entry, 'link') else ''
+            google_link = entry.get('link', '')
             
             if not google_link:
                 continue
             
-            title = entry.title if hasattr(entry, 'title') else ''
-            summary = entry.summary if hasattr(entry, 'summary') else ''
+            title = entry.get('title', '')
+            summary = entry.get('summary', '')
             
             # Optimize: Skip URL extraction for speed - infer source from title/summary first
             # Only extract URL if we can't infer source (saves time on most articles)
-            title_lower = (title + ' ' + summary).lower()
-            source = None
             actual_url = google_link  # Default to Google link (faster)
             
             # Try to infer source from title/summary first (no HTTP request needed)
-            domain_hints = {
-                'bloomberg': 'bloomberg.com',
-                'reuters': 'reuters.com',
-                'wsj': 'wsj.com',
-                'wall street journal': 'wsj.com',
-                'cnbc': 'cnbc.com',
-                'marketwatch': 'marketwatch.com',
-                'financial times': 'ft.com',
-                'ft.com': 'ft.com',
-                'yahoo finance': 'finance.yahoo.com',
-                'seeking alpha': 'seekingalpha.com',
-                'investing.com': 'investing.com',
-                'motley fool': 'fool.com',
-                'fool.com': 'fool.com',
-                'forbes': 'forbes.com',
-                "barron's": 'barrons.com',
-                'barrons': 'barrons.com',
-                'business insider': 'businessinsider.com',
-                'ap news': 'apnews.com',
-                'associated press': 'apnews.com',
-                'sc media': 'scmagazine.com',
-                'sc world': 'scworld.com',
-                'scmagazine': 'scmagazine.com',
-                'sc magazine': 'scmagazine.com'
-            }
-            
-            # Check if we can infer source from title/summary
-            for hint, domain in domain_hints.items():
-                if hint in title_lower:
-                    source = domain
-                    break
+            source = infer_source_from_text(title_lower, found_hints)
             
             # Only extract URL if we couldn't infer source AND it might be a preferred domain
             # This skips slow HTTP requests for most articles
             if not source:
                 # Quick check: try URL extraction only if title suggests it might be preferred
                 # (This is a heuristic to avoid unnecessary requests)
-                might_be_preferred = any(hint in title_lower for hint in ['bloomberg', 'reuters', 'wsj', 'cnbc', 'marketwatch', 'ft', 'yahoo', 'forbes'])
-                if might_be_preferred:
-                    # Only extract URL for potentially preferred domains
-                    extracted_url = extract_actual_url(google_link)
+                if might_be_preferred_source(title_lower):
+                    # Only extract URL for potentially preferred domains (resolved above)
+                    extracted_url = extracted_urls.get(google_link)
                     if extracted_url:
                         actual_url = extracted_url
                         source = get_domain_from_url(extracted_url)
@@ -227,86 +523,9 @@ def fetch_google_news_rss(company_name: str, num_results: int = 50, use_strict_q
                 # We inferred source, use Google link (no extraction needed)
                 actual_url = google_link
             
-            # If we still don't have a source, try multiple methods
+            # If we still don't have a source, try the fallback methods
             if not source:
-                # Method 1: Try to extract from actual URL
-                if actual_url and 'news.google.com' not in actual_url:
-                    source = get_domain_from_url(actual_url)
-                
-                # Method 2: Try to extract from Google News URL structure
-                if not source and google_link:
-                    try:
-                        # Google News URLs sometimes have domain info in the path
-                        parsed = urlparse(google_link)
-                        # Check if there's domain info in query params
-                        params = parse_qs(parsed.query)
-                        if 'url' in params:
-                            url_param = params['url'][0]
-                            source = get_domain_from_url(url_param)
-                    except:
-                        pass
-                
-                # Method 3: Try to extract from summary/title if it mentions a source
-                if not source:
-                    combined_text = (title + ' ' + summary).lower()
-                    # Look for common source patterns in text
-                    source_patterns = [
-                        (r'via\s+([a-z0-9.-]+\.(com|net|org|io))', 1),
-                        (r'from\s+([a-z0-9.-]+\.(com|net|org|io))', 1),
-                        (r'@([a-z0-9.-]+\.(com|net|org|io))', 1),
-                        (r'([a-z0-9.-]+\.(com|net|org|io))\s+reports', 1),
-                    ]
-                    import re
-                    for pattern, group in source_patterns:
-                        match = re.search(pattern, combined_text)
-                        if match:
-                            source = match.group(group)
-                            break
-                
-                # Method 4: Add more domain hints for common sources
-                if not source:
-                    title_lower = (title + ' ' + summary).lower()
-                    extended_domain_hints = {
-                        'sc media': 'scmagazine.com',
-                        'sc world': 'scworld.com',
-                        'scmagazine': 'scmagazine.com',
-                        'unit 42': 'unit42.paloaltonetworks.com',
-                        'palo alto networks': 'paloaltonetworks.com',
-                        'techcrunch': 'techcrunch.com',
-                        'the verge': 'theverge.com',
-                        'ars technica': 'arstechnica.com',
-                        'zdnet': 'zdnet.com',
-                        'cnet': 'cnet.com',
-                        'engadget': 'engadget.com',
-                        'wired': 'wired.com',
-                        'gizmodo': 'gizmodo.com',
-                    }
-                    for hint, domain in extended_domain_hints.items():
-                        if hint in title_lower:
-                            source = domain
-                            break
-                
-                # Method 5: Last resort - try to parse from link structure
-                if not source and actual_url:
-                    # Sometimes the domain is in the path or subdomain
-                    try:
-                        parsed = urlparse(actual_url)
-                        # Check if it's a subdomain we can identify
-                        hostname = parsed.netloc.lower()
-                        if hostname and '.' in hostname:
-                            # Remove www. and common prefixes
-                            hostname = hostname.replace('www.', '')
-                            # Take the main domain part
-                            parts = hostname.split('.')
-                            if len(parts) >= 2:
-                                # Get last two parts (e.g., example.com)
-                                source = '.'.join(parts[-2:])
-                    except:
-                        pass
-                
-                # Final fallback
-                if not source:
-                    source = 'Unknown'
+                source = _fallback_source(actual_url, google_link, title_lower, found_hints) or 'Unknown'
             
             articles.append({
                 'title': title,
@@ -314,7 +533,8 @@ def fetch_google_news_rss(company_name: str, num_results: int = 50, use_strict_q
                 'google_link': google_link,  # Keep original for fallback
                 'published': published_date,
                 'summary': summary,
-                'source': source or 'Unknown'
+                'source': source or 'Unknown',
+                '_text_lower': title_lower  # Reused by the relevance filters
             })
             
             # Stop when we have enough articles
@@ -324,10 +544,63 @@ def fetch_google_news_rss(company_name: str, num_results: int = 50, use_strict_q
         return articles
     
     except Exception as e:
-        print(f"Error fetching RSS feed: {e}")
+        logger.warning("✗ Error fetching RSS feed: %s", e)
         return []
 
 
+# Finance/administrative keywords that boost relevance
+FINANCE_KEYWORDS = (
+    'earnings', 'revenue', 'profit', 'financial', 'quarterly', 'annual',
+    'sec', 'filing', '10-k', '10-q', '8-k', 'regulatory', 'compliance',
+    'antitrust', 'lawsuit', 'legal', 'settlement', 'fine', 'penalty',
+    'merger', 'acquisition', 'ipo', 'stock', 'share', 'dividend',
+    'ceo', 'cfo', 'executive', 'board', 'governance', 'audit',
+    'regulation', 'policy', 'government', 'agency', 'investigation'
+)
+_FINANCE_KEYWORDS_RE = re.compile('|'.join(map(re.escape, FINANCE_KEYWORDS)))
+
+
+@lru_cache(maxsize=256)
+def _company_words_pattern(company_words: tuple) -> tuple:
+    """
+    Compiles a pattern matching any of the company words (as substrings, overlaps included).
+    
+    Returns:
+        tuple: (compiled pattern, words that are a prefix of another company word)
+    """
+    unique_words = set(company_words)
+    alternation = '|'.join(map(re.escape, sorted(unique_words, key=len, reverse=True)))
+    shadowed = frozenset(
+        word for word in unique_words
+        if any(other != word and other.startswith(word) for other in unique_words)
+    )
+    return re.compile('(?=(' + alternation + '))'), shadowed
+
+
+def _first_word_positions(text: str, company_words: tuple) -> Dict[str, int]:
+    """
+    Finds the first position of each company word in the text with a single scan.
+    
+    Args:
+        text: Lowercased article text
+        company_words: Lowercased company words
+    
+    Returns:
+        Dict mapping each word present in the text to its first offset (same as str.find)
+    """
+    pattern, shadowed = _company_words_pattern(company_words)
+    positions = {}
+    for match in pattern.finditer(text):
+        positions.setdefault(match.group(1), match.start())
+    # Where a word is a prefix of another, the pattern reports only the longer one at
+    # that offset; look those words up directly (rare, e.g. "bank" and "bankers")
+    for word in shadowed:
+        pos = text.find(word)
+        if pos != -1:
+            positions[word] = pos
+    return positions
+
+
 def score_relevance(article: Dict[str, str], company_name: str) -> float:
     """
     Scores an article's relevance to the company.
@@ -350,7 +623,9 @@ def score_relevance(article: Dict[str, str], company_name: str) -> float:
     title = article.get('title', '').lower()
     summary = article.get('summary', '').lower()
     company_lower = company_name.lower()
-    combined_text = title + ' ' + summary
+    combined_text = article.get('_text_lower')
+    if combined_text is None:
+        combined_text = title + ' ' + summary
     
     # CRITICAL: Check if company name appears as a whole phrase (not just random words)
     # Split company name into words
@@ -375,26 +650,17 @@ def score_relevance(article: Dict[str, str], company_name: str) -> float:
         
         # If no phrase match, check if all major words appear (but require they're close together)
         if not has_phrase_match:
-            # Check if all words appear, but require they're within reasonable distance
-            all_words_present = all(word in combined_text for word in company_words)
-            if all_words_present:
-                # Check word proximity - words should be close together
-                word_positions = []
-                for word in company_words:
-                    pos = combined_text.find(word)
-                    if pos != -1:
-                        word_positions.append(pos)
-                
-                if len(word_positions) == len(company_words):
-                    # Check if words are within reasonable distance (relaxed to 200 chars)
-                    word_positions.sort()
-                    max_distance = max(word_positions) - min(word_positions)
-                    if max_distance > 200:  # Words too far apart = likely not about the company
-                        # Give a low score instead of 0
-                        return 15.0  # Low relevance but still include it
-            else:
+            # First position of every word, found in one pass over the text
+            word_positions = _first_word_positions(combined_text, tuple(company_words))
+            if len(word_positions) < len(set(company_words)):
                 # Not all words present - give low score instead of 0
                 return 10.0
+            
+            # Check word proximity - words should be within reasonable distance (relaxed to 200 chars)
+            max_distance = max(word_positions.values()) - min(word_positions.values())
+            if max_distance > 200:  # Words too far apart = likely not about the company
+                # Give a low score instead of 0
+                return 15.0  # Low relevance but still include it
     elif len(company_words) == 1:
         # Single word company name - require it appears with context
         word = company_words[0]
@@ -417,22 +683,8 @@ def score_relevance(article: Dict[str, str], company_name: str) -> float:
             if company_lower not in combined_text:
                 return 15.0  # Low relevance but still include
     
-    # Finance/administrative keywords that boost relevance
-    finance_keywords = [
-        'earnings', 'revenue', 'profit', 'financial', 'quarterly', 'annual',
-        'sec', 'filing', '10-k', '10-q', '8-k', 'regulatory', 'compliance',
-        'antitrust', 'lawsuit', 'legal', 'settlement', 'fine', 'penalty',
-        'merger', 'acquisition', 'ipo', 'stock', 'share', 'dividend',
-        'ceo', 'cfo', 'executive', 'board', 'governance', 'audit',
-        'regulation', 'policy', 'government', 'agency', 'investigation'
-    ]
-    
-    # Check for finance/administrative keywords
-    finance_bonus = 0.0
-    for keyword in finance_keywords:
-        if keyword in combined_text:
-            finance_bonus = 20.0
-            break
+    # Check for finance/administrative keywords (one scan for all of them)
+    finance_bonus = 20.0 if _FINANCE_KEYWORDS_RE.search(combined_text) else 0.0
     
     # Check if article is from preferred domain (priority boost)
     preferred_bonus = 0.0
@@ -451,109 +703,229 @@ def score_relevance(article: Dict[str, str], company_name: str) -> float:
         if all_words_present:
             return min(95.0 + finance_bonus + preferred_bonus, 120.0)
     
-    # Fuzzy match on title (only if we passed context checks above)
-    title_score = fuzz.partial_ratio(company_lower, title)
-    
     # Check if company name appears in summary
     summary_bonus = 30.0 if company_lower in summary else 0.0
     
+    # Fuzzy match on title (only if we passed context checks above). Scores below
+    # summary_bonus can't win the max() below, so RapidFuzz may stop early on them
+    title_score = fuzz.partial_ratio(company_lower, title, score_cutoff=summary_bonus)
+    
     # Combine scores (title is more important)
     final_score = max(title_score, summary_bonus) + finance_bonus + preferred_bonus
     
     return min(final_score, 120.0)  # Cap at 120 (with bonuses)
 
 
-def are_headlines_similar(headline1: str, headline2: str, threshold: float = 0.60) -> bool:
+# Headline features used by are_headlines_similar()
+# Key entities and topics that indicate the same story (country names, person names, company + topic)
+HEADLINE_KEY_ENTITIES = (
+    'italy', 'tim cook', 'nike', 'apple', 'microsoft', 'google', 'amazon',
+    'tesla', 'meta', 'nvidia', 'jpmorgan', 'bank of america', 'goldman sachs'
+)
+HEADLINE_KEY_TOPICS = (
+    'antitrust', 'fine', 'fines', 'lawsuit', 'settlement', 'regulator',
+    'stock', 'shares', 'earnings', 'revenue', 'profit', 'quarterly',
+    'ceo', 'executive', 'resign', 'hire', 'acquisition', 'merger'
+)
+_find_headline_entities = _term_finder(HEADLINE_KEY_ENTITIES)
+_find_headline_topics = _term_finder(HEADLINE_KEY_TOPICS)
+HEADLINE_COMMON_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'is', 'are', 'was', 'were'
+})
+
+
+def _bigrams(words: List[str]) -> frozenset:
     """
-    Checks if two headlines are about the same event.
-    
-    Uses multiple strategies:
-    1. Key entity/topic matching (e.g., "Italy", "Tim Cook", "Nike stock")
-    2. Key phrase matching (e.g., "Italy antitrust", "fines Apple")
-    3. Fuzzy similarity matching
+    Builds the meaningful (longer than 5 characters) 2-word phrases of a headline.
     
     Args:
-        headline1: First headline
-        headline2: Second headline
-        threshold: Similarity threshold (0-1), default 0.60
+        words: Lowercased headline words
     
     Returns:
-        bool: True if headlines are similar (same event)
+        frozenset: Adjacent word pairs joined by a space
     """
-    if not headline1 or not headline2:
-        return False
-    
-    h1_lower = headline1.lower()
-    h2_lower = headline2.lower()
+    return frozenset(
+        phrase for phrase in map(' '.join, zip(words, words[1:]))
+        if len(phrase) > 5
+    )
+
+
+@lru_cache(maxsize=4096)
+def _headline_features(headline: str) -> tuple:
+    """
+    Normalizes a headline once for repeated similarity checks.
     
-    # Extract key entities and topics that indicate same story
-    # Common patterns: country names, person names, company + topic combinations
-    key_entities = [
-        'italy', 'tim cook', 'nike', 'apple', 'microsoft', 'google', 'amazon',
-        'tesla', 'meta', 'nvidia', 'jpmorgan', 'bank of america', 'goldman sachs'
-    ]
+    Returns:
+        tuple: (lowercased headline, key entities, key topics, keywords, 2-word phrases);
+            all but the first are frozensets
+    """
+    lower = headline.lower()
+    words = lower.split()
+    entities = _find_headline_entities(lower)
+    topics = _find_headline_topics(lower)
+    keywords = frozenset(word for word in words if word not in HEADLINE_COMMON_WORDS)
+    return lower, entities, topics, keywords, _bigrams(words)
+
+
+def _features_similar(h1_features: tuple, h2_features: tuple) -> bool:
+    """
+    Entity/topic/phrase part of are_headlines_similar(), on precomputed _headline_features().
     
-    # Check if both headlines mention the same key entity
-    h1_entities = [e for e in key_entities if e in h1_lower]
-    h2_entities = [e for e in key_entities if e in h2_lower]
-    shared_entities = set(h1_entities) & set(h2_entities)
+    Returns:
+        bool: True if the headlines share enough entities, topics or phrases
+    """
+    _, h1_entities, h1_topics, h1_keywords, h1_phrases = h1_features
+    _, h2_entities, h2_topics, h2_keywords, h2_phrases = h2_features
     
     # If they share a key entity, check for topic overlap
-    if shared_entities:
-        # Key topics that indicate same story
-        key_topics = [
-            'antitrust', 'fine', 'fines', 'lawsuit', 'settlement', 'regulator',
-            'stock', 'shares', 'earnings', 'revenue', 'profit', 'quarterly',
-            'ceo', 'executive', 'resign', 'hire', 'acquisition', 'merger'
-        ]
-        h1_topics = [t for t in key_topics if t in h1_lower]
-        h2_topics = [t for t in key_topics if t in h2_lower]
-        shared_topics = set(h1_topics) & set(h2_topics)
-        
+    if h1_entities & h2_entities:
         # If same entity + same topic, definitely same story
-        if shared_topics:
+        if h1_topics & h2_topics:
             return True
         
         # If same entity and high phrase overlap, likely same story
-        h1_words = set(h1_lower.split())
-        h2_words = set(h2_lower.split())
-        # Remove common words
-        common_words = {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were'}
-        h1_keywords = h1_words - common_words
-        h2_keywords = h2_words - common_words
         keyword_overlap = len(h1_keywords & h2_keywords) / max(len(h1_keywords), len(h2_keywords), 1)
         if keyword_overlap > 0.4:  # 40% keyword overlap with same entity
             return True
     
-    # Extract key phrases (2-word combinations) that indicate same story
-    h1_words = h1_lower.split()
-    h2_words = h2_lower.split()
+    # If they share 2+ key phrases (2-word combinations), likely same story
+    return len(h1_phrases & h2_phrases) >= 2
+
+
+def headline_similarity_matrix(headlines: List[str], threshold: float = 0.60):
+    """
+    Runs the fuzzy part of are_headlines_similar() for every pair of headlines at once.
+    
+    Uses rapidfuzz.process.cdist, which scores the whole matrix in C across all
+    cores instead of one Python call per pair.
+    
+    Args:
+        headlines: Headlines to compare
+        threshold: Full-ratio similarity threshold (0-1), as in are_headlines_similar()
+    
+    Returns:
+        np.ndarray: Boolean matrix; [i, j] is True if headlines i and j pass the fuzzy check
+    """
+    lowered = [headline.lower() for headline in headlines]
+    ratio = process.cdist(lowered, lowered, scorer=fuzz.ratio, score_cutoff=threshold * 100, workers=-1)
+    partial = process.cdist(lowered, lowered, scorer=fuzz.partial_ratio, score_cutoff=65, workers=-1)
+    return (ratio >= threshold * 100) | (partial >= 65)
+
+
+def headline_semantic_matrix(headlines: List[str], threshold: float = SEMANTIC_DEDUP_THRESHOLD):
+    """
+    Marks headline pairs that are paraphrases of each other, by embedding similarity.
+    
+    All headlines are embedded in one batch with vector_service's shared model; the
+    embeddings are L2-normalized, so one matrix product gives every pairwise cosine.
+    
+    Args:
+        headlines: Headlines to compare
+        threshold: Cosine similarity threshold (0-1)
+    
+    Returns:
+        np.ndarray: Boolean matrix; [i, j] is True if headlines i and j are similar
+    """
+    embeddings = vector_service.embed_texts([headline.lower() for headline in headlines])
+    return (embeddings @ embeddings.T) >= threshold
+
+
+def are_headlines_similar(
+    headline1: str,
+    headline2: str,
+    threshold: float = 0.60,
+    fuzzy_similar: Optional[bool] = None
+) -> bool:
+    """
+    Checks if two headlines are about the same event.
     
-    h1_phrases = set()
-    h2_phrases = set()
+    Uses multiple strategies:
+    1. Key entity/topic matching (e.g., "Italy", "Tim Cook", "Nike stock")
+    2. Key phrase matching (e.g., "Italy antitrust", "fines Apple")
+    3. Fuzzy similarity matching
     
-    for i in range(len(h1_words) - 1):
-        phrase = f"{h1_words[i]} {h1_words[i+1]}"
-        if len(phrase) > 5:  # Only meaningful phrases
-            h1_phrases.add(phrase)
+    Args:
+        headline1: First headline
+        headline2: Second headline
+        threshold: Similarity threshold (0-1), default 0.60
+        fuzzy_similar: Precomputed result of the fuzzy check for this pair (from
+            headline_similarity_matrix); skips the per-pair RapidFuzz calls
     
-    for i in range(len(h2_words) - 1):
-        phrase = f"{h2_words[i]} {h2_words[i+1]}"
-        if len(phrase) > 5:
-            h2_phrases.add(phrase)
+    Returns:
+        bool: True if headlines are similar (same event)
+    """
+    if not headline1 or not headline2:
+        return False
     
-    # If they share 2+ key phrases, likely same story
-    shared_phrases = h1_phrases.intersection(h2_phrases)
-    if len(shared_phrases) >= 2:
+    # Normalized forms are computed once per headline (dedup compares each group key many times)
+    h1_features = _headline_features(headline1)
+    h2_features = _headline_features(headline2)
+    if _features_similar(h1_features, h2_features):
         return True
+    h1_lower, h2_lower = h1_features[0], h2_features[0]
     
-    # Also check full similarity ratio
-    similarity = fuzz.ratio(h1_lower, h2_lower) / 100.0
+    if fuzzy_similar is not None:
+        return fuzzy_similar
+    
+    # Also check full similarity ratio (score_cutoff lets RapidFuzz stop early and
+    # return 0 for pairs that can't reach the threshold)
+    similarity = fuzz.ratio(h1_lower, h2_lower, score_cutoff=threshold * 100) / 100.0
+    if similarity >= threshold:
+        return True
     
     # Use partial ratio for better detection
-    partial_similarity = fuzz.partial_ratio(h1_lower, h2_lower) / 100.0
+    partial_similarity = fuzz.partial_ratio(h1_lower, h2_lower, score_cutoff=65) / 100.0
+    
+    return partial_similarity >= 0.65
+
+
+def _find_similar_group(position: int, group_keys: List[str], group_positions: List[int],
+                        features: List[tuple], fuzzy_matrix,
+                        group_postings: Dict[str, List[int]]) -> Optional[str]:
+    """
+    Returns the first group key (in creation order) whose headline is similar to an article's.
+    
+    Same result as calling are_headlines_similar() against each group in turn. The
+    fuzzy check is an OR there, so the first group whose precomputed fuzzy entry is
+    set is a match. Before it, only groups sharing a key entity or a 2-word phrase
+    with the article (found through group_postings) can pass the feature checks,
+    so only those are compared.
+    
+    Args:
+        position: The article's row in fuzzy_matrix and index in features
+        group_keys: Group key headlines, in creation order
+        group_positions: Row/column of each group key in fuzzy_matrix
+        features: _headline_features() of every headline, by position
+        fuzzy_matrix: Result of headline_similarity_matrix()
+        group_postings: Entity/phrase -> numbers of the groups containing it (see _index_group)
     
-    return similarity >= threshold or partial_similarity >= 0.65
+    Returns:
+        str: Matching group key, or None
+    """
+    if not group_keys:
+        return None
+    row = fuzzy_matrix[position, group_positions]
+    first_fuzzy = int(row.argmax())
+    if not row[first_fuzzy]:
+        first_fuzzy = len(group_keys)
+    
+    article_features = features[position]
+    candidates = set()
+    for term in article_features[1] | article_features[4]:
+        candidates.update(group_postings.get(term, ()))
+    for group_number in sorted(candidates):
+        if group_number >= first_fuzzy:
+            break
+        if _features_similar(article_features, features[group_positions[group_number]]):
+            return group_keys[group_number]
+    return group_keys[first_fuzzy] if first_fuzzy < len(group_keys) else None
+
+
+def _index_group(group_postings: Dict[str, List[int]], group_number: int, group_features: tuple) -> None:
+    """Adds a new group's key entities and 2-word phrases to the postings used by _find_similar_group"""
+    for term in group_features[1] | group_features[4]:
+        group_postings.setdefault(term, []).append(group_number)
 
 
 def has_exact_company_match(article: Dict[str, str], company_name: str) -> bool:
@@ -570,9 +942,9 @@ def has_exact_company_match(article: Dict[str, str], company_name: str) -> bool:
     Returns:
         bool: True if acceptable match found (case-insensitive)
     """
-    title = article.get('title', '')
-    summary = article.get('summary', '')
-    combined_text = (title + ' ' + summary).lower()
+    combined_text = article.get('_text_lower')
+    if combined_text is None:
+        combined_text = (article.get('title', '') + ' ' + article.get('summary', '')).lower()
     company_lower = company_name.lower()
     
     # Extract shorthand (first 2 words) if company name has multiple words
@@ -607,10 +979,171 @@ def has_exact_company_match(article: Dict[str, str], company_name: str) -> bool:
     return False
 
 
-def get_company_intelligence(company_name: str) -> List[Dict[str, str]]:
+@lru_cache(maxsize=4096)
+def parse_published_date(published: str) -> Optional[datetime]:
+    """
+    Parses an RSS publication date (cached, since the same feed entries recur).
+    
+    RSS dates are RFC 822, which email.utils parses much faster than dateutil;
+    anything else falls back to dateutil.
+    
+    Args:
+        published: Publication date string
+    
+    Returns:
+        datetime: Parsed date, or None if empty or unparseable
+    """
+    if not published:
+        return None
+    try:
+        return parsedate_to_datetime(published)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return date_parser.parse(published)
+    except (ValueError, OverflowError):
+        return None
+
+
+def select_diverse_articles(dated_articles: List[tuple], limit: int, max_per_event: int = 1) -> List[tuple]:
+    """
+    Picks up to `limit` articles, keeping at most `max_per_event` per similar event.
+    
+    Articles are grouped by headline similarity (are_headlines_similar() rules, plus
+    embedding similarity when SEMANTIC_DEDUP is on). When a group is full, a new
+    article replaces its first one if it comes from a preferred domain and the
+    existing one doesn't, or if both share preference and it is more recent. If that
+    leaves fewer than `limit` articles, the remaining ones are added in order: the
+    relaxed second pass always kept every article, either in a group with room or as
+    the start of a new group, so no similarity checks are needed there.
+    
+    Args:
+        dated_articles: (article, parsed date) pairs, most relevant first
+        limit: Maximum number of articles to select
+        max_per_event: Articles allowed per similar event in the first pass
+    
+    Returns:
+        List[tuple]: Selected (article, date) pairs, in selection order
+    """
+    filtered_articles = []
+    filtered_index = {}  # id(article) -> its index in filtered_articles
+    headline_groups = {}
+    
+    # Fuzzy headline similarity for all pairs in one batch (indexed by position in dated_articles)
+    titles = [article.get('title', '') for article, _ in dated_articles]
+    fuzzy_matrix = headline_similarity_matrix(titles)
+    if SEMANTIC_DEDUP and vector_service.is_available():
+        # Paraphrases count as similar too (the fuzzy matrix is an OR in the grouping rules)
+        try:
+            fuzzy_matrix |= headline_semantic_matrix(titles)
+        except Exception as e:
+            logger.warning("⚠ Semantic headline dedup failed, using lexical rules only: %s", e)
+    features = [_headline_features(title) for title in titles]  # Normalized once per headline
+    preferred = {id(article): is_preferred_domain(article.get('link', '')) for article, _ in dated_articles}
+    group_keys = []  # Group key headlines, in creation order
+    group_positions = []  # Position of each group key in dated_articles
+    group_postings = {}  # Key entity/phrase -> numbers of the groups whose key contains it
+    
+    for position, (article, article_date) in enumerate(dated_articles):
+        title = titles[position]
+        if not title:
+            continue
+        
+        # Check if this headline is similar to any existing group
+        group_key = _find_similar_group(position, group_keys, group_positions, features, fuzzy_matrix,
+                                        group_postings)
+        if group_key is not None:
+            group_articles = headline_groups[group_key]
+            # Allow max_per_event articles per similar event
+            if len(group_articles) >= max_per_event:
+                existing_article, existing_date = group_articles[0]
+                # Prefer preferred domain sources, then more recent date
+                article_is_preferred = preferred[id(article)]
+                existing_is_preferred = preferred[id(existing_article)]
+                
+                # Replace if: new is preferred and old isn't, OR both same preference but new is more recent
+                if (article_is_preferred and not existing_is_preferred) or \
+                   (article_is_preferred == existing_is_preferred and article_date > existing_date):
+                    group_articles[0] = (article, article_date)
+                    i = filtered_index.pop(id(existing_article))
+                    filtered_articles[i] = (article, article_date)
+                    filtered_index[id(article)] = i
+            else:
+                group_articles.append((article, article_date))
+                filtered_index[id(article)] = len(filtered_articles)
+                filtered_articles.append((article, article_date))
+        else:
+            headline_groups[title] = [(article, article_date)]
+            _index_group(group_postings, len(group_keys), features[position])
+            group_keys.append(title)
+            group_positions.append(position)
+            filtered_index[id(article)] = len(filtered_articles)
+            filtered_articles.append((article, article_date))
+        
+        # Early exit: Once we have `limit` valid articles, stop processing
+        if len(filtered_articles) >= limit:
+            logger.info("Early exit: Found %d valid articles, stopping processing", limit)
+            return filtered_articles
+    
+    # If we still don't have `limit`, allow more articles per similar event and continue
+    # from where we left off (skipping articles already selected)
+    logger.info("Only %d articles after diversity filtering. Allowing 2 articles per similar event...", len(filtered_articles))
+    for position, (article, article_date) in enumerate(dated_articles):
+        if id(article) in filtered_index or not titles[position]:
+            continue
+        filtered_articles.append((article, article_date))
+        
+        # Early exit: Once we have `limit` valid articles, stop processing
+        if len(filtered_articles) >= limit:
+            logger.info("Early exit: Found %d valid articles, stopping processing", limit)
+            break
+    
+    return filtered_articles
+
+
+def get_company_intelligence(company_name: str, limit: int = 10) -> List[Dict[str, str]]:
     """
     Main function to get company intelligence from news articles.
     
+    Results are cached per company (case- and whitespace-insensitive) for
+    INTELLIGENCE_CACHE_TTL seconds; empty results are not cached, so a failed
+    fetch is retried on the next call.
+    
+    Args:
+        company_name: The company name to search for
+        limit: Maximum number of articles to return (default: 10)
+    
+    Returns:
+        List[Dict]: At most `limit` article dictionaries (see _fetch_company_intelligence)
+    """
+    if not company_name or not company_name.strip():
+        return []
+    
+    cache_key = (company_name.strip().lower(), limit)
+    with _intelligence_cache_lock:
+        cached = _intelligence_cache.get(cache_key)
+    if cached is not None and time.monotonic() - cached[0] < INTELLIGENCE_CACHE_TTL:
+        logger.info("✓ Using cached news articles for: %s", company_name.strip())
+        # Copies, so callers can't mutate the cached entries
+        return [dict(article) for article in cached[1]]
+    
+    results = _fetch_company_intelligence(company_name, limit)
+    
+    if results:
+        with _intelligence_cache_lock:
+            # Evict the oldest entry once the cache is full (dicts keep insertion order)
+            _intelligence_cache.pop(cache_key, None)
+            if len(_intelligence_cache) >= MAX_CACHED_INTELLIGENCE:
+                _intelligence_cache.pop(next(iter(_intelligence_cache)))
+            _intelligence_cache[cache_key] = (time.monotonic(), [dict(article) for article in results])
+    
+    return results
+
+
+def _fetch_company_intelligence(company_name: str, limit: int = 10) -> List[Dict[str, str]]:
+    """
+    Fetches, scores and deduplicates news articles for a company (uncached).
+    
     Process:
     1. Fetch articles from Google News RSS (all domains, preferred get priority)
     2. Score and rank articles by relevance (preferred domains get +15 boost)
@@ -620,9 +1153,11 @@ def get_company_intelligence(company_name: str) -> List[Dict[str, str]]:
     
     Args:
         company_name: The company name to search for
+        limit: Maximum number of articles to return (default: 10). Callers get
+            an already-trimmed list and don't need to slice it again.
     
     Returns:
-        List[Dict]: List of dictionaries with keys:
+        List[Dict]: At most `limit` dictionaries with keys:
             - 'title': Article headline
             - 'url': Article URL
             - 'published_at': Publication date (YYYY-MM-DD format)
@@ -632,16 +1167,24 @@ def get_company_intelligence(company_name: str) -> List[Dict[str, str]]:
     
     company_name_clean = company_name.strip()
     
-    print(f"Fetching news articles for: {company_name_clean}")
+    logger.info("Fetching news articles for: %s", company_name_clean)
+    
+    # Start the fallback query speculatively so it overlaps the strict one; its result
+    # is only used if the strict query yields nothing (the executor doesn't wait for it)
+    fallback_executor = ThreadPoolExecutor(max_workers=1)
+    fallback_future = fallback_executor.submit(
+        fetch_google_news_rss, company_name_clean, num_results=25, use_strict_query=False
+    )
+    fallback_executor.shutdown(wait=False)
     
     # Step 1: Try strict query first (optimized: fetch 25 articles for better latency)
-    print("Trying strict query with exact phrase matching...")
+    logger.info("Trying strict query with exact phrase matching...")
     articles = fetch_google_news_rss(company_name_clean, num_results=25, use_strict_query=True)
     
     # Step 2: Apply strict relevance filtering with early exit optimization
     if articles:
-        print(f"Found {len(articles)} articles from RSS")
-        print("Applying refined relevance filter (full name OR shorthand required)...")
+        logger.info("Found %d articles from RSS", len(articles))
+        logger.info("Applying refined relevance filter (full name OR shorthand required)...")
         relevant_articles = []
         # Process articles and stop once we have enough candidates (early exit optimization)
         for article in articles:
@@ -649,29 +1192,29 @@ def get_company_intelligence(company_name: str) -> List[Dict[str, str]]:
                 relevant_articles.append(article)
                 # Early exit: If we have 20+ relevant articles, we likely have enough for 10 after filtering
                 if len(relevant_articles) >= 20:
-                    print(f"Early exit: Found {len(relevant_articles)} relevant articles, stopping processing")
+                    logger.info("Early exit: Found %d relevant articles, stopping processing", len(relevant_articles))
                     break
         
         articles = relevant_articles
-        print(f"After refined filtering: {len(articles)} relevant articles")
+        logger.info("After refined filtering: %d relevant articles", len(articles))
     
     # Step 3: Fallback if strict query returned 0 results
     if not articles:
-        print("Strict query returned 0 results. Trying fallback query...")
-        articles = fetch_google_news_rss(company_name_clean, num_results=25, use_strict_query=False)
+        logger.info("Strict query returned 0 results. Trying fallback query...")
+        articles = fallback_future.result()
         
         if articles:
-            print(f"Found {len(articles)} articles from fallback query")
+            logger.info("Found %d articles from fallback query", len(articles))
             # Still apply strict relevance filter
             relevant_articles = []
             for article in articles:
                 if has_exact_company_match(article, company_name_clean):
                     relevant_articles.append(article)
             articles = relevant_articles
-            print(f"After strict filtering: {len(articles)} relevant articles")
+            logger.info("After strict filtering: %d relevant articles", len(articles))
     
     if not articles:
-        print("No relevant articles found after filtering")
+        logger.info("No relevant articles found after filtering")
         return []
     
     # Step 4: Filter for date (last 30 days) and sort by date (most recent first)
@@ -680,20 +1223,21 @@ def get_company_intelligence(company_name: str) -> List[Dict[str, str]]:
     dated_articles = []
     date_range_used = 30
     
+    # Parse each publication date once; the widening windows below only compare
+    parsed_dates = [parse_published_date(article.get('published', '')) for article in articles]
+    
     for days_back in date_ranges:
         cutoff_date = datetime.now() - timedelta(days=days_back)
         dated_articles = []
         
-        for article in articles:
-            published_date = article.get('published', '')
-            if published_date:
+        for article, parsed_date in zip(articles, parsed_dates):
+            if article.get('published', ''):
                 try:
-                    parsed_date = date_parser.parse(published_date)
                     # Check if article is within date range
                     if parsed_date >= cutoff_date:
                         dated_articles.append((article, parsed_date))
                 except:
-                    # If date parsing fails, include it anyway (better to have it than not)
+                    # If date parsing failed (None), include it anyway (better to have it than not)
                     dated_articles.append((article, datetime.now()))
             else:
                 # If no date, include it (assume recent)
@@ -702,124 +1246,47 @@ def get_company_intelligence(company_name: str) -> List[Dict[str, str]]:
         # Sort by date (most recent first)
         dated_articles.sort(key=lambda x: x[1], reverse=True)
         
-        print(f"After date filtering (last {days_back} days): {len(dated_articles)} articles")
+        logger.info("After date filtering (last %d days): %d articles", days_back, len(dated_articles))
         
         # If we have at least 15 articles, we should be able to get 10 after diversity filtering
         if len(dated_articles) >= 15:
             date_range_used = days_back
             break
+        
+        # Every article is already inside this window, so wider ones can't add any
+        if len(dated_articles) == len(articles):
+            break
     
     if not dated_articles:
-        print("No articles found within date range")
+        logger.info("No articles found within date range")
         return []
     
-    # Step 5: Filter for topic diversity with early exit (stop once we have 10)
-    max_per_event = 1
-    filtered_articles = []
-    headline_groups = {}
+    # Step 5: Filter for topic diversity with early exit (stop once we have `limit`)
+    filtered_articles = select_diverse_articles(dated_articles, limit)
     
-    for article, article_date in dated_articles:
-        title = article.get('title', '')
-        if not title:
-            continue
-        
-        # Check if this headline is similar to any existing group
-        added_to_group = False
-        for group_key, group_articles in headline_groups.items():
-            if are_headlines_similar(title, group_key):
-                # Allow max_per_event articles per similar event
-                if len(group_articles) >= max_per_event:
-                    existing_article, existing_date = group_articles[0]
-                    # Prefer preferred domain sources, then more recent date
-                    article_is_preferred = is_preferred_domain(article.get('link', ''))
-                    existing_is_preferred = is_preferred_domain(existing_article.get('link', ''))
-                    
-                    # Replace if: new is preferred and old isn't, OR both same preference but new is more recent
-                    if (article_is_preferred and not existing_is_preferred) or \
-                       (article_is_preferred == existing_is_preferred and article_date > existing_date):
-                        group_articles[0] = (article, article_date)
-                        for i, (fa, fd) in enumerate(filtered_articles):
-                            if fa == existing_article:
-                                filtered_articles[i] = (article, article_date)
-                                break
-                else:
-                    group_articles.append((article, article_date))
-                    filtered_articles.append((article, article_date))
-                added_to_group = True
-                break
-        
-        if not added_to_group:
-            headline_groups[title] = [(article, article_date)]
-            filtered_articles.append((article, article_date))
-        
-        # Early exit: Once we have 10 valid articles, stop processing
-        if len(filtered_articles) >= 10:
-            print(f"Early exit: Found 10 valid articles, stopping processing")
-            break
+    # Step 6: Get top `limit` most recent articles
+    # Re-rank by date (most recent first): replacements in Step 5 can put an older,
+    # preferred-domain article in a newer one's slot. Ties keep selection order.
+    top_articles = heapq.nlargest(limit, filtered_articles, key=lambda x: x[1])
     
-    # If we still don't have 10, allow 2 articles per similar event and continue
-    if len(filtered_articles) < 10:
-        print(f"Only {len(filtered_articles)} articles after diversity filtering. Allowing 2 articles per similar event...")
-        max_per_event = 2
-        
-        # Continue from where we left off
-        processed_indices = set()
-        for fa, _ in filtered_articles:
-            for idx, (art, _) in enumerate(dated_articles):
-                if art == fa:
-                    processed_indices.add(idx)
-                    break
-        
-        for idx, (article, article_date) in enumerate(dated_articles):
-            if idx in processed_indices:
-                continue
-                
-            title = article.get('title', '')
-            if not title:
-                continue
-            
-            added_to_group = False
-            for group_key, group_articles in headline_groups.items():
-                if are_headlines_similar(title, group_key):
-                    if len(group_articles) < max_per_event:
-                        group_articles.append((article, article_date))
-                        filtered_articles.append((article, article_date))
-                        added_to_group = True
-                    break
-            
-            if not added_to_group:
-                headline_groups[title] = [(article, article_date)]
-                filtered_articles.append((article, article_date))
-            
-            # Early exit: Once we have 10 valid articles, stop processing
-            if len(filtered_articles) >= 10:
-                print(f"Early exit: Found 10 valid articles, stopping processing")
-                break
-    
-    # Step 6: Get top 10 most recent articles
-    # Sort by date again (most recent first)
-    filtered_articles.sort(key=lambda x: x[1], reverse=True)
-    top_articles = filtered_articles[:10]
-    
-    print(f"Selected top {len(top_articles)} most recent articles after diversity filtering (date range: {date_range_used} days)")
+    logger.info("Selected top %d most recent articles after diversity filtering (date range: %s days)", len(top_articles), date_range_used)
     
     # Step 7: Format results with required fields
+    # (articles built by fetch_google_news_rss always carry 'title' and 'link')
     results = []
+    get_title_and_link = itemgetter('title', 'link')
     for article, article_date in top_articles:
-        title = article.get('title', '')
-        link = article.get('link', '')
+        title, link = get_title_and_link(article)
         
         if not title or not link:
             continue
         
-        # Parse publication date to YYYY-MM-DD format
-        published_at = article_date.strftime('%Y-%m-%d') if isinstance(article_date, datetime) else article.get('published', '')
-        if published_at and not isinstance(article_date, datetime):
-            try:
-                parsed_date = date_parser.parse(published_at)
-                published_at = parsed_date.strftime('%Y-%m-%d')
-            except:
-                published_at = ''
+        # Publication date in YYYY-MM-DD format (dates were parsed once in Step 4)
+        if isinstance(article_date, datetime):
+            published_at = article_date.strftime('%Y-%m-%d')
+        else:
+            parsed_date = parse_published_date(article.get('published', ''))
+            published_at = parsed_date.strftime('%Y-%m-%d') if parsed_date else ''
         
         results.append({
             'title': title.strip(),
@@ -827,7 +1294,7 @@ def get_company_intelligence(company_name: str) -> List[Dict[str, str]]:
             'published_at': published_at
         })
     
-    print(f"\n✓ Successfully processed {len(results)} articles")
+    logger.info("\n✓ Successfully processed %d articles", len(results))
     return results
 
 
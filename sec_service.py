@@ -10,8 +10,18 @@ This script provides:
 import sys
 import os
 import re
+import time
+import json
+import logging
+import shutil
+import hashlib
 import tempfile
-from datetime import datetime, timedelta
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from operator import itemgetter
 from typing import List, Dict, Optional
 import requests
 try:
@@ -24,18 +34,107 @@ except ImportError:
         print("Error: edgartools not installed. Please run: pip install edgartools")
         sys.exit(1)
 
+# Optional: edgartools' HTML document parser (newer releases), used directly so a batch
+# can parse filings in worker processes; without it Filing.text() does all the work
+try:
+    from edgar.core import is_probably_html
+    from edgar.documents import HTMLParser, ParserConfig
+except ImportError:
+    HTMLParser = None
+
+import http_client
+import text_files
+
 # Import company service to leverage ticker mapping
 try:
-    from company_service import fetch_company_lists, _company_tickers
+    from company_service import fetch_company_lists, get_suggestions, _company_tickers
 except ImportError:
     print("Warning: company_service.py not found. Ticker mapping will be limited.")
+    get_suggestions = None
     _company_tickers = None
 
+# Lookup/download status messages; formatting is skipped when the level is disabled
+# Set FINSCOPE_LOG_LEVEL=WARNING to silence them (the CLI display below still prints)
+logger = logging.getLogger('finscope.sec')
+if not logger.handlers:
+    _log_handler = logging.StreamHandler()
+    _log_handler.setFormatter(logging.Formatter('%(message)s'))  # Plain, as the CLI showed them
+    logger.addHandler(_log_handler)
+    logger.setLevel(os.getenv('FINSCOPE_LOG_LEVEL', 'INFO'))
+    logger.propagate = False
+
 
 # SEC required User-Agent header
 SEC_USER_AGENT = 'FinScope contact@email.com'
 
-# Configure edgar User-Agent - SEC requires this
+# Persistent on-disk cache for downloaded filing text (survives across runs)
+# Filings are immutable once published, so cached text never goes stale
+FILING_CACHE_DIR = os.getenv(
+    'FINSCOPE_CACHE_DIR',
+    os.path.join(os.path.expanduser('~'), '.finscope', 'cache')
+)
+# Downloaded filing text is stored gzipped (temp files and cache alike)
+FILING_TEXT_SUFFIX = '.txt' + text_files.GZIP_SUFFIX
+# How long to remember that a filing could not be found/downloaded (seconds)
+FILING_NEGATIVE_CACHE_TTL = 24 * 3600
+
+# Concurrent filing downloads in download_filings_batch (SEC allows 10 requests/second;
+# edgartools throttles its own requests below that)
+MAX_DOWNLOAD_WORKERS = 8
+
+# HTML -> text parsing of a batch is CPU-bound, so it runs in up to this many processes
+# (the downloads themselves stay in threads, under edgartools' single rate limiter)
+MAX_PARSE_WORKERS = os.cpu_count() or 1
+
+# Guards the in-memory caches below, which are shared by the Flask worker threads;
+# use _recall/_remember rather than touching the dicts directly
+_cache_lock = threading.Lock()
+
+# In-memory cache for filings lists: (cik, years) -> (fetched_at, filings)
+# The same list is requested by /get-filings and again by /start-analysis moments later
+FILINGS_LIST_CACHE_TTL = 3600
+FILINGS_LIST_CACHE_MAX = 4096
+_filings_list_cache: Dict[tuple, tuple] = {}
+
+# In-memory cache for resolved CIKs: upper-cased name/ticker -> (resolved_at, cik)
+# Ticker/CIK mappings change on the order of weeks
+CIK_CACHE_TTL = 24 * 3600
+CIK_CACHE_MAX = 10000
+_cik_cache: Dict[str, tuple] = {}
+
+# Best company_service match per company name: name -> (matched_at, (name, ticker))
+# The company lists are loaded once per process, so matches don't go stale; only
+# non-empty matches are kept, in case the lists failed to load
+SUGGESTION_CACHE_MAX = 2048
+_suggestion_cache: Dict[str, tuple] = {}
+
+# In-memory cache for edgartools Company objects: CIK without leading zeros ->
+# (created_at, company). Creating one fetches the company's submissions JSON, and
+# a CIK lookup by ticker/name is usually followed by a filings list for the same CIK.
+# Kept no longer than the filings lists, so new filings still show up.
+COMPANY_CACHE_TTL = FILINGS_LIST_CACHE_TTL
+COMPANY_CACHE_MAX = 256
+_company_cache: Dict[str, tuple] = {}
+# One lock per CIK whose Company is being created, so concurrent lookups for the
+# same company wait for a single submissions fetch instead of each making one
+_company_creation_locks: Dict[str, threading.Lock] = {}
+
+# On-disk copies of the CIK and filings-list caches (one JSON file per key under
+# FILING_CACHE_DIR/metadata), so a restart doesn't re-query EDGAR for recent lookups.
+# Entries keep their original fetch time; ticker/CIK mappings are stable enough to keep
+# for CIK_DISK_CACHE_TTL, filings lists only for FILINGS_LIST_CACHE_TTL (new filings).
+CIK_DISK_CACHE_TTL = 30 * 24 * 3600
+
+# SEC's full ticker -> CIK mapping, downloaded once and kept on disk for TICKER_MAP_TTL,
+# so ticker lookups are a dict lookup instead of an EDGAR request each
+SEC_TICKERS_URL = 'https://www.sec.gov/files/company_tickers.json'
+TICKER_MAP_PATH = os.path.join(FILING_CACHE_DIR, 'company_tickers.json')
+TICKER_MAP_TTL = 7 * 24 * 3600
+_ticker_to_cik: Optional[Dict[str, str]] = None
+_ticker_map_lock = threading.Lock()
+
+# Configure edgar User-Agent - SEC requires this. Set once here at import; the identity
+# is process-wide, so the functions below don't repeat it
 try:
     from edgar import set_identity
     set_identity(SEC_USER_AGENT)
@@ -53,12 +152,168 @@ except ImportError:
             pass
 
 
+def _remember(cache: Dict, max_entries: int, key, entry: tuple) -> None:
+    """Stores a (fetched_at, value) entry in an in-memory cache, evicting the oldest when full"""
+    with _cache_lock:
+        if key not in cache and len(cache) >= max_entries:
+            # Evict the oldest entry (dicts keep insertion order)
+            cache.pop(next(iter(cache)), None)
+        cache[key] = entry
+
+
+def _recall(cache: Dict, key, ttl: Optional[int] = None):
+    """Returns the value of an in-memory cache entry younger than ttl seconds (any age if None), or None"""
+    with _cache_lock:
+        cached = cache.get(key)
+    if cached and (ttl is None or time.time() - cached[0] < ttl):
+        return cached[1]
+    return None
+
+
+@lru_cache(maxsize=4096)
+def _norm_cik(cik) -> tuple:
+    """
+    Normalizes a CIK (string or int) once per distinct value.
+    
+    Returns:
+        tuple: (CIK without leading zeros, 10-digit zero-padded CIK)
+    
+    Raises:
+        ValueError: If the CIK is not numeric
+    """
+    n = int(cik)
+    return str(n), f"{n:010d}"
+
+
+def _get_company(cik_clean: str) -> Company:
+    """Returns the edgartools Company for a CIK (without leading zeros), reusing a recent one"""
+    company = _recall(_company_cache, cik_clean, COMPANY_CACHE_TTL)
+    if company is not None:
+        return company
+    
+    with _cache_lock:
+        creation_lock = _company_creation_locks.setdefault(cik_clean, threading.Lock())
+    try:
+        with creation_lock:
+            # Another thread may have created it while this one waited
+            company = _recall(_company_cache, cik_clean, COMPANY_CACHE_TTL)
+            if company is None:
+                company = Company(cik_clean)
+                _remember(_company_cache, COMPANY_CACHE_MAX, cik_clean, (time.time(), company))
+            return company
+    finally:
+        with _cache_lock:
+            _company_creation_locks.pop(cik_clean, None)
+
+
+def _remember_company(company) -> None:
+    """Caches a Company found by ticker/name under its CIK for a following _get_company"""
+    _remember(_company_cache, COMPANY_CACHE_MAX, _norm_cik(company.cik)[0], (time.time(), company))
+
+
+def _metadata_cache_path(kind: str, key) -> str:
+    """Returns the on-disk cache path for a CIK ('cik') or filings-list ('filings') key"""
+    digest = hashlib.sha1(json.dumps(key).encode('utf-8')).hexdigest()
+    return os.path.join(FILING_CACHE_DIR, 'metadata', kind, f"{digest}.json")
+
+
+def _read_metadata_cache(kind: str, key, ttl: int) -> Optional[tuple]:
+    """
+    Reads a cached lookup from disk.
+    
+    Returns:
+        tuple: (fetched_at, value), or None if missing, unreadable or older than ttl seconds
+    """
+    try:
+        with open(_metadata_cache_path(kind, key), 'r', encoding='utf-8') as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if time.time() - entry.get('fetched_at', 0) >= ttl:
+        return None
+    return entry['fetched_at'], entry['data']
+
+
+def _write_metadata_cache(kind: str, key, entry: tuple) -> None:
+    """
+    Writes a (fetched_at, value) lookup to disk.
+    Cache failures are non-fatal - the lookup result is returned either way.
+    """
+    cache_path = _metadata_cache_path(kind, key)
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        # Write to a temp name first so a partial write is never read back
+        partial_path = cache_path + '.partial'
+        with open(partial_path, 'w', encoding='utf-8') as f:
+            json.dump({'fetched_at': entry[0], 'data': entry[1]}, f)
+        os.replace(partial_path, cache_path)
+    except (OSError, TypeError) as e:
+        logger.warning("⚠ Could not cache %s lookup: %s", kind, e)
+
+
+def _load_ticker_map() -> Dict[str, str]:
+    """
+    Returns SEC's ticker -> CIK mapping, loading it once per process.
+    
+    Reads TICKER_MAP_PATH if it is younger than TICKER_MAP_TTL, otherwise downloads
+    SEC_TICKERS_URL (about 10k companies) and saves it there. If the download fails,
+    a stale copy is used; with no copy at all the map is empty and lookups fall back
+    to EDGAR.
+    
+    Returns:
+        Dict mapping upper-case ticker (e.g. 'BRK-B') to 10-digit CIK
+    """
+    global _ticker_to_cik
+    
+    if _ticker_to_cik is not None:
+        return _ticker_to_cik
+    
+    with _ticker_map_lock:
+        if _ticker_to_cik is not None:
+            return _ticker_to_cik
+        
+        raw = None
+        try:
+            if time.time() - os.path.getmtime(TICKER_MAP_PATH) < TICKER_MAP_TTL:
+                with open(TICKER_MAP_PATH, 'r', encoding='utf-8') as f:
+                    raw = json.load(f)
+        except (OSError, ValueError):
+            pass
+        
+        if raw is None:
+            try:
+                response = http_client.session.get(SEC_TICKERS_URL, headers={'User-Agent': SEC_USER_AGENT}, timeout=10)
+                response.raise_for_status()
+                raw = response.json()
+                os.makedirs(FILING_CACHE_DIR, exist_ok=True)
+                partial_path = TICKER_MAP_PATH + '.partial'
+                with open(partial_path, 'w', encoding='utf-8') as f:
+                    json.dump(raw, f)
+                os.replace(partial_path, TICKER_MAP_PATH)
+                logger.info("✓ Downloaded SEC ticker map (%d companies)", len(raw))
+            except Exception as e:
+                logger.warning("⚠ Could not download SEC ticker map: %s", e)
+                if raw is None:
+                    try:
+                        with open(TICKER_MAP_PATH, 'r', encoding='utf-8') as f:
+                            raw = json.load(f)  # Stale, but tickers rarely change
+                    except (OSError, ValueError):
+                        raw = {}
+        
+        _ticker_to_cik = {
+            str(entry['ticker']).upper(): str(entry['cik_str']).zfill(10)
+            for entry in raw.values()
+            if entry.get('ticker') and entry.get('cik_str')
+        }
+    return _ticker_to_cik
+
+
 def get_cik_from_ticker(ticker: str) -> Optional[str]:
     """
     Attempts to find a CIK using the ticker symbol.
     
-    Uses the company_service ticker mapping, then queries SEC EDGAR
-    to get the CIK for that ticker.
+    Looks the ticker up in SEC's ticker -> CIK mapping (see _load_ticker_map), then
+    falls back to querying SEC EDGAR for tickers it doesn't list.
     
     Args:
         ticker: The ticker symbol (e.g., 'AAPL', 'MSFT')
@@ -71,6 +326,11 @@ def get_cik_from_ticker(ticker: str) -> Optional[str]:
     
     ticker_upper = ticker.strip().upper()
     
+    # SEC writes share classes with a dash (BRK-B), Wikipedia lists use a dot (BRK.B)
+    cik = _load_ticker_map().get(ticker_upper.replace('.', '-'))
+    if cik:
+        return cik
+    
     try:
         # Use edgar to search by ticker
         # The Company class can search by ticker symbol
@@ -79,14 +339,26 @@ def get_cik_from_ticker(ticker: str) -> Optional[str]:
             cik_value = company.cik
             # Check if CIK is valid (not -999999999 which means not found)
             if cik_value and cik_value != -999999999:
-                cik_str = str(cik_value).zfill(10)  # CIK should be 10 digits
-                return cik_str
+                _remember_company(company)
+                return _norm_cik(cik_value)[1]  # CIK should be 10 digits
     except Exception as e:
         pass
     
     return None
 
 
+def _suggest_one(company_name: str) -> Optional[tuple]:
+    """Returns company_service's best (company_name, ticker) match for a name, or None"""
+    suggestion = _recall(_suggestion_cache, company_name)
+    if suggestion is None:
+        suggestions = get_suggestions(company_name, max_results=1)
+        if not suggestions:
+            return None
+        suggestion = suggestions[0]
+        _remember(_suggestion_cache, SUGGESTION_CACHE_MAX, company_name, (time.time(), suggestion))
+    return suggestion
+
+
 def get_cik_from_company_name(company_name: str) -> Optional[str]:
     """
     Searches for CIK by company name.
@@ -105,13 +377,12 @@ def get_cik_from_company_name(company_name: str) -> Optional[str]:
     
     # Strategy 1: Use company_service to get ticker, then get CIK from ticker
     try:
-        from company_service import get_suggestions
-        suggestions = get_suggestions(company_name.strip(), max_results=1)
-        if suggestions:
-            # Get the ticker from the first suggestion
-            ticker = suggestions[0][1]  # (company_name, ticker)
+        suggestion = _suggest_one(company_name.strip()) if get_suggestions is not None else None
+        if suggestion:
+            # Get the ticker from the best suggestion
+            ticker = suggestion[1]  # (company_name, ticker)
             if ticker and ticker != 'N/A':
-                print(f"  Found ticker '{ticker}' from company service, looking up CIK...")
+                logger.info("  Found ticker '%s' from company service, looking up CIK...", ticker)
                 cik = get_cik_from_ticker(ticker)
                 if cik:
                     return cik
@@ -125,7 +396,8 @@ def get_cik_from_company_name(company_name: str) -> Optional[str]:
             cik_value = company.cik
             # Check if CIK is valid (not -999999999 which means not found)
             if cik_value and cik_value != -999999999:
-                return str(cik_value).zfill(10)  # CIK should be 10 digits
+                _remember_company(company)
+                return _norm_cik(cik_value)[1]  # CIK should be 10 digits
     except Exception as e:
         pass
     
@@ -137,9 +409,12 @@ def get_company_cik(company_name_or_ticker: str) -> Optional[str]:
     Main function to resolve company name or ticker to CIK.
     
     Search Logic:
-    1. First, try to find CIK using ticker mapping (if it looks like a ticker)
+    1. First, look the input up in SEC's ticker -> CIK map (a dict probe, no network call)
     2. If no ticker found, use Company Name Search to get CIK from SEC EDGAR
     
+    Successful lookups are cached in memory for CIK_CACHE_TTL seconds, and on disk
+    for CIK_DISK_CACHE_TTL seconds so they survive restarts.
+    
     Args:
         company_name_or_ticker: Company name or ticker symbol
     
@@ -149,28 +424,61 @@ def get_company_cik(company_name_or_ticker: str) -> Optional[str]:
     if not company_name_or_ticker or not company_name_or_ticker.strip():
         return None
     
+    key = company_name_or_ticker.strip().upper()
+    cik = _recall(_cik_cache, key, CIK_CACHE_TTL)
+    if cik:
+        return cik
+    
+    cached = _read_metadata_cache('cik', key, CIK_DISK_CACHE_TTL)
+    if cached:
+        _remember(_cik_cache, CIK_CACHE_MAX, key, cached)
+        return cached[1]
+    
+    cik = _resolve_company_cik(company_name_or_ticker)
+    if cik:
+        entry = (time.time(), cik)
+        _remember(_cik_cache, CIK_CACHE_MAX, key, entry)
+        _write_metadata_cache('cik', key, entry)
+    return cik
+
+
+def _resolve_company_cik(company_name_or_ticker: str) -> Optional[str]:
+    """
+    Resolves a company name or ticker to a CIK via SEC EDGAR (uncached - see get_company_cik).
+    
+    Args:
+        company_name_or_ticker: Company name or ticker symbol
+    
+    Returns:
+        str: The CIK number (as string), or None if not found
+    """
     input_clean = company_name_or_ticker.strip()
     
-    # Heuristic: If input is short (<=5 chars) and all uppercase/letters, likely a ticker
-    is_likely_ticker = len(input_clean) <= 5 and input_clean.replace(' ', '').isalpha()
+    # Strategy 1: Look the input up as a ticker in SEC's ticker map (no network call)
+    ticker_map = _load_ticker_map()
+    probe = input_clean.upper()
+    cik = ticker_map.get(probe.replace('.', '-'))
+    if cik:
+        logger.info("✓ Found CIK for ticker %s: %s", probe, cik)
+        return cik
     
-    # Strategy 1: Try ticker mapping first (if it looks like a ticker or if we have mapping)
-    if is_likely_ticker or (_company_tickers and input_clean.upper() in _company_tickers):
-        ticker = input_clean.upper()
-        print(f"Attempting to find CIK for ticker: {ticker}")
-        cik = get_cik_from_ticker(ticker)
+    # Without a ticker map (SEC download failed, no saved copy) ask EDGAR directly
+    # for inputs that look like tickers
+    if not ticker_map and len(probe) <= 5 and probe.isalpha():
+        logger.info("Attempting to find CIK for ticker: %s", probe)
+        cik = get_cik_from_ticker(probe)
         if cik and cik != '0000000000':
-            print(f"✓ Found CIK: {cik}")
+            logger.info("✓ Found CIK: %s", cik)
             return cik
     
     # Strategy 2: Try company name search (which will use company_service internally)
-    print(f"Searching for company: {input_clean}")
+    logger.info("Searching for company: %s", input_clean)
     cik = get_cik_from_company_name(input_clean)
     if cik and cik != '0000000000':
-        print(f"✓ Found CIK: {cik}")
+        logger.info("✓ Found CIK: %s", cik)
         return cik
     
-    print(f"✗ Could not find CIK for '{input_clean}'")
+    logger.warning("✗ Could not find CIK for '%s'", input_clean)
     return None
 
 
@@ -178,6 +486,43 @@ def get_filings_list(cik: str, years: int = 3) -> List[Dict[str, str]]:
     """
     Fetches a list of all 10-K, 8-K, 10-Q, etc. filings from the last N years.
     
+    Non-empty results are cached in memory and on disk for FILINGS_LIST_CACHE_TTL
+    seconds, so repeat calls for the same CIK (also after a restart) skip the EDGAR
+    round-trip.
+    
+    Args:
+        cik: The CIK number (as string, e.g., '0000320193')
+        years: Number of years to look back (default: 3)
+    
+    Returns:
+        List[Dict]: List of filing dictionaries with keys:
+            - 'form_type': Form type (e.g., '10-K', '8-K', '10-Q')
+            - 'filing_date': Filing date (YYYY-MM-DD)
+            - 'accession_number': SEC accession number (unique ID)
+            Sorted chronologically (newest first)
+    """
+    key = (cik, years)
+    filings_list = _recall(_filings_list_cache, key, FILINGS_LIST_CACHE_TTL)
+    if filings_list is not None:
+        return list(filings_list)
+    
+    cached = _read_metadata_cache('filings', key, FILINGS_LIST_CACHE_TTL)
+    if cached:
+        _remember(_filings_list_cache, FILINGS_LIST_CACHE_MAX, key, cached)
+        return list(cached[1])
+    
+    filings_list = _fetch_filings_list(cik, years)
+    if filings_list:
+        entry = (time.time(), filings_list)
+        _remember(_filings_list_cache, FILINGS_LIST_CACHE_MAX, key, entry)
+        _write_metadata_cache('filings', key, entry)
+    return list(filings_list)
+
+
+def _fetch_filings_list(cik: str, years: int = 3) -> List[Dict[str, str]]:
+    """
+    Fetches the filings list from EDGAR (uncached - see get_filings_list).
+    
     Args:
         cik: The CIK number (as string, e.g., '0000320193')
         years: Number of years to look back (default: 3)
@@ -193,21 +538,14 @@ def get_filings_list(cik: str, years: int = 3) -> List[Dict[str, str]]:
         return []
     
     try:
-        # Ensure identity is set (required by SEC)
-        try:
-            from edgar import set_identity
-            set_identity(SEC_USER_AGENT)
-        except:
-            pass
-        
         # Calculate date range (from N years ago to present)
         end_date = datetime.now()
         start_date = end_date - timedelta(days=years * 365)
         
         # Get company object - Company takes CIK as positional argument, not keyword
         # Remove leading zeros for the CIK (Company expects integer or string without leading zeros)
-        cik_clean = str(int(cik))  # Convert to int then back to string to remove leading zeros
-        company = Company(cik_clean)
+        cik_clean, _ = _norm_cik(cik)  # Remove leading zeros
+        company = _get_company(cik_clean)
         
         # Get filings - edgartools supports filtering by form type and date
         # We'll get all filings and filter for common forms
@@ -223,103 +561,172 @@ def get_filings_list(cik: str, years: int = 3) -> List[Dict[str, str]]:
                 # If form parameter not supported, get all filings
                 filings = company.get_filings()
         except Exception as e:
-            print(f"Error getting filings: {e}")
+            logger.error("Error getting filings: %s", e)
             filings = []
         
-        # Filter by date and form type manually
-        filtered_filings = []
-        for f in filings:
-            # Check form type
-            form_type = None
-            if hasattr(f, 'form'):
-                form_type = f.form
-            elif hasattr(f, 'form_type'):
-                form_type = f.form_type
-            
-            if form_type not in common_forms:
+        # Filter by date and form type and extract metadata in one pass
+        form_set = frozenset(common_forms)
+        start_day = start_date.date()
+        end_day = end_date.date()
+        filings_list = []
+        for filing in filings:
+            form_type = getattr(filing, 'form', None) or getattr(filing, 'form_type', None)
+            if form_type not in form_set:
                 continue
             
-            # Check filing date
-            filing_date = None
-            if hasattr(f, 'filing_date'):
-                filing_date = f.filing_date
-            elif hasattr(f, 'date'):
-                filing_date = f.date
-            
+            filing_date = getattr(filing, 'filing_date', None) or getattr(filing, 'date', None)
             if not filing_date:
                 continue
             
-            # Convert date to datetime if needed
-            from datetime import date as date_type
+            # Normalize to a date (edgartools gives 'YYYY-MM-DD' strings or date objects)
             if isinstance(filing_date, str):
                 try:
-                    filing_date = datetime.strptime(filing_date, '%Y-%m-%d')
-                except:
+                    filing_day = date.fromisoformat(filing_date[:10])
+                except ValueError:
                     try:
-                        filing_date = datetime.strptime(filing_date, '%Y%m%d')
-                    except:
+                        filing_day = datetime.strptime(filing_date, '%Y%m%d').date()
+                    except ValueError:
                         continue
-            elif isinstance(filing_date, date_type):
-                # Convert date to datetime for comparison
-                filing_date = datetime.combine(filing_date, datetime.min.time())
-            
-            # Check if date is within range
-            if isinstance(filing_date, datetime) and start_date <= filing_date <= end_date:
-                filtered_filings.append(f)
-        
-        filings = filtered_filings
-        
-        # Extract metadata
-        filings_list = []
-        for filing in filings:
-            # Handle different date formats and attribute names
-            filing_date = None
-            if hasattr(filing, 'filing_date'):
-                filing_date = filing.filing_date
-            elif hasattr(filing, 'date'):
-                filing_date = filing.date
-            
-            if filing_date:
-                if hasattr(filing_date, 'strftime'):
-                    date_str = filing_date.strftime('%Y-%m-%d')
-                elif isinstance(filing_date, str):
-                    date_str = filing_date
-                else:
-                    date_str = str(filing_date)
+            elif isinstance(filing_date, datetime):
+                filing_day = filing_date.date()
+            elif isinstance(filing_date, date):
+                filing_day = filing_date
             else:
-                continue  # Skip if no date
-            
-            # Get form type
-            form_type = 'UNKNOWN'
-            if hasattr(filing, 'form'):
-                form_type = filing.form
-            elif hasattr(filing, 'form_type'):
-                form_type = filing.form_type
+                continue
             
-            # Get accession number
-            accession = None
-            if hasattr(filing, 'accession_number'):
-                accession = filing.accession_number
-            elif hasattr(filing, 'accession'):
-                accession = filing.accession
+            if filing_day > end_day:
+                continue
+            if filing_day < start_day:
+                # Filings come back newest first, so the rest are older still
+                break
             
+            accession = getattr(filing, 'accession_number', None) or getattr(filing, 'accession', None)
             if accession:  # Only add if we have an accession number
                 filings_list.append({
                     'form_type': form_type,
-                    'filing_date': date_str,
+                    'filing_date': filing_day.isoformat(),
                     'accession_number': accession
                 })
         
         # Sort by filing date (newest first)
-        filings_list.sort(key=lambda x: x['filing_date'], reverse=True)
+        filings_list.sort(key=itemgetter('filing_date'), reverse=True)
         
         return filings_list
         
     except Exception as e:
-        print(f"Error fetching filings for CIK {cik}: {e}")
+        logger.error("Error fetching filings for CIK %s: %s", cik, e)
         return []
 
 
+def _filing_cache_path(accession_number: str, suffix: str) -> str:
+    """Returns the on-disk cache path for an accession number"""
+    safe_name = re.sub(r'[^0-9A-Za-z-]', '_', accession_number)
+    return os.path.join(FILING_CACHE_DIR, 'filings', f"{safe_name}{suffix}")
+
+
+def _copy_cached_filing(accession_number: str) -> Optional[str]:
+    """
+    Copies a cached filing into a fresh temp file.
+    
+    The temp file is deleted by cleanup_session, so every caller gets its own copy
+    and the cached original is left untouched.
+    
+    Returns:
+        str: Absolute path to the temp file, or None if the filing isn't cached
+    """
+    # Entries cached before filing text was compressed are plain .txt
+    for suffix in (FILING_TEXT_SUFFIX, '.txt'):
+        cache_path = _filing_cache_path(accession_number, suffix)
+        if os.path.exists(cache_path):
+            break
+    else:
+        return None
+    
+    try:
+        temp_file = tempfile.NamedTemporaryFile(mode='wb', suffix=suffix, delete=False)
+        temp_file.close()
+        shutil.copyfile(cache_path, temp_file.name)
+        return os.path.abspath(temp_file.name)
+    except OSError as e:
+        logger.warning("⚠ Could not read cached filing %s: %s", accession_number, e)
+        return None
+
+
+def _is_cached_miss(accession_number: str) -> bool:
+    """Checks if a recent lookup for this accession number already failed"""
+    miss_path = _filing_cache_path(accession_number, '.missing')
+    try:
+        return time.time() - os.path.getmtime(miss_path) < FILING_NEGATIVE_CACHE_TTL
+    except OSError:
+        return False
+
+
+def _cache_filing(accession_number: str, text_path: Optional[str]) -> None:
+    """
+    Stores a downloaded filing (or a failed lookup when text_path is None) in the cache.
+    Cache failures are non-fatal - the download result is returned either way.
+    """
+    try:
+        os.makedirs(os.path.join(FILING_CACHE_DIR, 'filings'), exist_ok=True)
+        if text_path is None:
+            with open(_filing_cache_path(accession_number, '.missing'), 'w'):
+                pass
+            return
+        
+        # Copy to a temp name first so a partial write never looks like a cache hit
+        cache_path = _filing_cache_path(accession_number, FILING_TEXT_SUFFIX)
+        partial_path = cache_path + '.partial'
+        shutil.copyfile(text_path, partial_path)
+        os.replace(partial_path, cache_path)
+    except OSError as e:
+        logger.warning("⚠ Could not cache filing %s: %s", accession_number, e)
+
+
+def _filing_from_accession(accession_number: str, cik: Optional[str] = None) -> Optional[Filing]:
+    """
+    Creates the Filing for an accession number without listing the company's filings.
+    
+    The form type and date are only metadata for text extraction, so they're taken
+    from a cached filings list when one covers this filing, and left blank otherwise.
+    
+    Args:
+        accession_number: The SEC accession number (e.g., '0000320193-24-000001')
+        cik: The filer's CIK; if not provided, the accession number's prefix is used
+    
+    Returns:
+        Filing: The filing, or None if no CIK could be determined
+    """
+    try:
+        if cik:
+            cik_int = int(cik)
+        else:
+            # The first 10 digits of the accession number are the submitter's CIK
+            cik_from_accession = accession_number.split('-')[0]
+            if len(cik_from_accession) != 10:
+                return None
+            cik_int = int(cik_from_accession)
+    except ValueError:
+        return None
+    
+    cik_clean = str(cik_int)
+    metadata = {}
+    with _cache_lock:
+        cached_lists = list(_filings_list_cache.items())
+    for (cached_cik, _), (_, filings) in cached_lists:
+        if str(cached_cik).lstrip('0') == cik_clean:
+            metadata = next((f for f in filings if f['accession_number'] == accession_number), {})
+            if metadata:
+                break
+    
+    return Filing(
+        cik=cik_int,
+        company='',
+        form=metadata.get('form_type', ''),
+        filing_date=metadata.get('filing_date', ''),
+        accession_no=accession_number
+    )
+
+
 def download_filing_as_text(accession_number: str, cik: Optional[str] = None) -> Optional[str]:
     """
     Downloads a filing as clean text.
@@ -327,95 +734,174 @@ def download_filing_as_text(accession_number: str, cik: Optional[str] = None) ->
     This function does NOT run automatically. It should only be called when needed.
     The output is suitable for AI (Gemini) to read - clean text with no HTML tags.
     
+    Downloaded text is cached on disk (FILING_CACHE_DIR), so repeat requests for the
+    same filing skip EDGAR entirely. Failed lookups are remembered for
+    FILING_NEGATIVE_CACHE_TTL seconds.
+    
     Args:
         accession_number: The SEC accession number (e.g., '0000320193-24-000001')
-        cik: Optional CIK number to speed up lookup (if not provided, will search)
+        cik: Optional CIK of the filer (if not provided, the accession number's prefix is used)
     
     Returns:
         str: Absolute path to the downloaded file, or None if failed
     """
+    return _download_filing(accession_number, cik)
+
+
+def _download_filing(accession_number: str, cik: Optional[str] = None, defer_html: bool = False):
+    """
+    Downloads a filing as clean text (see download_filing_as_text).
+    
+    Args:
+        accession_number: The SEC accession number
+        cik: Optional CIK of the filer
+        defer_html: If True, an HTML primary document is not parsed here; (form, html) is
+            returned instead, for _extract_text and _save_filing_text
+    
+    Returns:
+        Absolute path to the downloaded file, None if failed, or (form, html) when deferred
+    """
     if not accession_number:
-        print("Error: No accession number provided")
+        logger.error("Error: No accession number provided")
+        return None
+    
+    # Serve from the on-disk cache if this filing was downloaded before
+    cached_path = _copy_cached_filing(accession_number)
+    if cached_path:
+        logger.info("✓ Loaded cached filing to temp file: %s", cached_path)
+        return cached_path
+    if _is_cached_miss(accession_number):
+        logger.warning("✗ Filing %s was not found recently (cached), skipping download", accession_number)
         return None
     
     try:
-        # Ensure identity is set
-        try:
-            from edgar import set_identity
-            set_identity(SEC_USER_AGENT)
-        except:
-            pass
-        
-        # Get the filing - we need to get it from the company object
-        filing = None
-        
-        if cik:
-            # Use provided CIK
-            cik_clean = str(int(cik))
-            company = Company(cik_clean)
-            # Search through filings to find the one with matching accession number
-            all_filings = company.get_filings()
-            for f in all_filings:
-                if hasattr(f, 'accession_number') and f.accession_number == accession_number:
-                    filing = f
-                    break
-        else:
-            # Try to extract CIK from accession number (first 10 digits)
-            try:
-                cik_from_accession = accession_number.split('-')[0]
-                if len(cik_from_accession) == 10:
-                    cik_clean = str(int(cik_from_accession))
-                    company = Company(cik_clean)
-                    all_filings = company.get_filings()
-                    for f in all_filings:
-                        if hasattr(f, 'accession_number') and f.accession_number == accession_number:
-                            filing = f
-                            break
-            except:
-                pass
-        
+        # Build the filing directly from its CIK and accession number; its documents live
+        # at a fixed EDGAR archive path, so there is no need to page through the
+        # company's whole filing history to find it
+        filing = _filing_from_accession(accession_number, cik)
         if not filing:
-            print(f"✗ Could not find filing with accession number {accession_number}")
+            logger.warning("✗ Could not find filing with accession number %s", accession_number)
+            _cache_filing(accession_number, None)
             return None
         
-        # Get company name for filename
-        company_name = "Unknown"
-        try:
-            if hasattr(company, 'name') and company.name:
-                company_name = company.name
-            elif hasattr(company, 'display_name') and company.display_name:
-                company_name = company.display_name
-        except:
-            pass
-        
         # Download as clean text using .text() method
         try:
+            if defer_html:
+                html_content = filing.html()
+                if html_content and is_probably_html(html_content):
+                    return filing.form, html_content
             text_content = filing.text()
         except Exception as e:
-            print(f"✗ Error getting text content: {e}")
+            logger.warning("✗ Error getting text content: %s", e)
             return None
         
-        if text_content:
-            # Create temporary file using tempfile module (stateless architecture)
-            # Use delete=False so we can manually control deletion via cleanup_session
-            temp_file = tempfile.NamedTemporaryFile(mode='w', suffix='.txt', delete=False, encoding='utf-8')
-            temp_file.write(text_content)
-            temp_file.close()
-            
-            abs_path = os.path.abspath(temp_file.name)
-            print(f"✓ Downloaded text to temp file: {abs_path}")
-            return abs_path
-        else:
-            print(f"✗ Could not retrieve text for {accession_number}")
-            return None
+        return _save_filing_text(accession_number, text_content)
                 
     except Exception as e:
-        print(f"Error downloading filing {accession_number}: {e}")
+        logger.error("Error downloading filing %s: %s", accession_number, e)
         import traceback
         traceback.print_exc()
         return None
 
 
+def _save_filing_text(accession_number: str, text_content: str) -> Optional[str]:
+    """
+    Writes downloaded filing text to a temp file and the on-disk cache.
+    
+    Returns:
+        str: Absolute path to the temp file, or None if there was no text
+    """
+    if text_content:
+        # Create temporary file using tempfile module (stateless architecture)
+        # Use delete=False so we can manually control deletion via cleanup_session
+        # Written gzipped; readers open it through text_files.open_text_file
+        temp_file = tempfile.NamedTemporaryFile(mode='wb', suffix=FILING_TEXT_SUFFIX, delete=False)
+        text_files.write_compressed_text(temp_file, text_content)
+        temp_file.close()
+        
+        abs_path = os.path.abspath(temp_file.name)
+        logger.info("✓ Downloaded text to temp file: %s", abs_path)
+        _cache_filing(accession_number, abs_path)
+        return abs_path
+    else:
+        logger.warning("✗ Could not retrieve text for %s", accession_number)
+        _cache_filing(accession_number, None)
+        return None
+
+
+def _extract_text(html_content: str, form: str) -> str:
+    """
+    Converts a filing's primary HTML document to text the way Filing.text() does.
+    Module-level so download_filings_batch can run it in worker processes.
+    """
+    document = HTMLParser(ParserConfig(form=form)).parse(html_content)
+    if document.is_empty:
+        return ""
+    return document.text(table_max_col_width=500)
+
+
+def download_filings_batch(accession_numbers: List[str], cik: Optional[str] = None) -> List[Optional[str]]:
+    """
+    Downloads several filings as clean text concurrently.
+    
+    Downloads are I/O-bound on EDGAR, so up to MAX_DOWNLOAD_WORKERS run at once;
+    each one goes through download_filing_as_text (and its on-disk cache). Parsing
+    the downloaded HTML into text is CPU-bound, so when several filings need it,
+    it runs in up to MAX_PARSE_WORKERS processes instead of in the download threads.
+    
+    Args:
+        accession_numbers: SEC accession numbers to download
+        cik: Optional CIK of the filer (see download_filing_as_text)
+    
+    Returns:
+        List[Optional[str]]: Temp file path per accession number (same order), None for failures
+    """
+    download = lambda accession: download_filing_as_text(accession, cik=cik)
+    if len(accession_numbers) <= 1:
+        return [download(accession) for accession in accession_numbers]
+    
+    if HTMLParser is not None:
+        download = lambda accession: _download_filing(accession, cik, defer_html=True)
+    
+    with ThreadPoolExecutor(max_workers=min(len(accession_numbers), MAX_DOWNLOAD_WORKERS)) as executor:
+        results = list(executor.map(download, accession_numbers))
+    
+    pending = [i for i, result in enumerate(results) if isinstance(result, tuple)]
+    if not pending:
+        return results
+    
+    # Parse results per filing: the text, or the exception that parsing raised
+    parsed = {}
+    if len(pending) > 1 and MAX_PARSE_WORKERS > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=min(len(pending), MAX_PARSE_WORKERS)) as executor:
+                futures = {i: executor.submit(_extract_text, results[i][1], results[i][0]) for i in pending}
+                for i, future in futures.items():
+                    try:
+                        parsed[i] = future.result()
+                    except BrokenProcessPool:
+                        raise
+                    except Exception as e:
+                        parsed[i] = e
+        except (BrokenProcessPool, OSError) as e:
+            logger.warning("⚠ Parallel filing parsing failed, parsing in this process: %s", e)
+            parsed.clear()
+    
+    for i in pending:
+        form, html_content = results[i]
+        if i not in parsed:
+            try:
+                parsed[i] = _extract_text(html_content, form)
+            except Exception as e:
+                parsed[i] = e
+        if isinstance(parsed[i], Exception):
+            logger.warning("✗ Error getting text content: %s", parsed[i])
+            results[i] = None
+        else:
+            results[i] = _save_filing_text(accession_numbers[i], parsed[i])
+    return results
+
+
 def print_filings_list(filings: List[Dict[str, str]]):
     """
     Pretty-prints the filings list.
@@ -439,6 +925,22 @@ def print_filings_list(filings: List[Dict[str, str]]):
     print(f"{'='*80}\n")
 
 
+# Patterns for validate_downloaded_text_file (case-insensitive, so the content isn't lowercased)
+_HTML_TAG_RE = re.compile(r'<(?:div|table|span|p>|br>|html|body)', re.IGNORECASE)
+# Section -> (pattern, number of leading characters searched or None for the whole file);
+# a section counts as found if any of its patterns matches
+_VALIDATION_SECTIONS = (
+    ("Executive Summary", ((re.compile('executive summary', re.IGNORECASE), None),
+                           (re.compile('executive', re.IGNORECASE), 5000))),
+    ("Business Section", ((re.compile('business', re.IGNORECASE), 10000),)),
+    ("Risk Factors", ((re.compile('risk factors', re.IGNORECASE), None),)),
+    ("Management Discussion", ((re.compile('management', re.IGNORECASE), 10000),)),
+)
+_VALIDATION_HEAD_CHARS = 10000  # Longest leading-character window above
+_VALIDATION_OVERLAP_CHARS = 64  # Longer than any section pattern
+VALIDATION_CHUNK_CHARS = 1024 * 1024  # Characters read per chunk when streaming the rest
+
+
 def validate_downloaded_text_file(filepath: str, preview_chars: int = 500) -> bool:
     """
     Validation script to check downloaded text file.
@@ -478,12 +980,30 @@ def validate_downloaded_text_file(filepath: str, preview_chars: int = 500) -> bo
     
     # Read and validate content
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
+        # Only the head of the file is kept in memory; the rest is streamed in chunks
+        # for the character count and the whole-file section checks
+        whole_file_patterns = {
+            pattern for _, checks in _VALIDATION_SECTIONS for pattern, limit in checks if limit is None
+        }
+        with text_files.open_text_file(filepath) as f:
+            head = f.read(max(_VALIDATION_HEAD_CHARS, preview_chars))
+            total_chars = len(head)
+            found_patterns = {pattern for pattern in whole_file_patterns if pattern.search(head)}
+            # Carry the end of the previous chunk so matches spanning two chunks are seen
+            overlap = head[-_VALIDATION_OVERLAP_CHARS:]
+            while True:
+                chunk = f.read(VALIDATION_CHUNK_CHARS)
+                if not chunk:
+                    break
+                total_chars += len(chunk)
+                window = overlap + chunk
+                for pattern in whole_file_patterns - found_patterns:
+                    if pattern.search(window):
+                        found_patterns.add(pattern)
+                overlap = window[-_VALIDATION_OVERLAP_CHARS:]
         
         # Check for HTML tags
-        html_indicators = ['<div', '<table', '<span', '<p>', '<br>', '<html', '<body']
-        has_html = any(indicator in content[:5000].lower() for indicator in html_indicators)
+        has_html = _HTML_TAG_RE.search(head, 0, 5000) is not None
         
         if has_html:
             print("⚠ WARNING: File appears to contain HTML tags")
@@ -494,27 +1014,23 @@ def validate_downloaded_text_file(filepath: str, preview_chars: int = 500) -> bo
         print(f"\n{'='*80}")
         print(f"PREVIEW - First {preview_chars} characters:")
         print(f"{'='*80}")
-        preview = content[:preview_chars]
+        preview = head[:preview_chars]
         print(preview)
-        if len(content) > preview_chars:
-            print(f"\n... (showing first {preview_chars} of {len(content):,} total characters)")
+        if total_chars > preview_chars:
+            print(f"\n... (showing first {preview_chars} of {total_chars:,} total characters)")
         
         # Look for common sections
         print(f"\n{'='*80}")
         print("CONTENT ANALYSIS:")
         print(f"{'='*80}")
         
-        sections_found = []
-        content_lower = content.lower()
-        
-        if 'executive summary' in content_lower or 'executive' in content_lower[:5000]:
-            sections_found.append("Executive Summary")
-        if 'business' in content_lower[:10000]:
-            sections_found.append("Business Section")
-        if 'risk factors' in content_lower:
-            sections_found.append("Risk Factors")
-        if 'management' in content_lower[:10000]:
-            sections_found.append("Management Discussion")
+        sections_found = [
+            section for section, checks in _VALIDATION_SECTIONS
+            if any(
+                pattern in found_patterns if limit is None else pattern.search(head, 0, limit)
+                for pattern, limit in checks
+            )
+        ]
         
         if sections_found:
             print(f"✓ Found sections: {', '.join(sections_found)}")
@@ -544,6 +1060,7 @@ if __name__ == "__main__":
     print("\nCommands:")
     print("  - Type a company name or ticker to see filings list")
     print("  - Type 'download:<accession_number>' to download a filing as clean text")
+    print("    (several at once: 'download:<accession_number>,<accession_number>,...')")
     print("  - Type 'quit' or 'exit' to exit")
     print("=" * 80)
     
@@ -572,24 +1089,29 @@ if __name__ == "__main__":
             
             # Handle download command
             if user_input.startswith('download:'):
-                accession_number = user_input.replace('download:', '').strip()
+                accession_numbers = [
+                    accession.strip()
+                    for accession in user_input.replace('download:', '').split(',')
+                    if accession.strip()
+                ]
                 
-                if not accession_number:
+                if not accession_numbers:
                     print("✗ Error: Please provide an accession number")
-                    print("  Usage: download:<accession_number>")
+                    print("  Usage: download:<accession_number>[,<accession_number>...]")
                     continue
                 
-                print(f"\nDownloading filing: {accession_number}")
+                print(f"\nDownloading {len(accession_numbers)} filing(s): {', '.join(accession_numbers)}")
                 # Use the last known CIK if available (from previous search)
-                result = download_filing_as_text(accession_number, cik=last_cik)
-                if result:
-                    abs_path = os.path.abspath(result)
-                    print(f"✓ Successfully downloaded to: {abs_path}")
-                    
-                    # Run validation automatically
-                    validate_downloaded_text_file(result)
-                else:
-                    print("✗ Download failed")
+                results = download_filings_batch(accession_numbers, cik=last_cik)
+                for accession_number, result in zip(accession_numbers, results):
+                    if result:
+                        abs_path = os.path.abspath(result)
+                        print(f"✓ Successfully downloaded {accession_number} to: {abs_path}")
+                        
+                        # Run validation automatically
+                        validate_downloaded_text_file(result)
+                    else:
+                        print(f"✗ Download failed: {accession_number}")
                 continue
             
             # Search for company and get filings
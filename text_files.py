@@ -0,0 +1,52 @@
+"""
+Text Files - Compressed Document Text
+
+This module provides:
+- Gzip-compressed writes for downloaded filing text (filing text compresses 5-8x,
+  so the temp files and the on-disk filing cache take a fraction of the space)
+- One open_text_file() for every reader of document text, which decompresses .gz
+  files transparently and opens everything else (uploads, older cache entries) as before
+
+Compressed files are written without a name or timestamp in the gzip header, so the
+same text always produces the same bytes (and the same file hash).
+"""
+
+import gzip
+import io
+from typing import TextIO
+
+
+# Fast compression: filing text still shrinks several-fold, and writes stay cheap
+COMPRESS_LEVEL = 3
+
+# Suffix for compressed text files
+GZIP_SUFFIX = '.gz'
+
+
+def open_text_file(path: str) -> TextIO:
+    """
+    Opens a document text file for reading, decompressing it if it is gzipped.
+
+    Args:
+        path: Path to a plain-text file or a gzipped one (ending in GZIP_SUFFIX)
+
+    Returns:
+        TextIO: UTF-8 text stream (use as a context manager)
+    """
+    if path.endswith(GZIP_SUFFIX):
+        return gzip.open(path, 'rt', encoding='utf-8')
+    return open(path, 'r', encoding='utf-8')
+
+
+def write_compressed_text(file_obj, text: str) -> None:
+    """
+    Writes text gzip-compressed to an open binary file.
+
+    Args:
+        file_obj: File opened in binary write mode (left open)
+        text: Text to write (UTF-8)
+    """
+    # No file name or timestamp in the header, so identical text gives identical bytes
+    with gzip.GzipFile(filename='', fileobj=file_obj, mode='wb', compresslevel=COMPRESS_LEVEL, mtime=0) as gz:
+        with io.TextIOWrapper(gz, encoding='utf-8') as writer:
+            writer.write(text)
@@ -15,7 +15,7 @@ import json
 import re
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Optional, List
+from typing import BinaryIO, Dict, Optional, List, Iterable, Iterator, TextIO
 from gridfs import GridFS
 from bson import ObjectId
 
@@ -28,6 +28,9 @@ except ImportError:
 # MongoDB collection name for uploaded documents
 UPLOADS_COLLECTION = "uploaded_documents"
 
+# Buffer size when streaming processed content out of GridFS
+PROCESSED_COPY_BUFFER_SIZE = 64 * 1024
+
 
 def get_uploads_collection():
     """
@@ -108,19 +111,15 @@ def process_pdf_file(file_path: str) -> str:
     if not markdown_text or len(markdown_text.strip()) == 0:
         # Try opening the document and checking if it has extractable text
         doc = pymupdf.open(file_path)
+        page_count = len(doc)
         total_text_length = 0
-        for page_num in range(len(doc)):
+        for page_num in range(page_count):
             page_text = doc[page_num].get_text()
             total_text_length += len(page_text.strip())
         doc.close()
         
         if total_text_length == 0:
-            raise ValueError(
-                f"PDF appears to be image-based (scanned) with no extractable text. "
-                f"The file '{file_path}' contains {len(pymupdf.open(file_path))} pages, "
-                f"but no text could be extracted. "
-                f"OCR (Optical Character Recognition) would be required to process this PDF."
-            )
+            raise _empty_pdf_error(file_path, page_count, total_text_length)
         else:
             # Has text but to_markdown returned empty - try using document object
             doc = pymupdf.open(file_path)
@@ -128,14 +127,89 @@ def process_pdf_file(file_path: str) -> str:
             doc.close()
             
             if not markdown_text or len(markdown_text.strip()) == 0:
-                raise ValueError(
-                    f"PDF conversion returned empty result despite having extractable text. "
-                    f"This may indicate an issue with the PDF format or pymupdf4llm processing."
-                )
+                raise _empty_pdf_error(file_path, page_count, total_text_length)
     
     return markdown_text
 
 
+def _empty_pdf_error(file_path: str, page_count: int, total_text_length: int) -> ValueError:
+    """
+    Builds the error for a PDF whose Markdown conversion came out empty.
+    
+    Args:
+        file_path: Path to the PDF file
+        page_count: Number of pages in the PDF
+        total_text_length: Characters of text pymupdf could extract from its pages
+    
+    Returns:
+        ValueError: Scanned-PDF error if there is no text at all, conversion error otherwise
+    """
+    if total_text_length == 0:
+        return ValueError(
+            "PDF appears to be image-based (scanned) with no extractable text. "
+            f"The file '{file_path}' contains {page_count} pages, "
+            "but no text could be extracted. "
+            "OCR (Optical Character Recognition) would be required to process this PDF."
+        )
+    return ValueError(
+        "PDF conversion returned empty result despite having extractable text. "
+        "This may indicate an issue with the PDF format or pymupdf4llm processing."
+    )
+
+
+def iter_pdf_markdown(file_path: str) -> Iterator[str]:
+    """
+    Converts a PDF file to Markdown page by page using pymupdf4llm.
+    Streaming counterpart of process_pdf_file() - yields each page's Markdown
+    so callers can write it out without holding the whole document in memory.
+    
+    Args:
+        file_path: Path to the PDF file to process
+    
+    Yields:
+        str: Markdown content for each page, in order
+    
+    Raises:
+        FileNotFoundError: If the file doesn't exist
+        ImportError: If pymupdf4llm is not installed
+        ValueError: If the PDF is image-based (scanned) with no extractable text
+    """
+    try:
+        from pymupdf4llm import to_markdown
+        import pymupdf
+    except ImportError:
+        raise ImportError(
+            "pymupdf4llm is required for PDF processing. "
+            "Install it with: pip install pymupdf4llm"
+        )
+    
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"File not found: {file_path}")
+    
+    doc = pymupdf.open(file_path)
+    try:
+        # Detect header font sizes once for the whole document, as to_markdown(doc) would
+        kwargs = {}
+        try:
+            from pymupdf4llm import IdentifyHeaders
+            kwargs['hdr_info'] = IdentifyHeaders(doc)
+        except ImportError:
+            pass
+        
+        has_text = False
+        for page_num in range(len(doc)):
+            page_markdown = to_markdown(doc, pages=[page_num], **kwargs)
+            if page_markdown.strip():
+                has_text = True
+            yield page_markdown
+        
+        if not has_text:
+            total_text_length = sum(len(doc[page_num].get_text().strip()) for page_num in range(len(doc)))
+            raise _empty_pdf_error(file_path, len(doc), total_text_length)
+    finally:
+        doc.close()
+
+
 def clean_markdown_table(markdown_text: str) -> str:
     """
     Post-processes Markdown to clean up messy tables generated by pymupdf4llm.
@@ -153,43 +227,90 @@ def clean_markdown_table(markdown_text: str) -> str:
     Returns:
         str: Cleaned Markdown text with properly formatted tables
     """
-    lines = markdown_text.split('\n')
-    cleaned_lines = []
-    i = 0
+    return '\n'.join(_iter_cleaned_lines(markdown_text.split('\n')))
+
+
+def clean_markdown_stream(markdown_chunks: Iterable[str], output_handle: TextIO) -> None:
+    """
+    Streaming version of clean_markdown_table(): cleans Markdown arriving in
+    chunks (e.g. pages from iter_pdf_markdown) and writes it straight to
+    output_handle. Only the table currently being cleaned is held in memory.
     
-    while i < len(lines):
-        line = lines[i]
+    Args:
+        markdown_chunks: Pieces of Markdown text, in order (need not end on line boundaries)
+        output_handle: Text file handle to write the cleaned Markdown to
+    """
+    first = True
+    for line in _iter_cleaned_lines(_iter_lines(markdown_chunks)):
+        if not first:
+            output_handle.write('\n')
+        output_handle.write(line)
+        first = False
+
+
+def _iter_lines(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Splits a stream of text chunks into lines (without newlines), like str.split('\n').
+    """
+    partial = ''
+    for chunk in chunks:
+        lines = (partial + chunk).split('\n')
+        partial = lines.pop()
+        yield from lines
+    yield partial
+
+
+def _iter_cleaned_lines(lines: Iterable[str]) -> Iterator[str]:
+    """
+    Yields Markdown lines with each table block replaced by its cleaned version.
+    
+    A table starts at a line that starts and ends with | and continues over lines
+    starting with |. A single empty line stays inside the table only if the next
+    line is also a table line.
+    
+    Args:
+        lines: Markdown lines (without newlines)
+    
+    Yields:
+        str: Cleaned lines
+    """
+    table_lines = []
+    pending_blank = None  # Empty line inside a table, kept until we see the next line
+    
+    for line in lines:
+        stripped = line.strip()
         
-        # Check if this line is part of a table (starts and ends with |)
-        if line.strip().startswith('|') and line.strip().endswith('|'):
-            # Found a table - collect all table lines
-            table_lines = []
-            while i < len(lines) and (lines[i].strip().startswith('|') or lines[i].strip() == ''):
-                if lines[i].strip().startswith('|'):
-                    table_lines.append(lines[i])
-                elif lines[i].strip() == '' and len(table_lines) > 0:
-                    # Empty line might be end of table, but check next line
-                    if i + 1 < len(lines) and lines[i + 1].strip().startswith('|'):
-                        # Next line is also a table line, so this empty line is part of table
-                        table_lines.append(lines[i])
-                    else:
-                        # Next line is not a table, so we're done with this table
-                        break
-                i += 1
-            
-            # Process the table
-            if len(table_lines) > 0:
-                cleaned_table = _clean_table_block(table_lines)
-                cleaned_lines.extend(cleaned_table)
-                # Don't increment i here, the while loop already did
+        if table_lines:
+            if stripped.startswith('|'):
+                # Still in the table (a pending empty line was part of it)
+                if pending_blank is not None:
+                    table_lines.append(pending_blank)
+                    pending_blank = None
+                table_lines.append(line)
+                continue
+            if stripped == '' and pending_blank is None:
+                # Empty line might be end of table, but check next line
+                pending_blank = line
                 continue
+            
+            # Table ended - emit it, then handle this line normally
+            yield from _clean_table_block(table_lines)
+            table_lines = []
+            if pending_blank is not None:
+                yield pending_blank
+                pending_blank = None
+        
+        # Check if this line starts a table (starts and ends with |)
+        if stripped.startswith('|') and stripped.endswith('|'):
+            table_lines.append(line)
         else:
             # Not a table line, keep as-is
-            cleaned_lines.append(line)
-        
-        i += 1
+            yield line
     
-    return '\n'.join(cleaned_lines)
+    if table_lines:
+        yield from _clean_table_block(table_lines)
+    if pending_blank is not None:
+        yield pending_blank
 
 
 def _clean_table_block(table_lines: List[str]) -> List[str]:
@@ -341,7 +462,7 @@ def save_to_mongodb(
     """
     Saves document to MongoDB:
     - Raw file content (using GridFS for large files, direct storage for small text)
-    - Processed content (stored as text in document)
+    - Processed content (stored in GridFS as UTF-8, so it can be streamed back out)
     - Metadata (stored in document)
     
     Args:
@@ -354,7 +475,8 @@ def save_to_mongodb(
         file_type: Either 'txt' or 'pdf'
     
     Returns:
-        Dict with keys: document_id, raw_file_id, processed_content_id
+        Dict with keys: document_id, raw_file_id, processed_file_id,
+        processed_content_length, raw_content_length
     """
     collection = get_uploads_collection()
     fs = get_gridfs()
@@ -380,7 +502,15 @@ def save_to_mongodb(
         raw_file_id_str = None
         raw_storage_type = "embedded"
     
-    # Create document with metadata and processed content
+    # Save processed content to GridFS (read back with write_processed_content)
+    processed_file_id = fs.put(
+        processed_content.encode('utf-8'),
+        filename=f"{original_filename}.processed{'.md' if file_type == 'pdf' else '.txt'}",
+        content_type="text/markdown" if file_type == 'pdf' else "text/plain"
+    )
+    processed_file_id_str = str(processed_file_id)
+    
+    # Create document with metadata (processed content lives in GridFS)
     document = {
         "original_filename": original_filename,
         "company_name": company_name,
@@ -388,7 +518,8 @@ def save_to_mongodb(
         "doc_type": doc_type,
         "file_type": file_type,
         "upload_date": upload_date,
-        "processed_content": processed_content,
+        "processed_storage_type": "gridfs",
+        "processed_file_id": processed_file_id_str,
         "raw_storage_type": raw_storage_type,
         "raw_file_id": raw_file_id_str,  # GridFS file ID if using GridFS
         "raw_content": raw_content if not use_gridfs else None,  # Embedded content if not using GridFS
@@ -405,15 +536,51 @@ def save_to_mongodb(
         print(f"✓ Raw file stored in GridFS: file_id={raw_file_id_str}")
     else:
         print(f"✓ Raw content embedded in document")
+    print(f"✓ Processed content stored in GridFS: file_id={processed_file_id_str}")
     
     return {
         "document_id": document_id,
         "raw_file_id": raw_file_id_str,
+        "processed_file_id": processed_file_id_str,
         "processed_content_length": len(processed_content),
         "raw_content_length": len(raw_content)
     }
 
 
+def write_processed_content(document: Dict, output_handle: BinaryIO) -> int:
+    """
+    Writes a document's processed content (UTF-8) to a binary file handle.
+    Content stored in GridFS is streamed in PROCESSED_COPY_BUFFER_SIZE blocks, so
+    it is never held in memory as a whole; documents saved before processed
+    content moved to GridFS fall back to the embedded 'processed_content' field.
+    
+    Args:
+        document: Document from the uploads collection
+        output_handle: Binary file handle to write to
+    
+    Returns:
+        int: Number of bytes written
+    """
+    processed_file_id = document.get('processed_file_id')
+    if not processed_file_id:
+        data = (document.get('processed_content') or '').encode('utf-8')
+        output_handle.write(data)
+        return len(data)
+    
+    written = 0
+    grid_out = get_gridfs().get(ObjectId(processed_file_id))
+    try:
+        while True:
+            block = grid_out.read(PROCESSED_COPY_BUFFER_SIZE)
+            if not block:
+                break
+            output_handle.write(block)
+            written += len(block)
+    finally:
+        grid_out.close()
+    return written
+
+
 def upload_file(
     file_path: str,
     company_name: str,
@@ -431,7 +598,10 @@ def upload_file(
         doc_type: Type of document (default: "upload")
     
     Returns:
-        Dict with keys: document_id, raw_file_id, processed_content_length, raw_content_length
+        Dict with keys (see save_to_mongodb): document_id, raw_file_id, processed_file_id,
+        processed_content_length, raw_content_length. The processed content itself is
+        stored in GridFS under processed_file_id, not on the uploads document; read it
+        back with write_processed_content.
     
     Raises:
         FileNotFoundError: If the source file doesn't exist
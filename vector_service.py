@@ -0,0 +1,676 @@
+"""
+Vector Service - Retrieval Index for RAG Chat
+
+This service provides:
+- Splitting processed documents into overlapping, line-stamped chunks
+- Embedding chunks with a sentence-transformers model
+- A FAISS inner-product index per document for top-K retrieval at chat time
+
+Chat turns then send Gemini only the most relevant excerpts instead of the whole filing.
+Indices are persisted under INDEX_CACHE_DIR so restarts (and other users of the same
+filing) reload them from disk instead of re-embedding.
+
+faiss and sentence-transformers are optional. If they are not installed,
+is_available() returns False and callers should fall back to whole-file context.
+"""
+
+import os
+import re
+import time
+import pickle
+import queue
+import hashlib
+import threading
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+    import faiss
+    from sentence_transformers import SentenceTransformer
+except ImportError:
+    np = None
+    faiss = None
+    SentenceTransformer = None
+
+try:
+    import torch
+except ImportError:
+    torch = None
+
+import text_files
+
+
+# Embedding model (384-dimensional, CPU-viable)
+EMBEDDING_MODEL = 'BAAI/bge-small-en-v1.5'
+
+# Chunking parameters (in characters)
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 250
+
+# Embedding batch sizes: forward-pass batch, and chunks encoded per encode() call
+# (large filings are encoded in slabs to bound GPU memory)
+EMBED_BATCH_SIZE = 128
+EMBED_SLAB_SIZE = 2048
+
+# Number of chunks retrieved per chat query
+TOP_K = 8
+
+# Index selection: exhaustive int8 scan for small documents, HNSW graph above this size
+HNSW_MIN_CHUNKS = 2000
+HNSW_M = 32
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = int(os.getenv('FINSCOPE_HNSW_EF_SEARCH', '64'))  # search() also accepts ef_search per query
+
+# Persistent on-disk cache for FAISS indices and their chunk lists
+# Shares the FINSCOPE_CACHE_DIR root with sec_service's filing cache
+INDEX_CACHE_DIR = os.path.join(
+    os.getenv('FINSCOPE_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.finscope', 'cache')),
+    'indices'
+)
+
+# Semantic answer cache: a chat question reuses a cached answer when its embedding
+# has cosine similarity above the threshold with an earlier question (within the TTL)
+ANSWER_CACHE_THRESHOLD = 0.95
+ANSWER_CACHE_TTL = 300  # seconds
+ANSWER_CACHE_CANDIDATES = 4  # Nearest questions checked (skips expired entries)
+
+# Query micro-batching: concurrent searches arriving within QUERY_BATCH_WAIT seconds
+# are embedded in one encode() call (and searched together when they share an index)
+QUERY_BATCH_MAX = 32
+QUERY_BATCH_WAIT = 0.015
+
+# Process-wide embedding model, loaded on first use and shared by all sessions
+_embedding_model = None
+_embedding_lock = threading.Lock()
+
+# Pending searches for the batching worker: (store, query, k, ef_search, future)
+_query_queue = queue.Queue()
+_query_worker = None
+_query_worker_lock = threading.Lock()
+
+
+def is_available() -> bool:
+    """
+    Checks if the vector dependencies (faiss, sentence-transformers) are installed.
+
+    Returns:
+        bool: True if vector indexing can be used
+    """
+    return faiss is not None and SentenceTransformer is not None
+
+
+def _get_embedding_model():
+    """
+    Returns the shared embedding model, loading it once per process.
+    Uses the GPU when torch reports CUDA is available.
+
+    Returns:
+        SentenceTransformer: The embedding model
+    """
+    global _embedding_model
+
+    if _embedding_model is None:
+        with _embedding_lock:
+            if _embedding_model is None:
+                device = 'cuda' if torch is not None and torch.cuda.is_available() else 'cpu'
+                print(f"Loading embedding model: {EMBEDDING_MODEL} ({device})")
+                _embedding_model = SentenceTransformer(EMBEDDING_MODEL, device=device)
+    return _embedding_model
+
+
+def embed_texts(texts: List[str]):
+    """
+    Embeds a list of texts as L2-normalized float32 vectors.
+    Normalized vectors make inner product equal to cosine similarity.
+    All index builds and queries go through this function, and encode calls
+    are serialized on the shared model.
+
+    Texts are encoded in batches of EMBED_BATCH_SIZE, at most EMBED_SLAB_SIZE
+    per encode() call, and written into one preallocated array.
+
+    Args:
+        texts: Texts to embed
+
+    Returns:
+        np.ndarray: Array of shape (len(texts), dimension)
+    """
+    model = _get_embedding_model()
+    embeddings = np.empty((len(texts), model.get_sentence_embedding_dimension()), dtype='float32')
+    with _embedding_lock:
+        for start in range(0, len(texts), EMBED_SLAB_SIZE):
+            slab = texts[start:start + EMBED_SLAB_SIZE]
+            embeddings[start:start + len(slab)] = model.encode(
+                slab,
+                batch_size=EMBED_BATCH_SIZE,
+                normalize_embeddings=True,
+                convert_to_numpy=True,
+                show_progress_bar=False
+            )
+    return embeddings
+
+
+def _make_chunk(segments: List[tuple]) -> Dict:
+    """
+    Builds a chunk from (line_number, text) segments.
+
+    The first line is always stamped with [Line X], then every 10th line
+    (1, 11, 21, ...) to match the stamping used by gemini_service.read_files.
+
+    Args:
+        segments: List of (line_number, text) tuples
+
+    Returns:
+        Dict: Chunk with keys 'text', 'start_line', 'end_line'
+    """
+    stamped_lines = []
+    previous_line = None
+    for i, (line_num, text) in enumerate(segments):
+        if i == 0 or (line_num != previous_line and (line_num - 1) % 10 == 0):
+            stamped_lines.append(f"[Line {line_num}] {text}")
+        else:
+            stamped_lines.append(text)
+        previous_line = line_num
+
+    return {
+        'text': "\n".join(stamped_lines),
+        'start_line': segments[0][0],
+        'end_line': segments[-1][0]
+    }
+
+
+def chunk_lines(lines: List[str], chunk_size: int = CHUNK_SIZE, overlap: int = CHUNK_OVERLAP) -> List[Dict]:
+    """
+    Splits document lines into overlapping chunks of roughly chunk_size characters.
+
+    Chunks break on line boundaries so line numbers stay exact. Lines longer than
+    chunk_size are split into pieces that keep the same line number.
+
+    Args:
+        lines: Document lines (line 1 first)
+        chunk_size: Target chunk size in characters
+        overlap: Approximate characters shared between consecutive chunks
+
+    Returns:
+        List[Dict]: Chunks with keys 'text', 'start_line', 'end_line'
+    """
+    # Flatten into (line_number, text) segments no longer than chunk_size
+    segments = []
+    for line_num, line in enumerate(lines, start=1):
+        line = line.rstrip()
+        for start in range(0, max(len(line), 1), chunk_size):
+            segments.append((line_num, line[start:start + chunk_size]))
+
+    chunks = []
+    start = 0
+    while start < len(segments):
+        # Grow the chunk until it reaches chunk_size
+        end = start
+        size = 0
+        while end < len(segments) and (size == 0 or size + len(segments[end][1]) <= chunk_size):
+            size += len(segments[end][1]) + 1
+            end += 1
+
+        chunk_segments = segments[start:end]
+        if any(text.strip() for _, text in chunk_segments):
+            chunks.append(_make_chunk(chunk_segments))
+
+        if end >= len(segments):
+            break
+
+        # Step back so the next chunk overlaps the tail of this one (always moving forward)
+        next_start = end
+        overlap_size = 0
+        while next_start - 1 > start and overlap_size + len(segments[next_start - 1][1]) <= overlap:
+            next_start -= 1
+            overlap_size += len(segments[next_start][1]) + 1
+        start = next_start
+
+    return chunks
+
+
+def sec_cache_key(cik: str, accession_number: str) -> str:
+    """
+    Returns the index cache key for an SEC filing.
+
+    Args:
+        cik: Company CIK
+        accession_number: SEC accession number
+
+    Returns:
+        str: Cache key
+    """
+    return f"sec_{cik}_{accession_number}"
+
+
+def file_sha256(file_path: str) -> str:
+    """
+    Computes the sha256 hex digest of a file's bytes.
+
+    Args:
+        file_path: Path to the file
+
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def upload_cache_key(sha256_hex: str) -> str:
+    """
+    Returns the index cache key for an uploaded file.
+
+    Args:
+        sha256_hex: sha256 of the uploaded file's bytes (see file_sha256())
+
+    Returns:
+        str: Cache key
+    """
+    return f"upload_{sha256_hex}"
+
+
+def _index_cache_path(cache_key: str, suffix: str) -> str:
+    """Returns the on-disk path for a cache key (embedding model is part of the name)"""
+    safe_name = re.sub(r'[^0-9A-Za-z_-]', '_', f"{cache_key}_{EMBEDDING_MODEL}")
+    return os.path.join(INDEX_CACHE_DIR, f"{safe_name}{suffix}")
+
+
+def save_index(store: Dict, cache_key: str) -> None:
+    """
+    Writes a vector store's FAISS index and chunk metadata to INDEX_CACHE_DIR.
+    Cache failures are non-fatal - the in-memory store is still usable.
+
+    Args:
+        store: Vector store from build_index()
+        cache_key: Key from sec_cache_key() or upload_cache_key()
+    """
+    try:
+        os.makedirs(INDEX_CACHE_DIR, exist_ok=True)
+        meta = {key: value for key, value in store.items() if key != 'index'}
+        meta_path = _index_cache_path(cache_key, '.pkl')
+        # Write metadata first and the index last - the .faiss file marks a complete entry
+        with open(meta_path + '.tmp', 'wb') as f:
+            pickle.dump(meta, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(meta_path + '.tmp', meta_path)
+        index_path = _index_cache_path(cache_key, '.faiss')
+        faiss.write_index(store['index'], index_path + '.tmp')
+        os.replace(index_path + '.tmp', index_path)
+    except Exception as e:
+        print(f"⚠ Warning: Could not cache vector index {cache_key}: {e}")
+
+
+def is_index_cached(cache_key: str) -> bool:
+    """
+    Checks if a complete vector store for cache_key is on disk.
+
+    Args:
+        cache_key: Key from sec_cache_key() or upload_cache_key()
+
+    Returns:
+        bool: True if both the index and chunk metadata files exist
+    """
+    return (
+        os.path.exists(_index_cache_path(cache_key, '.faiss')) and
+        os.path.exists(_index_cache_path(cache_key, '.pkl'))
+    )
+
+
+def load_index(cache_key: str) -> Optional[Dict]:
+    """
+    Loads a persisted vector store from INDEX_CACHE_DIR.
+    The index is memory-mapped so multiple workers share the page cache.
+
+    Args:
+        cache_key: Key from sec_cache_key() or upload_cache_key()
+
+    Returns:
+        Optional[Dict]: Vector store, or None if not cached or unreadable
+    """
+    if not is_available():
+        return None
+
+    index_path = _index_cache_path(cache_key, '.faiss')
+    meta_path = _index_cache_path(cache_key, '.pkl')
+    if not is_index_cached(cache_key):
+        return None
+
+    try:
+        with open(meta_path, 'rb') as f:
+            store = pickle.load(f)
+        try:
+            store['index'] = faiss.read_index(index_path, faiss.IO_FLAG_MMAP)
+        except RuntimeError:
+            # Not every index type supports memory-mapped reads
+            store['index'] = faiss.read_index(index_path)
+        store['cache_key'] = cache_key
+        print(f"✓ Loaded cached vector index: {cache_key}")
+        return store
+    except Exception as e:
+        print(f"⚠ Warning: Could not load cached vector index {cache_key}: {e}")
+        return None
+
+
+def _create_index(dimension: int, num_chunks: int):
+    """
+    Creates an empty inner-product index sized for the document.
+
+    Vectors are stored as int8 (ScalarQuantizer QT_8bit), a 4x memory and
+    bandwidth saving over float32 with negligible recall loss for cosine search.
+    Small documents use an exhaustive IndexScalarQuantizer (graph build cost would
+    dominate). Documents with HNSW_MIN_CHUNKS or more chunks use IndexHNSWSQ,
+    which searches in roughly O(log N) instead of scanning every vector.
+
+    The returned index must be trained on the embeddings before add().
+
+    Args:
+        dimension: Embedding dimension
+        num_chunks: Number of chunks that will be added
+
+    Returns:
+        faiss.Index: Empty, untrained index
+    """
+    if num_chunks < HNSW_MIN_CHUNKS:
+        return faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT)
+
+    index = faiss.IndexHNSWSQ(dimension, faiss.ScalarQuantizer.QT_8bit, HNSW_M, faiss.METRIC_INNER_PRODUCT)
+    index.hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+    index.hnsw.efSearch = HNSW_EF_SEARCH
+    return index
+
+
+def build_index(file_path: str, cache_key: Optional[str] = None) -> Dict:
+    """
+    Builds a vector store for a processed document.
+    When cache_key is given, a persisted index is reused if present, and a
+    freshly built one is written to INDEX_CACHE_DIR.
+
+    Args:
+        file_path: Path to the processed text/Markdown file
+        cache_key: Optional key from sec_cache_key() or upload_cache_key()
+
+    Returns:
+        Dict: Vector store with keys:
+            - 'file_path': Source file path
+            - 'file_name': Source file name
+            - 'total_lines': Number of lines in the source file
+            - 'index': FAISS index over chunk embeddings (see _create_index())
+            - 'chunks': List of chunk dicts (parallel to index ids)
+            - 'cache_key': The cache_key argument (None if not cached)
+
+    Raises:
+        ImportError: If vector dependencies are not installed
+        FileNotFoundError: If the file doesn't exist
+        ValueError: If the file has no text to index
+    """
+    if not is_available():
+        raise ImportError(
+            "faiss and sentence-transformers are required for vector indexing. "
+            "Install them with: pip install faiss-cpu sentence-transformers"
+        )
+
+    if cache_key:
+        store = load_index(cache_key)
+        if store is not None:
+            return store
+
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"File not found: {file_path}")
+
+    with text_files.open_text_file(file_path) as f:
+        lines = f.readlines()
+
+    chunks = chunk_lines(lines)
+    if not chunks:
+        raise ValueError(f"No text to index in: {file_path}")
+
+    embeddings = embed_texts([chunk['text'] for chunk in chunks])
+    index = _create_index(embeddings.shape[1], len(chunks))
+    index.train(embeddings)  # Learns the per-dimension int8 ranges
+    index.add(embeddings)
+
+    print(f"✓ Indexed {len(chunks)} chunks from {os.path.basename(file_path)}")
+
+    store = {
+        'file_path': file_path,
+        'file_name': os.path.basename(file_path),
+        'total_lines': len(lines),
+        'index': index,
+        'chunks': chunks,
+        'cache_key': cache_key
+    }
+    if cache_key:
+        save_index(store, cache_key)
+    return store
+
+
+def _search_index(index, query_embeddings, k: int, ef_search: Optional[int]):
+    """
+    Runs one (possibly multi-query) search against a FAISS index.
+
+    Returns:
+        np.ndarray: Result ids of shape (len(query_embeddings), k)
+    """
+    if isinstance(index, faiss.IndexHNSW):
+        # Per-query parameters, so concurrent chats can use different breadths
+        params = faiss.SearchParametersHNSW(efSearch=max(ef_search or HNSW_EF_SEARCH, k))
+        _, ids = index.search(query_embeddings, k, params=params)
+    else:
+        _, ids = index.search(query_embeddings, k)
+    return ids
+
+
+def _run_query_batch(batch: List[tuple]) -> None:
+    """
+    Embeds a batch of pending requests in one call, then runs one multi-query
+    search per (index, k, ef_search) group and resolves each request's future.
+    Embedding-only requests (store is None) resolve with their embedding row.
+    """
+    try:
+        embeddings = embed_texts([query for _, query, _, _, _ in batch])
+    except Exception as e:
+        for *_, future in batch:
+            future.set_exception(e)
+        return
+
+    groups: Dict[tuple, List[int]] = {}
+    for position, (store, _, k, ef_search, future) in enumerate(batch):
+        if store is None:
+            future.set_result(embeddings[position:position + 1])
+            continue
+        groups.setdefault((id(store['index']), k, ef_search), []).append(position)
+
+    for positions in groups.values():
+        store, _, k, ef_search, _ = batch[positions[0]]
+        try:
+            ids = _search_index(store['index'], embeddings[positions], k, ef_search)
+        except Exception as e:
+            for position in positions:
+                batch[position][4].set_exception(e)
+            continue
+        for row, position in enumerate(positions):
+            chunks = batch[position][0]['chunks']
+            batch[position][4].set_result([chunks[i] for i in ids[row] if i != -1])
+
+
+def _query_batch_worker() -> None:
+    """
+    Background worker: waits for a search, collects more for up to
+    QUERY_BATCH_WAIT seconds (at most QUERY_BATCH_MAX), then runs them together.
+    """
+    while True:
+        batch = [_query_queue.get()]
+        deadline = time.monotonic() + QUERY_BATCH_WAIT
+        while len(batch) < QUERY_BATCH_MAX:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(_query_queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        _run_query_batch(batch)
+
+
+def _ensure_query_worker() -> None:
+    """Starts the query batching worker thread on first use"""
+    global _query_worker
+
+    if _query_worker is None:
+        with _query_worker_lock:
+            if _query_worker is None:
+                _query_worker = threading.Thread(target=_query_batch_worker, daemon=True)
+                _query_worker.start()
+
+
+def search(store: Dict, query: str, top_k: int = TOP_K, ef_search: Optional[int] = None) -> List[Dict]:
+    """
+    Retrieves the chunks most relevant to a query.
+
+    Concurrent calls are micro-batched: queries arriving within QUERY_BATCH_WAIT
+    seconds share a single embedding pass, and queries against the same index
+    share a single FAISS search.
+
+    Args:
+        store: Vector store from build_index()
+        query: The user's question
+        top_k: Number of chunks to retrieve
+        ef_search: HNSW search breadth (defaults to HNSW_EF_SEARCH); lower is
+            faster, higher is more accurate. Ignored for Flat indices.
+
+    Returns:
+        List[Dict]: Matching chunks, most relevant first
+    """
+    k = min(top_k, len(store['chunks']))
+    if k == 0:
+        return []
+
+    _ensure_query_worker()
+    future = Future()
+    _query_queue.put((store, query, k, ef_search, future))
+    return future.result()
+
+
+def embed_query(query: str):
+    """
+    Embeds a single query through the micro-batching worker, so concurrent
+    queries (and searches) arriving within QUERY_BATCH_WAIT seconds share one
+    embedding pass instead of one model call each.
+
+    Args:
+        query: The text to embed
+
+    Returns:
+        np.ndarray: float32 array of shape (1, dim), L2-normalized
+    """
+    _ensure_query_worker()
+    future = Future()
+    _query_queue.put((None, query, 0, None, future))
+    return future.result()
+
+
+def build_context(store: Dict, query: str, top_k: int = TOP_K, ef_search: Optional[int] = None) -> str:
+    """
+    Builds a compact Gemini context block from the chunks most relevant to a query.
+    Excerpts are ordered by position in the document and keep their [Line X] stamps.
+
+    Args:
+        store: Vector store from build_index()
+        query: The user's question
+        top_k: Number of chunks to retrieve
+        ef_search: HNSW search breadth (see search())
+
+    Returns:
+        str: Context block in the same shape as gemini_service.read_files output
+    """
+    hits = sorted(search(store, query, top_k, ef_search), key=lambda chunk: chunk['start_line'])
+    excerpts = "\n...\n".join(chunk['text'] for chunk in hits)
+    return (
+        f"=== File: {store['file_name']} (Relevant excerpts, total lines: {store['total_lines']}) ===\n"
+        f"{excerpts}\n"
+    )
+
+
+def create_answer_cache() -> Dict:
+    """
+    Creates an empty semantic answer cache for one conversation.
+
+    Returns:
+        Dict: Cache with keys 'index' (FAISS IndexFlatIP, created on first add)
+            and 'entries' (list of (answer, references, created_at), parallel to index ids)
+    """
+    return {'index': None, 'entries': []}
+
+
+def lookup_answer(cache: Dict, query: str) -> Tuple[Optional[Tuple[str, str]], Optional[object]]:
+    """
+    Looks up a cached answer for a semantically equivalent earlier question.
+
+    Args:
+        cache: Cache from create_answer_cache()
+        query: The user's question
+
+    Returns:
+        tuple: ((answer, references) or None, query embedding or None).
+            Pass the embedding to add_answer() on a miss to avoid embedding twice.
+            Both are None if vector dependencies are missing or embedding fails.
+    """
+    if not is_available():
+        return None, None
+
+    try:
+        query_embedding = embed_query(query)
+    except Exception as e:
+        print(f"⚠ Warning: Could not embed query for answer cache: {e}")
+        return None, None
+
+    index = cache['index']
+    if index is None or index.ntotal == 0:
+        return None, query_embedding
+
+    scores, ids = index.search(query_embedding, min(ANSWER_CACHE_CANDIDATES, index.ntotal))
+    now = time.time()
+    for score, i in zip(scores[0], ids[0]):
+        if i == -1 or score < ANSWER_CACHE_THRESHOLD:
+            break
+        answer, references, created_at = cache['entries'][i]
+        if now - created_at <= ANSWER_CACHE_TTL:
+            return (answer, references), query_embedding
+    return None, query_embedding
+
+
+def add_answer(cache: Dict, query_embedding, answer: str, references: str) -> None:
+    """
+    Adds an answer to the semantic answer cache.
+
+    Args:
+        cache: Cache from create_answer_cache()
+        query_embedding: Embedding returned by lookup_answer() (no-op if None)
+        answer: The answer text
+        references: The references text
+    """
+    if query_embedding is None:
+        return
+
+    if cache['index'] is None:
+        cache['index'] = faiss.IndexFlatIP(query_embedding.shape[1])
+    cache['index'].add(query_embedding)
+    cache['entries'].append((answer, references, time.time()))
+
+
+def is_similar(query_embedding, other_embedding, threshold: float = ANSWER_CACHE_THRESHOLD) -> bool:
+    """
+    Checks whether two query embeddings (from embed_query) are semantically equivalent.
+
+    Args:
+        query_embedding: Embedding of shape (1, dim)
+        other_embedding: Embedding of shape (1, dim)
+        threshold: Minimum cosine similarity
+
+    Returns:
+        bool: True if the cosine similarity is at least threshold
+    """
+    return float(query_embedding[0] @ other_embedding[0]) >= threshold